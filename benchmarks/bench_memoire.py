@@ -0,0 +1,70 @@
+"""
+Mesure la mémoire occupée par 10 000 PCB placés : liste de RectanglePCB
+avec __dict__ (représentation d'origine), liste de RectanglePCB à __slots__,
+et tableau DTYPE_PLACEMENT (colonnes NumPy, PlacementPCB.coordonnees).
+
+Usage : python benchmarks/bench_memoire.py
+"""
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from logic import Panneau, PlacementPCB, RectanglePCB
+
+NOMBRE_PCB = 10000
+
+
+class RectanglePCBDict:
+    """
+    RectanglePCB tel qu'il était avant __slots__.
+    """
+    def __init__(self, largeur, hauteur, x=0, y=0, rotation=0):
+        self.largeur = largeur
+        self.hauteur = hauteur
+        self.x = x
+        self.y = y
+        self.rotation = rotation
+
+
+def coordonnees_reference():
+    """
+    Au moins NOMBRE_PCB PCB, pris dans des placements réels de PCB de 3 mm.
+    """
+    placement = PlacementPCB(Panneau(600, 500, 15), RectanglePCB(3, 4), 1)
+    placement.calculer_meilleur_placement()
+    coordonnees = placement.coordonnees()
+    assert len(coordonnees) >= NOMBRE_PCB
+    return coordonnees[:NOMBRE_PCB].copy()
+
+
+def mesurer(nom, construire):
+    tracemalloc.start()
+    debut = time.perf_counter()
+    objet = construire()
+    duree = time.perf_counter() - debut
+    taille, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{nom:<32}{taille / 1024:>12.1f}{taille / NOMBRE_PCB:>14.1f}{duree * 1000:>14.1f}")
+    return objet, taille
+
+
+def main():
+    coordonnees = coordonnees_reference()
+    lignes = coordonnees.tolist()
+
+    print(f"{'Représentation':<32}{'Kio':>12}{'Octets/PCB':>14}{'Création (ms)':>14}")
+    _, avec_dict = mesurer("liste de RectanglePCB (__dict__)",
+                           lambda: [RectanglePCBDict(l, h, x, y, r) for x, y, l, h, r in lignes])
+    _, avec_slots = mesurer("liste de RectanglePCB (__slots__)",
+                            lambda: [RectanglePCB(l, h, x, y, r) for x, y, l, h, r in lignes])
+    _, colonnes = mesurer("tableau DTYPE_PLACEMENT", coordonnees.copy)
+
+    print(f"\n__slots__ : {avec_dict / avec_slots:.1f}x moins de mémoire ; "
+          f"tableau : {avec_dict / colonnes:.1f}x moins de mémoire")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""
+Compare l'évaluation mono-processus et multi-processus d'un balayage de combinaisons.
+
+Usage : python benchmarks/bench_parallele.py [nombre_combinaisons] [processus]
+"""
+import os
+import sys
+import time
+from itertools import cycle, islice, product
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from logic import evaluer_combinaisons
+
+
+def generer_combinaisons(nombre: int):
+    dimensions = [3, 5, 8, 12.5, 20, 33, 50, 75, 100, 160, 250]
+    panneaux = [(600, 500), (580, 510), (570, 480), (457, 300)]
+    espacements = [0, 2, 2.5, 5]
+    bordures = [10, 15]
+    grille = product(dimensions, dimensions, panneaux, espacements, bordures, [True, False])
+    return [
+        (largeur, hauteur, lp, hp, espacement, bordure, rotation)
+        for largeur, hauteur, (lp, hp), espacement, bordure, rotation in islice(cycle(grille), nombre)
+    ]
+
+
+def chronometrer(combinaisons, processus: int):
+    debut = time.perf_counter()
+    resultats = list(evaluer_combinaisons(combinaisons, processus=processus))
+    return time.perf_counter() - debut, resultats
+
+
+if __name__ == "__main__":
+    nombre = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    processus = int(sys.argv[2]) if len(sys.argv) > 2 else (os.cpu_count() or 1)
+    combinaisons = generer_combinaisons(nombre)
+
+    duree_mono, reference = chronometrer(combinaisons, 1)
+    print(f"1 processus   : {duree_mono:.2f} s ({nombre / duree_mono:,.0f} combinaisons/s)")
+
+    duree_multi, resultats = chronometrer(combinaisons, processus)
+    assert resultats == reference, "Résultats différents entre les deux modes"
+    print(f"{processus} processus : {duree_multi:.2f} s ({nombre / duree_multi:,.0f} combinaisons/s)")
+    print(f"Accélération  : x{duree_mono / duree_multi:.2f}")
@@ -0,0 +1,100 @@
+"""
+Mesure le temps d'image du rendu (rendering.dessiner_panneau) sur des
+panneaux d'environ 2 000 PCB : un patch par PCB (ancien rendu), une
+collection par rotation (rendu complet), puis le redessin partiel d'un seul
+axe modifié.
+
+Usage : python benchmarks/bench_rendu.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from matplotlib import patches
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from PyQt5.QtWidgets import QApplication
+
+from canvas import MplCanvas
+from logic import Panneau, PlacementPCB, RectanglePCB, PANNEAUX_LARGEURS_DEFAUT, PANNEAUX_HAUTEURS_DEFAUT, BORDURE_DEFAUT
+from rendering import COULEURS_ROTATION, dessiner_panneau
+
+REPETITIONS = 5
+
+
+def placements(largeur_pcb, hauteur_pcb, espacement):
+    panneaux = [Panneau(l, h, BORDURE_DEFAUT) for l, h in zip(PANNEAUX_LARGEURS_DEFAUT, PANNEAUX_HAUTEURS_DEFAUT)]
+    resultat = []
+    for panneau in panneaux:
+        placement = PlacementPCB(panneau, RectanglePCB(largeur_pcb, hauteur_pcb), espacement)
+        placement.calculer_meilleur_placement()
+        resultat.append((panneau, placement))
+    return resultat
+
+
+def dessiner_patchs(ax, panneau, placement, titre):
+    ax.add_patch(patches.Rectangle((0, 0), panneau.largeur_totale, panneau.hauteur_totale,
+                                   linewidth=1, edgecolor='black', facecolor='lightgray', alpha=0.3))
+    ax.add_patch(patches.Rectangle((panneau.bordure, panneau.bordure), panneau.largeur, panneau.hauteur,
+                                   linewidth=1, edgecolor='black', facecolor='none'))
+    for pcb in placement.rectangles:
+        ax.add_patch(patches.Rectangle((pcb.x, pcb.y), pcb.largeur, pcb.hauteur, linewidth=1, edgecolor='black',
+                                       facecolor=COULEURS_ROTATION[pcb.rotation], alpha=0.6))
+    ax.set_xlim(0, panneau.largeur_totale)
+    ax.set_ylim(0, panneau.hauteur_totale)
+    ax.set_aspect('equal', adjustable='box')
+    ax.set_title(titre)
+    ax.axis('off')
+
+
+def image_complete(canvas, axes, donnees, collections):
+    debut = time.perf_counter()
+    for ax, (panneau, placement) in zip(axes, donnees):
+        ax.clear()
+        titre = f"x{placement.nombre_pcb} PCB"
+        if collections:
+            dessiner_panneau(ax, panneau, placement.coordonnees(), titre)
+        else:
+            dessiner_patchs(ax, panneau, placement, titre)
+    canvas.draw()
+    return time.perf_counter() - debut
+
+
+def image_partielle(canvas, donnees, variante):
+    panneau, placement = donnees[variante % len(donnees)]
+    ax = canvas.axes[0][0]
+    debut = time.perf_counter()
+    ax.clear()
+    dessiner_panneau(ax, panneau, placement.coordonnees(), f"x{placement.nombre_pcb} PCB")
+    canvas.redessiner([ax])
+    return time.perf_counter() - debut
+
+
+def mediane(valeurs):
+    valeurs = sorted(valeurs)
+    return valeurs[len(valeurs) // 2]
+
+
+if __name__ == "__main__":
+    app = QApplication([])
+    donnees = placements(9, 9, 2)
+    print(f"PCB par panneau : {[p.nombre_pcb for _, p in donnees]}")
+
+    figure = Figure(figsize=(15, 8.5), dpi=100)
+    canvas_agg = FigureCanvasAgg(figure)
+    axes = list(figure.subplots(2, 2).flat)
+    avant = mediane([image_complete(canvas_agg, axes, donnees, False) for _ in range(REPETITIONS)])
+    apres = mediane([image_complete(canvas_agg, axes, donnees, True) for _ in range(REPETITIONS)])
+
+    canvas = MplCanvas(width=15, height=8.5)
+    canvas.resize(1500, 850)
+    canvas.redessiner_tout()
+    partiel = mediane([image_partielle(canvas, donnees, i) for i in range(REPETITIONS)])
+
+    print(f"{'Rendu':<36}{'Image (ms)':>12}")
+    print(f"{'Un patch par PCB (4 axes)':<36}{1000 * avant:>12.1f}")
+    print(f"{'Collections par rotation (4 axes)':<36}{1000 * apres:>12.1f}")
+    print(f"{'Redessin partiel (1 axe)':<36}{1000 * partiel:>12.1f}")
@@ -0,0 +1,42 @@
+"""
+Compare les stratégies de placement en vitesse et en nombre de PCB placés.
+
+Usage : python benchmarks/bench_strategies.py
+"""
+import os
+import sys
+import time
+from itertools import product
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from logic import Panneau, PlacementPCB, RectanglePCB, StrategieHeuristique, StrategieRetraits
+from guillotine import StrategieGuillotine
+
+DIMENSIONS = [3, 7.5, 17, 23.3, 50, 100, 155, 300]
+ESPACEMENTS = [0, 2.5, 5]
+PANNEAUX = [(600, 500), (580, 510), (570, 480), (457, 300)]
+
+
+def evaluer(strategie):
+    nombres = []
+    durees = []
+    for largeur, hauteur, espacement, (largeur_panneau, hauteur_panneau) in product(DIMENSIONS, DIMENSIONS, ESPACEMENTS, PANNEAUX):
+        placement = PlacementPCB(Panneau(largeur_panneau, hauteur_panneau, 15), RectanglePCB(largeur, hauteur),
+                                 espacement, strategie=strategie)
+        debut = time.perf_counter()
+        placement.calculer_meilleur_placement()
+        durees.append(time.perf_counter() - debut)
+        nombres.append(placement.nombre_pcb)
+    return nombres, durees
+
+
+if __name__ == "__main__":
+    reference, _ = evaluer(StrategieHeuristique())
+    print(f"{'Stratégie':<14}{'PCB total':>12}{'Gagnés':>9}{'Perdus':>9}{'Moyenne (ms)':>15}{'Max (ms)':>12}")
+    for strategie in [StrategieHeuristique(), StrategieRetraits(), StrategieGuillotine()]:
+        nombres, durees = evaluer(strategie)
+        gagnes = sum(n > r for n, r in zip(nombres, reference))
+        perdus = sum(n < r for n, r in zip(nombres, reference))
+        print(f"{strategie.nom:<14}{sum(nombres):>12}{gagnes:>9}{perdus:>9}"
+              f"{1000 * sum(durees) / len(durees):>15.2f}{1000 * max(durees):>12.2f}")
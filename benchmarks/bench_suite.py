@@ -0,0 +1,359 @@
+"""
+Suite de mesures de performance : placement, fonctions calcul_*, historique
+des travaux, rendu des panneaux et export PDF.
+
+Chaque mesure donne le temps par appel (médiane des répétitions), les
+allocations mesurées par tracemalloc sur une exécution séparée (pic et
+mémoire restant allouée) et, quand elle a un sens, le nombre de PCB traités
+par seconde. Les résultats sont enregistrés en JSON, avec le commit et
+l'environnement, et peuvent être comparés à un enregistrement précédent.
+
+Usage :
+    python benchmarks/bench_suite.py -o resultats.json
+    python benchmarks/bench_suite.py --rapide --comparer resultats.json
+    python benchmarks/bench_suite.py --groupes placement,calcul,historique --strategies heuristique,guillotine
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from itertools import product
+
+RACINE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RACINE)
+
+from logic import (
+    Panneau, PlacementPCB, RectanglePCB, strategie_par_nom, calcul_pourcentage_remplissage,
+    calcul_panneaux_necessaires, calcul_nombre_total_pcb, calcul_resultat,
+    PANNEAUX_LARGEURS_DEFAUT, PANNEAUX_HAUTEURS_DEFAUT, BORDURE_DEFAUT
+)
+
+# Dimensions de PCB de 3 à 300 mm, en progression géométrique
+DIMENSIONS = [3, 5.3, 9.5, 16.9, 30, 53.3, 94.9, 168.7, 300]
+DIMENSIONS_RAPIDES = [3, 16.9, 94.9, 300]
+ESPACEMENTS = [0, 2.5, 5]
+
+# PCB des mesures de rendu et d'export : du panneau très dense au panneau presque vide
+PCB_RENDU = [(3, 3, 2.5), (9.5, 5.3, 2.5), (30, 16.9, 5), (94.9, 53.3, 5), (300, 168.7, 5)]
+
+# Écart relatif au-delà duquel une mesure est signalée lors d'une comparaison
+SEUIL_REGRESSION = 0.10
+
+
+def panneaux_defaut():
+    """
+    Les quatre formats par défaut de l'interface.
+    """
+    return [Panneau(l, h, BORDURE_DEFAUT) for l, h in zip(PANNEAUX_LARGEURS_DEFAUT, PANNEAUX_HAUTEURS_DEFAUT)]
+
+
+def mesurer(nom, fonction, appels, repetitions, pcb=0):
+    """
+    Mesure une fonction exécutant `appels` appels : temps sur `repetitions`
+    exécutions, puis allocations sur une exécution sous tracemalloc.
+    """
+    fonction()  # échauffement : imports paresseux, caches internes
+    durees = []
+    for _ in range(repetitions):
+        debut = time.perf_counter()
+        fonction()
+        durees.append(time.perf_counter() - debut)
+
+    tracemalloc.start()
+    avant = tracemalloc.get_traced_memory()[0]
+    fonction()
+    apres, pic = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    mediane = statistics.median(durees)
+    resultat = {
+        'nom': nom,
+        'appels': appels,
+        'repetitions': repetitions,
+        'temps_par_appel': mediane / appels,
+        'temps_min_par_appel': min(durees) / appels,
+        'allocations_pic': pic - avant,
+        'allocations_restantes': apres - avant,
+        'pcb_par_seconde': pcb / mediane if pcb else None,
+    }
+    print(f"{nom:<40}{resultat['temps_par_appel'] * 1e6:>14.1f}{resultat['allocations_pic'] / 1024:>14.1f}"
+          f"{(resultat['pcb_par_seconde'] or 0):>16.0f}")
+    return resultat
+
+
+def cas_placement(dimensions):
+    return [(panneau, RectanglePCB(l, h), e)
+            for l, h, e, panneau in product(dimensions, dimensions, ESPACEMENTS, panneaux_defaut())]
+
+
+def mesures_placement(dimensions, strategies, repetitions):
+    resultats = []
+    cas = cas_placement(dimensions)
+
+    for nom_strategie in strategies:
+        strategie = strategie_par_nom(nom_strategie)
+        placements = [PlacementPCB(panneau, pcb, e, strategie=strategie) for panneau, pcb, e in cas]
+
+        def calculer():
+            for placement in placements:
+                placement.calculer_meilleur_placement()
+
+        calculer()
+        pcb = sum(p.nombre_pcb for p in placements)
+        resultats.append(mesurer(f"placement/{nom_strategie}", calculer, len(cas), repetitions, pcb))
+
+    # Construction des PCB de la configuration retenue (heuristique)
+    placements = [PlacementPCB(panneau, pcb, e) for panneau, pcb, e in cas]
+    for placement in placements:
+        placement.calculer_meilleur_placement()
+    pcb = sum(p.nombre_pcb for p in placements)
+
+    def rectangles():
+        for placement in placements:
+            placement.rectangles = None
+            placement.rectangles
+
+    def coordonnees():
+        for placement in placements:
+            placement.coordonnees()
+
+    resultats.append(mesurer("placement/rectangles", rectangles, len(cas), repetitions, pcb))
+    resultats.append(mesurer("placement/coordonnees", coordonnees, len(cas), repetitions, pcb))
+    return resultats
+
+
+def mesures_calcul(dimensions, repetitions):
+    placements = [PlacementPCB(panneau, pcb, e) for panneau, pcb, e in cas_placement(dimensions)]
+    for placement in placements:
+        placement.calculer_meilleur_placement()
+    quantites = [1, 1037, 10 ** 6]
+    cas = [(p, q) for p in placements for q in quantites]
+
+    def remplissage():
+        for p, _ in cas:
+            calcul_pourcentage_remplissage(p.surface_occupee, p.panneau.surface_utilisable)
+
+    def panneaux_necessaires():
+        for p, q in cas:
+            calcul_panneaux_necessaires(q, p.nombre_pcb)
+
+    def nombre_total():
+        for _, q in cas:
+            calcul_nombre_total_pcb(q, 5)
+
+    def resultat():
+        for p, q in cas:
+            calcul_resultat(1, p.panneau, p.nombre_pcb, p.surface_occupee, q)
+
+    return [
+        mesurer("calcul/pourcentage_remplissage", remplissage, len(cas), repetitions),
+        mesurer("calcul/panneaux_necessaires", panneaux_necessaires, len(cas), repetitions),
+        mesurer("calcul/nombre_total_pcb", nombre_total, len(cas), repetitions),
+        mesurer("calcul/resultat", resultat, len(cas), repetitions),
+    ]
+
+
+def mesures_historique(dimensions, repetitions):
+    from job_history import HistoriqueTravaux
+
+    placements = [PlacementPCB(panneau, pcb, e) for panneau, pcb, e in cas_placement(dimensions)]
+    for placement in placements:
+        placement.calculer_meilleur_placement()
+    resultats_placements = [calcul_resultat(1, p.panneau, p.nombre_pcb, p.surface_occupee, 1000) for p in placements]
+
+    with tempfile.TemporaryDirectory() as dossier:
+        historique = HistoriqueTravaux(os.path.join(dossier, 'historique.sqlite'))
+
+        def ajouter():
+            for placement, resultat in zip(placements, resultats_placements):
+                historique.ajouter(placement, resultat, 1000)
+            historique.enregistrer()
+
+        def restaurer():
+            for placement in placements:
+                historique.restaurer(placement)
+
+        def plus_proches():
+            for placement in placements:
+                historique.plus_proches(placement.pcb_prototype.largeur * 1.05, placement.pcb_prototype.hauteur,
+                                        placement.panneau.largeur_totale, placement.panneau.hauteur_totale)
+
+        resultats = [
+            mesurer("historique/ajouter", ajouter, len(placements), repetitions),
+            mesurer("historique/restaurer", restaurer, len(placements), repetitions),
+            mesurer("historique/plus_proches", plus_proches, len(placements), repetitions),
+        ]
+        historique.fermer()
+    return resultats
+
+
+def _fenetre():
+    """
+    Fenêtre principale hors écran, ou None si PyQt5 est absent. Son
+    historique des travaux est en mémoire.
+    """
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    os.environ.setdefault('PANELISATION_HISTORIQUE', ':memory:')
+    try:
+        from PyQt5.QtWidgets import QApplication
+    except ImportError:
+        return None
+    import ui
+    application = QApplication.instance() or QApplication([])
+    fenetre = ui.MainWindow()
+    fenetre.canvas.resize(1350, 700)
+    fenetre._application = application
+    return fenetre
+
+
+def _placements_rendu(largeur, hauteur, espacement):
+    placements = []
+    for panneau in panneaux_defaut():
+        placement = PlacementPCB(panneau, RectanglePCB(largeur, hauteur), espacement)
+        placement.calculer_meilleur_placement()
+        placements.append(placement)
+    return placements
+
+
+def _visualiser(fenetre, placements):
+    """
+    Rendu de la fenêtre : signatures effacées, les axes de tous les
+    panneaux sont reconstruits puis redessinés ensemble.
+    """
+    fenetre.signatures_axes.clear()
+    axes = [fenetre.visualiser_panneau(idx, p.panneau, p) for idx, p in enumerate(placements)]
+    fenetre.canvas.redessiner(axes)
+
+
+def mesures_rendu(fenetre, repetitions):
+    resultats = []
+    for largeur, hauteur, espacement in PCB_RENDU:
+        placements = _placements_rendu(largeur, hauteur, espacement)
+        resultats.append(mesurer(f"rendu/visualiser_panneau/{largeur:g}x{hauteur:g}",
+                                 lambda: _visualiser(fenetre, placements), 1, repetitions, sum(p.nombre_pcb for p in placements)))
+    return resultats
+
+
+def mesures_pdf(repetitions):
+    """
+    Export PDF des panneaux par défaut avec export.exporter_pdf, comme le
+    bouton de la fenêtre, mais dans un seul processus pour des temps
+    comparables d'une machine à l'autre.
+    """
+    try:
+        from export import exporter_pdf
+        from pdf_report import PageRapport
+    except ImportError:
+        print("reportlab absent : mesures d'export ignorées.")
+        return []
+
+    resultats = []
+    with tempfile.TemporaryDirectory() as dossier:
+        chemin = os.path.join(dossier, 'export.pdf')
+        for largeur, hauteur, espacement in PCB_RENDU:
+            placements = _placements_rendu(largeur, hauteur, espacement)
+            pages = [PageRapport(f"Panneau {i + 1}", p.panneau, p.coordonnees(),
+                                 calcul_resultat(i + 1, p.panneau, p.nombre_pcb, p.surface_occupee, 1000))
+                     for i, p in enumerate(placements)]
+            resultats.append(mesurer(f"pdf/exporter_pdf/{largeur:g}x{hauteur:g}",
+                                     lambda: exporter_pdf(chemin, pages, processus=1), 1, repetitions,
+                                     sum(p.nombre_pcb for p in placements)))
+    return resultats
+
+
+def environnement():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=RACINE, capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    versions = {}
+    for module in ('numpy', 'matplotlib', 'PyQt5.QtCore'):
+        try:
+            importe = __import__(module, fromlist=['_'])
+            versions[module] = getattr(importe, '__version__', None) or getattr(importe, 'PYQT_VERSION_STR', None)
+        except ImportError:
+            versions[module] = None
+    return {
+        'commit': commit,
+        'date': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'plateforme': platform.platform(),
+        'processeur': platform.processor() or platform.machine(),
+        'versions': versions,
+    }
+
+
+def comparer(resultats, reference):
+    """
+    Affiche l'évolution du temps par appel par rapport à un enregistrement précédent.
+    """
+    anciens = {r['nom']: r for r in reference['mesures']}
+    print(f"\nComparaison avec {reference['environnement'].get('commit')} :")
+    print(f"{'Mesure':<40}{'Avant (µs)':>14}{'Après (µs)':>14}{'Écart':>10}")
+    regressions = 0
+    for resultat in resultats:
+        ancien = anciens.get(resultat['nom'])
+        if ancien is None:
+            continue
+        ecart = resultat['temps_par_appel'] / ancien['temps_par_appel'] - 1
+        signal = ''
+        if ecart > SEUIL_REGRESSION:
+            signal = '  régression'
+            regressions += 1
+        print(f"{resultat['nom']:<40}{ancien['temps_par_appel'] * 1e6:>14.1f}{resultat['temps_par_appel'] * 1e6:>14.1f}"
+              f"{ecart:>+10.1%}{signal}")
+    return regressions
+
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(description="Mesures de performance de la panélisation.")
+    parser.add_argument('-o', '--sortie', help="fichier JSON des résultats")
+    parser.add_argument('--comparer', metavar='JSON', help="résultats précédents à comparer")
+    parser.add_argument('--groupes', default='placement,calcul,historique,rendu,pdf',
+                        help="groupes de mesures, séparés par des virgules")
+    parser.add_argument('--strategies', default='heuristique,retraits', help="stratégies de placement mesurées")
+    parser.add_argument('--rapide', action='store_true', help="moins de dimensions et de répétitions")
+    parser.add_argument('-r', '--repetitions', type=int, help="répétitions par mesure")
+    args = parser.parse_args(arguments)
+
+    groupes = args.groupes.split(',')
+    dimensions = DIMENSIONS_RAPIDES if args.rapide else DIMENSIONS
+    repetitions = args.repetitions or (3 if args.rapide else 7)
+
+    print(f"{'Mesure':<40}{'µs/appel':>14}{'Pic (Kio)':>14}{'PCB/s':>16}")
+    mesures = []
+    if 'placement' in groupes:
+        mesures += mesures_placement(dimensions, args.strategies.split(','), repetitions)
+    if 'calcul' in groupes:
+        mesures += mesures_calcul(dimensions, repetitions)
+    if 'historique' in groupes:
+        mesures += mesures_historique(dimensions, repetitions)
+    if 'rendu' in groupes:
+        fenetre = _fenetre()
+        if fenetre is None:
+            print("PyQt5 absent : mesures de rendu ignorées.")
+        else:
+            mesures += mesures_rendu(fenetre, repetitions)
+    if 'pdf' in groupes:
+        mesures += mesures_pdf(max(1, repetitions // 2))
+
+    resultats = {'environnement': environnement(), 'mesures': mesures}
+    if args.sortie:
+        with open(args.sortie, 'w', encoding='utf-8') as fichier:
+            json.dump(resultats, fichier, ensure_ascii=False, indent=2)
+
+    if args.comparer:
+        with open(args.comparer, encoding='utf-8') as fichier:
+            return 1 if comparer(mesures, json.load(fichier)) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
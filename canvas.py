@@ -0,0 +1,77 @@
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg
+from matplotlib.figure import Figure
+from matplotlib.transforms import Bbox
+
+from instrumentation import chronometrer
+
+
+class MplCanvas(FigureCanvasQTAgg):
+    """
+    Classe pour intégrer une figure Matplotlib dans PyQt5.
+    """
+    def __init__(self, parent=None, width=15, height=85, dpi=100):
+        fig = Figure(figsize=(width, height), dpi=dpi)
+        self.axes = fig.subplots(2, 2)
+        super().__init__(fig)
+        self.setParent(parent)
+
+        # Fond de la figure sans axes, et emprise dessinée de chaque axe
+        self._fond = None
+        self._taille_fond = None
+        self._emprises = {}
+
+    @chronometrer('MplCanvas.redessiner', detail=False)
+    def redessiner(self, axes_modifies):
+        """
+        Redessine uniquement les axes modifiés : leur zone est restaurée depuis
+        le fond mémorisé, puis ils sont dessinés et recopiés à l'écran. Un
+        rendu complet est fait au premier appel, après un redimensionnement ou
+        si tous les axes ont changé.
+        """
+        if not axes_modifies:
+            return
+
+        tous_les_axes = list(self.axes.flat)
+        taille = tuple(self.figure.bbox.size)
+        if self._fond is None or self._taille_fond != taille or len(axes_modifies) == len(tous_les_axes):
+            self.redessiner_tout()
+            return
+
+        renderer = self.get_renderer()
+        a_dessiner = set(axes_modifies)
+        while True:
+            emprises = [self._emprises.get(ax) for ax in a_dessiner] + [ax.get_tightbbox(renderer) for ax in a_dessiner]
+            zone = Bbox.union([e for e in emprises if e is not None]).expanded(1.02, 1.02)
+            voisins = {ax for ax in tous_les_axes if ax not in a_dessiner
+                       and self._emprises.get(ax) is not None and zone.overlaps(self._emprises[ax])}
+            if not voisins:
+                break
+            a_dessiner |= voisins
+
+        # Le fond est indexé depuis le coin supérieur gauche de la figure
+        hauteur = self.figure.bbox.height
+        x0, y0, x1, y1 = zone.extents
+        self.restore_region(self._fond, bbox=(x0, hauteur - y1, x1, hauteur - y0), xy=self._fond.get_extents()[:2])
+        for ax in tous_les_axes:
+            if ax in a_dessiner:
+                ax.draw(renderer)
+                self._emprises[ax] = ax.get_tightbbox(renderer)
+        self.blit(zone)
+
+    @chronometrer('MplCanvas.redessiner_tout', detail=False)
+    def redessiner_tout(self):
+        """
+        Rendu complet de la figure ; mémorise au passage le fond sans axes.
+        """
+        for ax in self.axes.flat:
+            ax.set_visible(False)
+        FigureCanvasAgg.draw(self)
+        self._fond = self.copy_from_bbox(self.figure.bbox)
+        self._taille_fond = tuple(self.figure.bbox.size)
+        for ax in self.axes.flat:
+            ax.set_visible(True)
+
+        self.draw()
+        renderer = self.get_renderer()
+        self._emprises = {ax: ax.get_tightbbox(renderer) for ax in self.axes.flat}
@@ -0,0 +1,260 @@
+"""
+Point d'entrée en ligne de commande, sans interface graphique.
+
+Lit des travaux (PCB à panéliser) en JSON ou CSV depuis un fichier ou
+l'entrée standard, et écrit le tableau de résultats en JSON ou CSV.
+
+Exemples :
+    python cli.py travaux.csv -o resultats.json
+    echo '[{"largeur": 20, "hauteur": 15}]' | python cli.py --panneau 600x500 --format csv
+
+Un fichier JSON contient soit une liste de travaux, soit un objet
+{"travaux": [...], "panneaux": [{"largeur": 600, "hauteur": 500, "bordure": 15}, ...]}.
+Un panneau peut aussi donner des bordures par côté et des zones interdites
+("bordures", "zones" : voir panel_library).
+Champs d'un travail : largeur, hauteur, espacement, nombre_pcb_a_fabriquer,
+pourcentage_surlancement, allow_rotation, reference.
+
+Avec --mixte, tous les travaux sont placés ensemble sur les mêmes panneaux
+et le résultat donne, pour chaque format, le nombre de panneaux et son minorant.
+
+Avec --rapport, un rapport PDF vectoriel est aussi écrit, avec une page par
+travail et par format de panneau. Avec --png, une image PNG par page est
+écrite dans un dossier. Les pages sont préparées dans --processus
+processus (voir export).
+
+Avec --historique, les placements déjà calculés sont relus dans une base
+sqlite au lieu d'être recalculés, et chaque ligne de résultat y est
+enregistrée (voir job_history).
+"""
+import argparse
+import csv
+import io
+import json
+import sys
+from functools import partial
+from typing import List, Optional, TextIO, Tuple
+
+import instrumentation
+from instrumentation import activer, demarrer_profilage, journaliser, rapport_mesures
+from logic import (
+    Panneau, PlacementPCB, RectanglePCB, TravailPCB, optimiser_lot, StrategieHeuristique, strategie_par_nom, cache_lot,
+    PANNEAUX_LARGEURS_DEFAUT, PANNEAUX_HAUTEURS_DEFAUT, BORDURE_DEFAUT, TOLERANCE_AJUSTEMENT
+)
+from panel_library import format_depuis_dict
+
+COLONNES_RESULTAT = [
+    'travail', 'reference', 'panneau', 'dimensions_totales', 'dimensions_utilisables', 'nombre_pcb',
+    'pourcentage_remplissage', 'nombre_panneaux_necessaires', 'quantite_produite'
+]
+
+COLONNES_MIXTE = [
+    'panneau', 'dimensions_totales', 'dimensions_utilisables', 'nombre_panneaux', 'borne_inferieure', 'ecart',
+    'optimal', 'pourcentage_remplissage', 'dispositions', 'essais', 'duree'
+]
+
+
+def _booleen(valeur) -> bool:
+    if isinstance(valeur, str):
+        return valeur.strip().lower() not in ('', '0', 'false', 'faux', 'non', 'no')
+    return bool(valeur)
+
+
+def travail_depuis_dict(donnees: dict) -> TravailPCB:
+    """
+    Construit un TravailPCB à partir d'un dictionnaire (ligne JSON ou CSV).
+    """
+    try:
+        travail = TravailPCB(float(donnees['largeur']), float(donnees['hauteur']))
+    except KeyError as e:
+        raise ValueError(f"Champ obligatoire manquant : {e.args[0]}")
+    if donnees.get('espacement') not in (None, ''):
+        travail.espacement = float(donnees['espacement'])
+    if donnees.get('nombre_pcb_a_fabriquer') not in (None, ''):
+        travail.nombre_pcb_a_fabriquer = int(donnees['nombre_pcb_a_fabriquer'])
+    if donnees.get('pourcentage_surlancement') not in (None, ''):
+        travail.pourcentage_surlancement = float(donnees['pourcentage_surlancement'])
+    if donnees.get('allow_rotation') not in (None, ''):
+        travail.allow_rotation = _booleen(donnees['allow_rotation'])
+    travail.reference = str(donnees.get('reference') or '')
+
+    if travail.largeur <= 0 or travail.hauteur <= 0 or travail.nombre_pcb_a_fabriquer <= 0:
+        raise ValueError("Les dimensions et la quantité des PCB doivent être positives et non nulles.")
+    return travail
+
+
+def lire_entree(fichier: TextIO) -> Tuple[List[TravailPCB], Optional[List[Panneau]]]:
+    """
+    Lit les travaux (et éventuellement les panneaux) en JSON ou CSV,
+    le format étant reconnu au premier caractère.
+    """
+    contenu = fichier.read()
+    if contenu.lstrip()[:1] in ('[', '{'):
+        donnees = json.loads(contenu)
+        panneaux = None
+        if isinstance(donnees, dict):
+            if 'panneaux' in donnees:
+                panneaux = [format_depuis_dict(p).panneau() for p in donnees['panneaux']]
+            donnees = donnees.get('travaux', [])
+        return [travail_depuis_dict(d) for d in donnees], panneaux
+
+    return [travail_depuis_dict(ligne) for ligne in csv.DictReader(io.StringIO(contenu))], None
+
+
+def ecrire_sortie(resultats: List[dict], fichier: TextIO, format_sortie: str, colonnes: List[str] = COLONNES_RESULTAT):
+    """
+    Écrit les résultats en JSON ou CSV.
+    """
+    if format_sortie == 'csv':
+        writer = csv.DictWriter(fichier, fieldnames=colonnes, lineterminator='\n')
+        writer.writeheader()
+        writer.writerows(resultats)
+    else:
+        json.dump(resultats, fichier, ensure_ascii=False, indent=2)
+        fichier.write('\n')
+
+
+def _panneau_depuis_argument(texte: str, bordure: float) -> Panneau:
+    try:
+        largeur, hauteur = (float(v) for v in texte.lower().split('x'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Format de panneau invalide : {texte} (attendu LARGEURxHAUTEUR)")
+    return Panneau(largeur, hauteur, bordure)
+
+
+def pages_rapport(travaux: List[TravailPCB], panneaux: List[Panneau], resultats: List[dict], strategie: str,
+                  tolerance: float = TOLERANCE_AJUSTEMENT, historique=None):
+    """
+    Pages du rapport PDF d'un lot, une par ligne de résultat. Chaque placement
+    est relu dans l'historique ou recalculé (depuis le cache du lot) au
+    moment d'écrire sa page.
+    """
+    from pdf_report import PageRapport
+
+    for resultat in resultats:
+        travail = travaux[resultat['travail']]
+        panneau = panneaux[resultat['panneau'] - 1]
+        placement = PlacementPCB(panneau, RectanglePCB(travail.largeur, travail.hauteur), travail.espacement,
+                                 allow_rotation=travail.allow_rotation, cache=cache_lot,
+                                 strategie=strategie_par_nom(strategie), tolerance=tolerance)
+        if historique is None or not historique.restaurer(placement):
+            placement.calculer_meilleur_placement()
+        titre = f"Travail {resultat['travail'] + 1}"
+        if travail.reference:
+            titre += f" ({travail.reference})"
+        yield PageRapport(f"{titre} : panneau {resultat['dimensions_totales']}", panneau, placement.coordonnees(),
+                          resultat)
+
+
+def _afficher_progression(nombre_pages: int, faites: int, total: Optional[int]):
+    print(f"\rExport : {faites} / {total or nombre_pages} pages", end='', file=sys.stderr, flush=True)
+
+
+def main(arguments: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Panélisation PCB en ligne de commande.")
+    parser.add_argument('entree', nargs='?', default='-', help="fichier JSON ou CSV des travaux (- : entrée standard)")
+    parser.add_argument('-o', '--sortie', default='-', help="fichier de résultats (- : sortie standard)")
+    parser.add_argument('-f', '--format', choices=['json', 'csv'], help="format de sortie (défaut : extension, sinon json)")
+    parser.add_argument('-p', '--panneau', action='append', default=[], metavar='LxH',
+                        help="format de panneau, répétable (défaut : les quatre formats de l'interface)")
+    parser.add_argument('-b', '--bordure', type=float, default=BORDURE_DEFAUT, help="bordure des panneaux --panneau (mm)")
+    parser.add_argument('-s', '--strategie', default=StrategieHeuristique.nom,
+                        help="stratégie de placement : heuristique, retraits ou guillotine")
+    parser.add_argument('-t', '--tolerance', type=float, default=TOLERANCE_AJUSTEMENT,
+                        help="dépassement admis d'un PCB hors de la zone utile (mm, négatif : marge exigée)")
+    parser.add_argument('-j', '--processus', type=int, default=1, help="nombre de processus (0 : un par cœur)")
+    parser.add_argument('-m', '--mixte', action='store_true', help="placer tous les travaux ensemble sur les mêmes panneaux")
+    parser.add_argument('--budget', type=float, default=2.0, help="temps de recherche par format en mode mixte (s)")
+    parser.add_argument('-r', '--rapport', metavar='PDF',
+                        help="rapport PDF vectoriel, une page par travail et par panneau (hors mode mixte)")
+    parser.add_argument('--png', metavar='DOSSIER',
+                        help="une image PNG par travail et par panneau, dans un dossier (hors mode mixte)")
+    parser.add_argument('--historique', metavar='SQLITE',
+                        help="base de l'historique des travaux : placements déjà calculés relus, résultats enregistrés "
+                             "(hors mode mixte)")
+    parser.add_argument('--profil', action='store_true',
+                        help="chronométrer les étapes et écrire le rapport sur la sortie d'erreur "
+                             "(profil cProfile si PANELISATION_CPROFILE est défini)")
+    args = parser.parse_args(arguments)
+    if args.profil:
+        activer()
+    if instrumentation.ACTIF:
+        demarrer_profilage()
+
+    if args.rapport and args.mixte:
+        print("Erreur : le rapport PDF n'est pas disponible en mode mixte.", file=sys.stderr)
+        return 2
+    if args.png and args.mixte:
+        print("Erreur : l'export PNG n'est pas disponible en mode mixte.", file=sys.stderr)
+        return 2
+    if args.historique and args.mixte:
+        print("Erreur : l'historique n'est pas disponible en mode mixte.", file=sys.stderr)
+        return 2
+
+    historique = None
+    if args.historique:
+        import sqlite3
+        from job_history import HistoriqueTravaux
+        try:
+            historique = HistoriqueTravaux(args.historique)
+        except sqlite3.Error as e:
+            print(f"Erreur : historique {args.historique} : {e}", file=sys.stderr)
+            return 2
+    try:
+        return _executer(args, historique)
+    finally:
+        if historique is not None:
+            historique.fermer()
+
+
+def _executer(args: argparse.Namespace, historique) -> int:
+    """
+    Calcule et écrit les résultats d'une ligne de commande analysée.
+    """
+    try:
+        if args.entree == '-':
+            travaux, panneaux = lire_entree(sys.stdin)
+        else:
+            with open(args.entree, encoding='utf-8') as fichier:
+                travaux, panneaux = lire_entree(fichier)
+
+        if args.panneau:
+            panneaux = [_panneau_depuis_argument(texte, args.bordure) for texte in args.panneau]
+        elif panneaux is None:
+            panneaux = [Panneau(largeur, hauteur, args.bordure)
+                        for largeur, hauteur in zip(PANNEAUX_LARGEURS_DEFAUT, PANNEAUX_HAUTEURS_DEFAUT)]
+
+        if args.mixte:
+            from multi_design import panneliser_mixte
+            resultats = panneliser_mixte(travaux, panneaux, args.budget)
+        else:
+            resultats = optimiser_lot(travaux, panneaux, processus=args.processus or None, strategie=args.strategie,
+                                      tolerance=args.tolerance, historique=historique)
+    except (ValueError, KeyError, TypeError, OSError, argparse.ArgumentTypeError) as e:
+        print(f"Erreur : {e}", file=sys.stderr)
+        return 2
+
+    format_sortie = args.format or ('csv' if args.sortie.lower().endswith('.csv') else 'json')
+    colonnes = COLONNES_MIXTE if args.mixte else COLONNES_RESULTAT
+    if args.sortie == '-':
+        ecrire_sortie(resultats, sys.stdout, format_sortie, colonnes)
+    else:
+        with open(args.sortie, 'w', encoding='utf-8', newline='') as fichier:
+            ecrire_sortie(resultats, fichier, format_sortie, colonnes)
+    if args.rapport or args.png:
+        from export import exporter_pdf, exporter_png
+        progression = partial(_afficher_progression, len(resultats)) if sys.stderr.isatty() else None
+        for exporter, destination in ((exporter_pdf, args.rapport), (exporter_png, args.png)):
+            if destination:
+                exporter(destination, pages_rapport(travaux, panneaux, resultats, args.strategie, args.tolerance,
+                                                    historique),
+                         processus=args.processus or None, progression=progression)
+                if progression is not None:
+                    print(file=sys.stderr)
+    if instrumentation.ACTIF:
+        journaliser(f"mesures\n{rapport_mesures()}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
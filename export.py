@@ -0,0 +1,158 @@
+"""
+Export des placements en parallèle : un rapport PDF, ou un dossier
+d'images PNG (une par page).
+
+Chaque page est préparée depuis les coordonnées de ses PCB, sans le canvas
+de l'interface, dans des processus de travail : opérateurs PDF de ses PCB
+(pdf_report.operateurs_pcb), ou image PNG dessinée par Matplotlib avec le
+moteur Agg, non interactif. Le PDF est assemblé dans le processus appelant,
+dans l'ordre des pages ; les images sont écrites par les processus.
+
+Les pages sont lues au fur et à mesure : seules PAGES_EN_VOL pages par
+processus sont en cours à la fois. La progression est signalée page par
+page, et un événement d'annulation interrompt l'export entre deux pages.
+"""
+import os
+import threading
+from collections import deque
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+
+from pdf_report import PageRapport, ecrire_rapport, lignes_resultat, operateurs_pcb
+
+# Pages soumises par processus avant d'attendre la première : les processus
+# restent occupés pendant l'assemblage, sans lire toutes les pages d'avance
+PAGES_EN_VOL = 4
+
+# Une page seule est préparée sur place, sans démarrer de processus
+PAGES_MIN_PARALLELE = 2
+
+# Résolution des images PNG (page A4)
+DPI_PNG = 150
+
+Progression = Callable[[int, Optional[int]], object]
+
+
+class ExportAnnule(Exception):
+    """
+    Export interrompu par son événement d'annulation.
+    """
+
+
+def _nombre_processus(pages, processus: Optional[int]) -> int:
+    """
+    Nombre de processus d'un export : None donne un processus par cœur, au
+    plus un par page, et aucun pour une liste de moins de
+    PAGES_MIN_PARALLELE pages.
+    """
+    if processus is None:
+        processus = os.cpu_count() or 1
+        if hasattr(pages, '__len__'):
+            if len(pages) < PAGES_MIN_PARALLELE:
+                return 1
+            processus = min(processus, len(pages))
+    return max(1, processus)
+
+
+def _en_parallele(fonction: Callable, taches: Iterable[Tuple[object, tuple]], processus: int) -> Iterator[tuple]:
+    """
+    Produit (element, fonction(*arguments)) pour chaque tâche (element,
+    arguments), dans l'ordre des tâches. Avec processus > 1, les appels sont
+    faits dans un ProcessPoolExecutor, avec au plus PAGES_EN_VOL x processus
+    tâches en cours ; celles qui n'ont pas démarré sont abandonnées si le
+    générateur est fermé avant la fin.
+    """
+    if processus <= 1:
+        for element, arguments in taches:
+            yield element, fonction(*arguments)
+        return
+
+    # Import différé : inutile (et coûteux au démarrage) en mono-processus
+    from concurrent.futures import ProcessPoolExecutor
+
+    executor = ProcessPoolExecutor(max_workers=processus)
+    en_cours = deque()
+    try:
+        for element, arguments in taches:
+            en_cours.append((element, executor.submit(fonction, *arguments)))
+            if len(en_cours) >= PAGES_EN_VOL * processus:
+                element, futur = en_cours.popleft()
+                yield element, futur.result()
+        while en_cours:
+            element, futur = en_cours.popleft()
+            yield element, futur.result()
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def _suivre(resultats: Iterator[tuple], total: Optional[int], progression: Optional[Progression],
+            annulation: Optional[threading.Event]) -> Iterator[tuple]:
+    """
+    Relaie les résultats, en signalant la progression après chacun et en
+    s'arrêtant (ExportAnnule) si l'annulation est demandée.
+    """
+    for faites, resultat in enumerate(resultats, 1):
+        if annulation is not None and annulation.is_set():
+            raise ExportAnnule()
+        yield resultat
+        if progression is not None:
+            progression(faites, total)
+
+
+def exporter_pdf(fichier, pages: Iterable[PageRapport], titre: str = "Récapitulatif de la panélisation",
+                 notes: Iterable[str] = (), processus: Optional[int] = None,
+                 progression: Optional[Progression] = None, annulation: Optional[threading.Event] = None) -> int:
+    """
+    Écrit le rapport PDF des pages (voir pdf_report.ecrire_rapport), les
+    opérateurs des PCB de chaque page étant préparés dans `processus`
+    processus (None : voir _nombre_processus). Retourne le nombre de pages ;
+    progression(pages écrites, total ou None) est appelée après chaque page.
+    Rien n'est écrit si l'export est annulé.
+    """
+    total = len(pages) if hasattr(pages, '__len__') else None
+    taches = ((page, (page.coordonnees,)) for page in pages)
+    resultats = _en_parallele(operateurs_pcb, taches, _nombre_processus(pages, processus))
+
+    def pages_preparees():
+        for page, operateurs in _suivre(resultats, total, progression, annulation):
+            page.operateurs = operateurs
+            yield page
+            page.operateurs = None
+
+    return ecrire_rapport(fichier, pages_preparees(), titre, notes)
+
+
+def ecrire_png(page: PageRapport, chemin: str, dpi: int = DPI_PNG) -> str:
+    """
+    Dessine une page (panneau puis récapitulatif, sur une page A4) dans une
+    image PNG, avec le moteur Agg de Matplotlib, et retourne son chemin.
+    """
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+    from rendering import dessiner_panneau
+
+    figure = Figure(figsize=(8.27, 11.69), dpi=dpi)
+    FigureCanvasAgg(figure)
+    ax = figure.add_axes((0.06, 0.4, 0.88, 0.55))
+    dessiner_panneau(ax, page.panneau, page.coordonnees, page.titre)
+    if page.resultat is not None:
+        figure.text(0.08, 0.36, "\n".join(lignes_resultat(page.resultat)), va='top', fontsize=10, linespacing=1.6)
+    figure.savefig(chemin, dpi=dpi)
+    return chemin
+
+
+def exporter_png(dossier: str, pages: Iterable[PageRapport], dpi: int = DPI_PNG, processus: Optional[int] = None,
+                 progression: Optional[Progression] = None,
+                 annulation: Optional[threading.Event] = None) -> List[str]:
+    """
+    Écrit une image PNG par page dans un dossier (créé au besoin),
+    page_0001.png, page_0002.png..., dessinées dans `processus` processus
+    (None : voir _nombre_processus). Retourne les chemins des images ;
+    progression(images écrites, total ou None) est appelée après chaque
+    image.
+    """
+    os.makedirs(dossier, exist_ok=True)
+    total = len(pages) if hasattr(pages, '__len__') else None
+    taches = ((page, (page, os.path.join(dossier, f"page_{numero:04d}.png"), dpi))
+              for numero, page in enumerate(pages, 1))
+    resultats = _en_parallele(ecrire_png, taches, _nombre_processus(pages, processus))
+    return [chemin for _, chemin in _suivre(resultats, total, progression, annulation)]
@@ -0,0 +1,199 @@
+from bisect import bisect_right
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from logic import MICRONS_PAR_MM, PlacementPCB, RectanglePCB, StrategieHeuristique, StrategiePlacement, microns
+
+
+def _motifs_normaux(longueur: int, pas: List[int], limite: int) -> List[int]:
+    """
+    Retourne les positions atteignables comme somme de pas (motifs normaux),
+    triées, 0 compris, en micromètres. Si elles dépassent la limite, seuls
+    les multiples de chaque pas sont conservés.
+    """
+    positions = {0}
+    for p in pas:
+        suivantes = set(positions)
+        for position in positions:
+            k = 1
+            while position + k * p <= longueur:
+                suivantes.add(position + k * p)
+                k += 1
+        positions = suivantes
+        if len(positions) > limite:
+            positions = {k * p for p in pas for k in range(longueur // p + 1)}
+            break
+    return sorted(positions)
+
+
+def _coupes(positions: List[int]) -> List[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Pour chaque zone positions[i], retourne les indices k des coupes jusqu'à
+    la moitié de la zone et les indices des zones restantes positions[i] - positions[k].
+    """
+    coupes = []
+    for i, longueur in enumerate(positions):
+        ks = [k for k in range(1, i) if 2 * positions[k] <= longueur]
+        restes = [bisect_right(positions, longueur - positions[k]) - 1 for k in ks]
+        coupes.append((np.array(ks, dtype=np.intp), np.array(restes, dtype=np.intp)))
+    return coupes
+
+
+class StrategieGuillotine(StrategiePlacement):
+    """
+    Placement par découpes guillotine récursives.
+
+    La zone utile est partagée récursivement par des coupes verticales ou
+    horizontales placées sur des motifs normaux (combinaisons de pas de PCB),
+    chaque sous-zone recevant la meilleure grille d'une orientation. Les
+    résultats des sous-zones sont mémoïsés par programmation dynamique, et
+    une sous-zone n'est plus découpée dès qu'elle atteint sa borne de surface.
+    Le résultat n'est jamais inférieur à celui de l'heuristique.
+
+    L'espacement est pris en compte en agrandissant PCB et zone utile d'un
+    espacement : deux PCB adjacents sont alors toujours séparés d'un espacement,
+    sans en perdre un contre la bordure. Positions et pas sont en micromètres
+    entiers : les coupes tombent exactement sur les motifs.
+    """
+    nom = 'guillotine'
+
+    def __init__(self, motifs_max: int = 300):
+        self.motifs_max = motifs_max
+
+    def parametres(self) -> dict:
+        return {'motifs_max': self.motifs_max}
+
+    def chercher(self, placement: PlacementPCB) -> Tuple[int, float, Optional[dict]]:
+        pcb = placement.pcb_prototype
+        _, _, largeur, hauteur, espacement = placement.zone_microns()
+        largeur += espacement
+        hauteur += espacement
+        largeur_pcb = microns(pcb.largeur)
+        hauteur_pcb = microns(pcb.hauteur)
+
+        # La grille + bande de l'heuristique est aussi un motif guillotine :
+        # elle sert de solution de repli si la recherche ne fait pas mieux.
+        heuristique = StrategieHeuristique().chercher(placement)
+
+        orientations = [(largeur_pcb + espacement, hauteur_pcb + espacement, 0)]
+        if placement.allow_rotation and largeur_pcb != hauteur_pcb:
+            orientations.append((hauteur_pcb + espacement, largeur_pcb + espacement, 1))
+        if largeur <= 0 or hauteur <= 0 or any(p <= 0 for o in orientations for p in o[:2]):
+            return self._repli(heuristique)
+
+        xs = _motifs_normaux(largeur, sorted({o[0] for o in orientations}), self.motifs_max)
+        ys = _motifs_normaux(hauteur, sorted({o[1] for o in orientations}), self.motifs_max)
+        X = np.array(xs, dtype=np.int64)
+        Y = np.array(ys, dtype=np.int64)
+
+        # Grilles homogènes de chaque sous-zone et borne supérieure par la surface
+        grilles = [np.outer(X // pl, Y // ph) for pl, ph, _ in orientations]
+        orientation_grille = np.argmax(np.stack(grilles), axis=0)
+        nombre = np.max(np.stack(grilles), axis=0)
+        borne = np.outer(X, Y) // (orientations[0][0] * orientations[0][1])
+
+        # Coupes possibles : indice de la coupe et indice de la zone restante
+        coupes_x = _coupes(xs)
+        coupes_y = _coupes(ys)
+
+        # decision[i, j] : 0 grille, 1 coupe verticale, 2 coupe horizontale ; coupe[i, j] : indice de la coupe
+        decision = np.zeros(nombre.shape, dtype=np.int8)
+        coupe = np.zeros(nombre.shape, dtype=np.int32)
+
+        for i in range(1, len(xs)):
+            ks, restes = coupes_x[i]
+            if len(ks):
+                valeurs = nombre[ks] + nombre[restes]
+                meilleures = np.argmax(valeurs, axis=0)
+                verticales = valeurs[meilleures, np.arange(len(ys))]
+                mieux = verticales > nombre[i]
+                nombre[i, mieux] = verticales[mieux]
+                decision[i, mieux] = 1
+                coupe[i, mieux] = ks[meilleures[mieux]]
+
+            ligne = nombre[i]
+            for j in range(1, len(ys)):
+                ks, restes = coupes_y[j]
+                if not len(ks) or ligne[j] >= borne[i, j]:
+                    continue
+                valeurs = ligne[ks] + ligne[restes]
+                meilleure = int(np.argmax(valeurs))
+                if valeurs[meilleure] > ligne[j]:
+                    ligne[j] = valeurs[meilleure]
+                    decision[i, j] = 2
+                    coupe[i, j] = ks[meilleure]
+
+        nombre_pcb = int(nombre[-1, -1])
+        if nombre_pcb <= heuristique[0]:
+            return self._repli(heuristique)
+
+        arbre = self._arbre(decision, coupe, orientation_grille, xs, ys, len(xs) - 1, len(ys) - 1, orientations)
+        return nombre_pcb, nombre_pcb * pcb.largeur * pcb.hauteur, {'arbre': arbre}
+
+    @staticmethod
+    def _repli(heuristique: Tuple[int, float, Optional[dict]]) -> Tuple[int, float, Optional[dict]]:
+        nombre_pcb, surface_occupee, configuration = heuristique
+        if configuration is None:
+            return heuristique
+        return nombre_pcb, surface_occupee, {'heuristique': configuration}
+
+    def _arbre(self, decision, coupe, orientation_grille, xs, ys, i, j, orientations) -> list:
+        """
+        Reconstruit l'arbre de découpe de la zone xs[i] x ys[j] :
+        ['grille', orientation, colonnes, rangées], ['v', x, gauche, droite]
+        ou ['h', y, bas, haut], x et y en micromètres.
+        """
+        if decision[i, j] == 0:
+            pas_largeur, pas_hauteur, orientation = orientations[orientation_grille[i, j]]
+            return ['grille', orientation, xs[i] // pas_largeur, ys[j] // pas_hauteur]
+
+        k = int(coupe[i, j])
+        if decision[i, j] == 1:
+            reste = bisect_right(xs, xs[i] - xs[k]) - 1
+            return ['v', xs[k], self._arbre(decision, coupe, orientation_grille, xs, ys, k, j, orientations),
+                    self._arbre(decision, coupe, orientation_grille, xs, ys, reste, j, orientations)]
+
+        reste = bisect_right(ys, ys[j] - ys[k]) - 1
+        return ['h', ys[k], self._arbre(decision, coupe, orientation_grille, xs, ys, i, k, orientations),
+                self._arbre(decision, coupe, orientation_grille, xs, ys, i, reste, orientations)]
+
+    def placer(self, placement: PlacementPCB, configuration: dict):
+        if 'heuristique' in configuration:
+            StrategieHeuristique().placer(placement, configuration['heuristique'])
+            return
+        placement.rectangles = []
+        pcb = placement.pcb_prototype.copy()
+        pcb_rot = pcb.copy()
+        pcb_rot.rotate()
+        x0, y0, _, _, _ = placement.zone_microns()
+        self._placer_arbre(placement, configuration['arbre'], x0, y0, (pcb, pcb_rot))
+
+    def _placer_arbre(self, placement: PlacementPCB, arbre: list, x0: int, y0: int, pcbs: Tuple[RectanglePCB, RectanglePCB]):
+        if arbre[0] == 'v':
+            self._placer_arbre(placement, arbre[2], x0, y0, pcbs)
+            self._placer_arbre(placement, arbre[3], x0 + arbre[1], y0, pcbs)
+        elif arbre[0] == 'h':
+            self._placer_arbre(placement, arbre[2], x0, y0, pcbs)
+            self._placer_arbre(placement, arbre[3], x0, y0 + arbre[1], pcbs)
+        else:
+            _, orientation, colonnes, rangees = arbre
+            pcb = pcbs[orientation]
+            espacement = placement.zone_microns()[4]
+            pas_largeur = microns(pcb.largeur) + espacement
+            pas_hauteur = microns(pcb.hauteur) + espacement
+            for i in range(colonnes):
+                for j in range(rangees):
+                    x = (x0 + i * pas_largeur) / MICRONS_PAR_MM
+                    y = (y0 + j * pas_hauteur) / MICRONS_PAR_MM
+                    placement.rectangles.append(RectanglePCB(pcb.largeur, pcb.hauteur, x, y, rotation=pcb.rotation))
+
+    def permuter(self, configuration: dict) -> dict:
+        if 'heuristique' in configuration:
+            return {'heuristique': StrategieHeuristique().permuter(configuration['heuristique'])}
+        return {'arbre': self._permuter_arbre(configuration['arbre'])}
+
+    def _permuter_arbre(self, arbre: list) -> list:
+        if arbre[0] == 'grille':
+            return ['grille', 1 - arbre[1], arbre[2], arbre[3]]
+        return [arbre[0], arbre[1], self._permuter_arbre(arbre[2]), self._permuter_arbre(arbre[3])]
@@ -0,0 +1,185 @@
+"""
+Instrumentation facultative : durée des imports, chronomètres et compteurs
+des étapes du calcul et de l'affichage, profilage cProfile.
+
+Activée par la variable d'environnement PANELISATION_PROFIL=1, lue au premier
+import de ce module, ou par activer(), qu'appellent main.py et cli.py pour
+l'option --profil. Désactivée, elle ne coûte rien : les méthodes décorées par
+chronometrer() restent les fonctions d'origine, jusqu'à un éventuel appel à
+activer().
+
+Avec PANELISATION_CPROFILE=fichier.prof, le fil principal est profilé par
+cProfile et les statistiques sont écrites dans ce fichier à la sortie
+(lisibles avec python -m pstats fichier.prof).
+"""
+import atexit
+import functools
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+# Activé par la variable d'environnement PANELISATION_PROFIL=1, ou par activer()
+ACTIF = os.environ.get('PANELISATION_PROFIL', '') not in ('', '0')
+
+# Fichier des statistiques cProfile, écrit à la sortie
+FICHIER_CPROFILE = os.environ.get('PANELISATION_CPROFILE') or None
+
+# Durée (s) et nombre de modules chargés par import mesuré, dans l'ordre
+imports = []
+
+# Nom de l'étape -> [nombre d'appels, durée totale (s), durée maximale (s)]
+mesures = {}
+
+# Nom du compteur -> valeur
+compteurs = {}
+
+# Les placements sont calculés dans les threads du pool
+_verrou = threading.Lock()
+
+# (fonction, nom, detail) décorées avant activation, enveloppées par activer()
+_differees = []
+
+
+def activer():
+    """
+    Active l'instrumentation après l'import des modules instrumentés (option
+    --profil). Les méthodes déjà décorées par chronometrer() sont remplacées
+    dans leur classe par leur version chronométrée.
+    """
+    global ACTIF
+    if ACTIF:
+        return
+    ACTIF = True
+    for fonction, nom, detail in _differees:
+        proprietaire = sys.modules.get(fonction.__module__)
+        *classes, attribut = fonction.__qualname__.split('.')
+        for classe in classes:
+            proprietaire = getattr(proprietaire, classe, None)
+        if proprietaire is not None and getattr(proprietaire, attribut, None) is fonction:
+            setattr(proprietaire, attribut, _chronometree(fonction, nom, detail))
+    _differees.clear()
+
+
+@contextmanager
+def mesurer_import(nom: str):
+    """
+    Mesure la durée d'un import et le nombre de modules qu'il charge.
+    Sans effet si l'instrumentation est désactivée.
+    """
+    if not ACTIF:
+        yield
+        return
+    modules_avant = len(sys.modules)
+    debut = time.perf_counter()
+    try:
+        yield
+    finally:
+        duree = time.perf_counter() - debut
+        imports.append((nom, duree, len(sys.modules) - modules_avant))
+        journaliser(f"import {nom} : {duree * 1000:.1f} ms ({len(sys.modules) - modules_avant} modules)")
+
+
+def journaliser(message: str):
+    """
+    Écrit un message d'instrumentation sur la sortie d'erreur.
+    """
+    if ACTIF:
+        print(f"[panelisation] {message}", file=sys.stderr)
+
+
+def rapport_imports() -> str:
+    """
+    Retourne le récapitulatif des imports mesurés, du plus coûteux au moins coûteux.
+    """
+    lignes = [f"{'Module':<40}{'Durée (ms)':>12}{'Modules':>10}"]
+    for nom, duree, modules in sorted(imports, key=lambda i: i[1], reverse=True):
+        lignes.append(f"{nom:<40}{duree * 1000:>12.1f}{modules:>10}")
+    return "\n".join(lignes)
+
+
+def chronometrer(nom: str, detail: bool = True):
+    """
+    Décorateur mesurant la durée de chaque appel de la fonction sous le nom
+    donné. Avec detail, chaque appel est aussi journalisé ; sinon seul le
+    cumul figure dans le rapport (étapes appelées très souvent).
+    Sans instrumentation, la fonction est retournée telle quelle, et
+    enveloppée plus tard si activer() est appelée.
+    """
+    def decorateur(fonction):
+        if not ACTIF:
+            _differees.append((fonction, nom, detail))
+            return fonction
+        return _chronometree(fonction, nom, detail)
+    return decorateur
+
+
+def _chronometree(fonction, nom: str, detail: bool):
+    @functools.wraps(fonction)
+    def chronometree(*args, **kwargs):
+        debut = time.perf_counter()
+        try:
+            return fonction(*args, **kwargs)
+        finally:
+            duree = time.perf_counter() - debut
+            enregistrer(nom, duree)
+            if detail:
+                journaliser(f"{nom} : {duree * 1000:.1f} ms")
+    return chronometree
+
+
+def enregistrer(nom: str, duree: float):
+    """
+    Ajoute une durée (s) aux mesures de l'étape.
+    """
+    with _verrou:
+        mesure = mesures.setdefault(nom, [0, 0.0, 0.0])
+        mesure[0] += 1
+        mesure[1] += duree
+        mesure[2] = max(mesure[2], duree)
+
+
+def compter(nom: str, nombre: int = 1):
+    """
+    Incrémente un compteur. Sans effet si l'instrumentation est désactivée.
+    """
+    if ACTIF:
+        with _verrou:
+            compteurs[nom] = compteurs.get(nom, 0) + nombre
+
+
+def rapport_mesures() -> str:
+    """
+    Retourne le récapitulatif des étapes chronométrées, de la plus coûteuse
+    à la moins coûteuse, suivi des compteurs.
+    """
+    lignes = [f"{'Étape':<40}{'Appels':>8}{'Total (ms)':>12}{'Moyenne (ms)':>14}{'Max (ms)':>10}"]
+    with _verrou:
+        for nom, (nombre, total, maximum) in sorted(mesures.items(), key=lambda m: m[1][1], reverse=True):
+            lignes.append(f"{nom:<40}{nombre:>8}{total * 1000:>12.1f}{total * 1000 / nombre:>14.2f}{maximum * 1000:>10.1f}")
+        for nom, valeur in sorted(compteurs.items()):
+            lignes.append(f"{nom:<40}{valeur:>8}")
+    return "\n".join(lignes)
+
+
+def demarrer_profilage(fichier: str = None):
+    """
+    Profile le fil principal avec cProfile et écrit les statistiques dans le
+    fichier à la sortie du programme. Par défaut, le fichier est celui de
+    PANELISATION_CPROFILE ; sans fichier, ne fait rien. Les threads du pool de
+    calcul ne sont pas profilés : leurs placements figurent dans les mesures.
+    """
+    fichier = fichier or FICHIER_CPROFILE
+    if not fichier:
+        return
+    import cProfile
+    profileur = cProfile.Profile()
+
+    def ecrire():
+        profileur.disable()
+        profileur.dump_stats(fichier)
+        journaliser(f"profil cProfile écrit dans {fichier}")
+
+    atexit.register(ecrire)
+    profileur.enable()
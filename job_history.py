@@ -0,0 +1,275 @@
+"""
+Historique persistant des travaux calculés, dans une base sqlite locale.
+
+Chaque travail enregistre ses entrées (PCB, format et bordures du panneau,
+espacement, rotation, stratégie, tolérance), la configuration retenue et
+ses chiffres de production, sur une seule ligne par clé : un travail
+recalculé ou dont la quantité change remplace sa ligne. Les longueurs sont
+rangées en micromètres entiers, comme les clés de CachePlacement : un
+travail déjà calculé est retrouvé exactement, et son placement restauré
+sans recalcul.
+
+Un index sur le format du panneau puis les dimensions du PCB sert aussi à
+chercher les PCB les plus proches déjà panélisés sur un format. Les
+écritures sont regroupées en lots, validés ensemble : un grand lot de
+travaux n'attend pas le disque à chaque ligne.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import List, Optional
+
+from logic import MICRONS_PAR_MM, PlacementPCB, microns, microns_inf
+
+# Base utilisée par l'interface : variable d'environnement PANELISATION_HISTORIQUE,
+# sinon un fichier du dossier personnel
+CHEMIN_DEFAUT = os.environ.get('PANELISATION_HISTORIQUE') or \
+    os.path.join(os.path.expanduser('~'), '.panelisation_historique.sqlite')
+
+# Colonnes de la clé d'un travail, dans l'ordre de HistoriqueTravaux.cle
+COLONNES_CLE = ('largeur_panneau', 'hauteur_panneau', 'largeur', 'hauteur', 'bordure_gauche', 'bordure_droite',
+                'bordure_bas', 'bordure_haut', 'zones', 'espacement', 'allow_rotation', 'strategie', 'parametres', 'tolerance')
+
+COLONNES = ('date', 'reference') + COLONNES_CLE + (
+    'nombre_total_pcb', 'nombre_pcb', 'surface_occupee', 'configuration', 'resultat')
+
+_CONDITION_CLE = ' AND '.join(f'{nom} = ?' for nom in COLONNES_CLE)
+
+# Un travail déjà enregistré avec la même clé est mis à jour
+_INSERTION = (
+    f"INSERT INTO travaux ({', '.join(COLONNES)}) VALUES ({', '.join('?' * len(COLONNES))}) "
+    f"ON CONFLICT ({', '.join(COLONNES_CLE)}) DO UPDATE SET "
+    + ', '.join(f'{nom} = excluded.{nom}' for nom in COLONNES if nom not in COLONNES_CLE)
+)
+
+# Longueurs rangées en micromètres, rendues en mm
+_COLONNES_MICRONS = ('largeur_panneau', 'hauteur_panneau', 'largeur', 'hauteur', 'bordure_gauche',
+                     'bordure_droite', 'bordure_bas', 'bordure_haut', 'espacement', 'tolerance')
+
+
+def _mm(valeur: int) -> float:
+    return valeur / MICRONS_PAR_MM
+
+
+class HistoriqueTravaux:
+    """
+    Historique des travaux, dans une base sqlite (un chemin de fichier, ou
+    ':memory:').
+
+    Les travaux ajoutés sont gardés en attente et insérés par lots de
+    TAILLE_LOT_ECRITURE, validés en une transaction ; enregistrer() ou
+    fermer() valide ceux qui restent. Les recherches voient aussi les
+    travaux en attente. Un travail déjà enregistré avec la même clé est
+    remplacé ; un travail restauré puis ajouté à nouveau avec la
+    même quantité et la même référence n'est pas enregistré une seconde fois.
+
+    L'historique peut être partagé entre threads : les accès à la base sont
+    protégés par un verrou.
+    """
+    TAILLE_LOT_ECRITURE = 256
+
+    def __init__(self, chemin: str = CHEMIN_DEFAUT):
+        self.chemin = chemin
+        self._connexion = sqlite3.connect(chemin, check_same_thread=False)
+        self._en_attente: List[tuple] = []
+        self._non_valides = 0
+        self._verrou = threading.RLock()
+        # Clé -> (nombre_total_pcb, reference) des travaux restaurés
+        self._restaures = {}
+        self.repris = 0
+
+        self._connexion.execute(
+            "CREATE TABLE IF NOT EXISTS travaux ("
+            "id INTEGER PRIMARY KEY, date REAL, reference TEXT, "
+            "largeur_panneau INTEGER, hauteur_panneau INTEGER, largeur INTEGER, hauteur INTEGER, "
+            "bordure_gauche INTEGER, bordure_droite INTEGER, bordure_bas INTEGER, bordure_haut INTEGER, "
+            "zones TEXT, espacement INTEGER, allow_rotation INTEGER, strategie TEXT, parametres TEXT, "
+            "tolerance INTEGER, nombre_total_pcb INTEGER, nombre_pcb INTEGER, surface_occupee REAL, "
+            "configuration TEXT, resultat TEXT)"
+        )
+        self._migrer()
+        self._connexion.execute(
+            "CREATE INDEX IF NOT EXISTS travaux_format ON travaux (largeur_panneau, hauteur_panneau, largeur, hauteur)"
+        )
+        self._connexion.execute(f"CREATE UNIQUE INDEX IF NOT EXISTS travaux_cle ON travaux ({', '.join(COLONNES_CLE)})")
+        self._connexion.commit()
+
+    def _migrer(self):
+        # Bases écrites avant la colonne des paramètres de stratégie et
+        # l'unicité des clés : les lignes de la stratégie guillotine, sans
+        # paramètres connus, ne sont plus retrouvées ; seule la dernière ligne
+        # de chaque clé est gardée
+        colonnes = {ligne[1] for ligne in self._connexion.execute("PRAGMA table_info(travaux)")}
+        if 'parametres' in colonnes:
+            return
+        self._connexion.execute("ALTER TABLE travaux ADD COLUMN parametres TEXT")
+        self._connexion.execute("UPDATE travaux SET parametres = CASE strategie WHEN 'guillotine' THEN NULL ELSE '' END")
+        self._connexion.execute(
+            f"DELETE FROM travaux WHERE parametres IS NOT NULL AND id NOT IN "
+            f"(SELECT max(id) FROM travaux GROUP BY {', '.join(COLONNES_CLE)})"
+        )
+
+    @staticmethod
+    def cle(placement: PlacementPCB) -> tuple:
+        """
+        Clé d'un travail, en micromètres entiers, avec les paramètres de sa
+        stratégie (motifs_max de la guillotine). Avec la rotation autorisée,
+        sur un panneau standard, un PCB l x h est rangé comme h x l (l > h),
+        comme dans CachePlacement.
+        """
+        panneau = placement.panneau
+        largeur = microns(placement.pcb_prototype.largeur)
+        hauteur = microns(placement.pcb_prototype.hauteur)
+        if placement.allow_rotation and panneau.standard and largeur > hauteur:
+            largeur, hauteur = hauteur, largeur
+        zones = json.dumps([[microns_inf(x), microns_inf(y), microns(l), microns(h)]
+                            for x, y, l, h in panneau.zones_interdites]) if panneau.zones_interdites else ''
+        parametres = placement.strategie.parametres()
+        parametres = json.dumps(parametres, sort_keys=True) if parametres else ''
+
+        return (microns_inf(panneau.largeur_totale), microns_inf(panneau.hauteur_totale), largeur, hauteur,
+                microns(panneau.bordure_gauche), microns(panneau.bordure_droite), microns(panneau.bordure_bas),
+                microns(panneau.bordure_haut), zones, microns(placement.espacement), int(bool(placement.allow_rotation)),
+                placement.strategie.nom, parametres, microns_inf(placement.tolerance))
+
+    def ajouter(self, placement: PlacementPCB, resultat: dict, nombre_total_pcb: int, reference: str = ''):
+        """
+        Ajoute un travail calculé : son placement et sa ligne de résultat.
+        """
+        cle = self.cle(placement)
+        if self._restaures.get(cle) == (nombre_total_pcb, reference):
+            return
+        ligne = (time.time(), reference) + cle + (
+            nombre_total_pcb, placement.nombre_pcb, placement.surface_occupee,
+            json.dumps(self._orienter(placement, placement.configuration)), json.dumps(resultat))
+        with self._verrou:
+            self._en_attente.append(ligne)
+            if len(self._en_attente) >= self.TAILLE_LOT_ECRITURE:
+                self.enregistrer()
+
+    def _inserer(self):
+        # Rend les travaux en attente visibles des recherches, sans les valider
+        if self._en_attente:
+            self._connexion.executemany(_INSERTION, self._en_attente)
+            self._non_valides += len(self._en_attente)
+            self._en_attente.clear()
+
+    def enregistrer(self):
+        """
+        Valide sur disque les travaux en attente.
+        """
+        with self._verrou:
+            if self._connexion is not None:
+                self._inserer()
+                if self._non_valides:
+                    self._connexion.commit()
+                    self._non_valides = 0
+
+    def fermer(self):
+        """
+        Enregistre les travaux en attente et ferme la base.
+        """
+        with self._verrou:
+            if self._connexion is not None:
+                self.enregistrer()
+                self._connexion.close()
+                self._connexion = None
+
+    @staticmethod
+    def _orienter(placement: PlacementPCB, configuration: Optional[dict]) -> Optional[dict]:
+        """
+        Configuration du PCB tel qu'il est rangé dans la clé (l'opération est
+        sa propre inverse : une rotation de 90 degrés).
+        """
+        largeur = microns(placement.pcb_prototype.largeur)
+        hauteur = microns(placement.pcb_prototype.hauteur)
+        if configuration is None or not (placement.allow_rotation and placement.panneau.standard and largeur > hauteur):
+            return configuration
+        return placement.strategie.permuter(configuration)
+
+    def _travaux(self, requete: str, parametres) -> List[dict]:
+        with self._verrou:
+            self._inserer()
+            curseur = self._connexion.execute(requete, parametres)
+            noms = [description[0] for description in curseur.description]
+            lignes = curseur.fetchall()
+
+        travaux = []
+        for ligne in lignes:
+            travail = dict(zip(noms, ligne))
+            for nom in _COLONNES_MICRONS:
+                travail[nom] = _mm(travail[nom])
+            travail['allow_rotation'] = bool(travail['allow_rotation'])
+            travail['zones'] = [tuple(_mm(v) for v in zone) for zone in json.loads(travail['zones'] or '[]')]
+            travail['parametres'] = json.loads(travail['parametres']) if travail['parametres'] else {}
+            travail['configuration'] = json.loads(travail['configuration'])
+            travail['resultat'] = json.loads(travail['resultat'])
+            if 'ecart' in travail:
+                travail['ecart'] = _mm(travail['ecart'])
+            travaux.append(travail)
+        return travaux
+
+    def retrouver(self, placement: PlacementPCB) -> Optional[dict]:
+        """
+        Travail enregistré avec les mêmes entrées que le placement, ou None.
+        Sa configuration est celle du PCB rangé dans la clé ; restaurer()
+        l'applique au placement.
+        """
+        travaux = self._travaux(f"SELECT * FROM travaux WHERE {_CONDITION_CLE}",
+                                self.cle(placement))
+        return travaux[0] if travaux else None
+
+    def restaurer(self, placement: PlacementPCB) -> bool:
+        """
+        Donne au placement le résultat du travail identique déjà enregistré,
+        sans recalcul. Retourne Faux s'il n'y en a pas.
+        """
+        cle = self.cle(placement)
+        with self._verrou:
+            self._inserer()
+            ligne = self._connexion.execute(
+                "SELECT nombre_pcb, surface_occupee, configuration, nombre_total_pcb, reference FROM travaux "
+                f"WHERE {_CONDITION_CLE}", cle
+            ).fetchone()
+            if ligne is None:
+                return False
+            nombre_pcb, surface_occupee, configuration, nombre_total_pcb, reference = ligne
+            self._restaures[cle] = (nombre_total_pcb, reference)
+            self.repris += 1
+
+        configuration = self._orienter(placement, json.loads(configuration))
+        placement.appliquer_resultat((nombre_pcb, surface_occupee, configuration))
+        return True
+
+    def plus_proches(self, largeur: float, hauteur: float, largeur_panneau: float, hauteur_panneau: float,
+                     nombre: int = 1) -> List[dict]:
+        """
+        Travaux enregistrés sur le même format de panneau dont le PCB est le
+        plus proche de largeur x hauteur, du plus proche au moins proche.
+        L'écart (mm, dans 'ecart') est le plus grand écart entre côtés, PCB
+        tourné ou non.
+
+        Seuls les PCB d'une fenêtre autour des dimensions cherchées sont lus
+        (parcours de l'index), en élargissant la fenêtre jusqu'à trouver
+        `nombre` travaux : un PCB hors de la fenêtre est plus éloigné que
+        tous ceux qui y sont.
+        """
+        l, h = microns(largeur), microns(hauteur)
+        format_panneau = (microns_inf(largeur_panneau), microns_inf(hauteur_panneau))
+        ecart = "min(max(abs(largeur - :l), abs(hauteur - :h)), max(abs(largeur - :h), abs(hauteur - :l)))"
+        fenetre = MICRONS_PAR_MM
+        while True:
+            parametres = {'lp': format_panneau[0], 'hp': format_panneau[1], 'l': l, 'h': h, 'f': fenetre,
+                          'n': nombre}
+            requete = (
+                f"SELECT *, {ecart} AS ecart FROM travaux WHERE largeur_panneau = :lp AND hauteur_panneau = :hp "
+                "AND ((largeur BETWEEN :l - :f AND :l + :f AND hauteur BETWEEN :h - :f AND :h + :f) "
+                "OR (largeur BETWEEN :h - :f AND :h + :f AND hauteur BETWEEN :l - :f AND :l + :f)) "
+                "ORDER BY ecart, id DESC LIMIT :n"
+            )
+            travaux = self._travaux(requete, parametres)
+            if len(travaux) >= nombre or fenetre > max(format_panneau):
+                return travaux
+            fenetre *= 4
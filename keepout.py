@@ -0,0 +1,182 @@
+"""
+Index spatial des zones interdites d'un panneau (rails, trous d'outillage,
+mires, languettes de séparation).
+
+Les zones sont marquées sur une grille uniforme construite une fois par
+panneau. La table des sommes cumulées de la grille donne en quatre lectures
+si un emplacement touche une cellule occupée : la plupart des emplacements
+sont ainsi déclarés libres en temps constant, et seuls ceux qui sont proches
+d'une zone lui sont comparés exactement.
+
+Zones, emplacements et marge sont comparés en micromètres entiers, comme
+dans le reste du moteur (logic.microns) : le comptage d'une grille
+(compter_grilles) et le filtrage de ses emplacements (masque) appliquent le
+même test, _empiete, et ne peuvent pas différer d'un PCB.
+"""
+from typing import Iterable, Tuple
+
+import numpy as np
+
+from logic import MICRONS_PAR_MM, _BRUIT_MICRONS, microns
+
+# Nombre de cellules de la grille sur le plus grand côté du panneau
+CELLULES = 128
+
+
+def microns_tableau(longueurs) -> np.ndarray:
+    """
+    Longueurs en mm converties en micromètres entiers, arrondies comme
+    logic.microns.
+    """
+    return np.ceil(np.asarray(longueurs, dtype=float) * MICRONS_PAR_MM - _BRUIT_MICRONS).astype(np.int64)
+
+
+def _empiete(debut, taille, marge, debut_zone, fin_zone):
+    """
+    Vrai si l'intervalle [debut, debut + taille], agrandi de la marge, empiète
+    sur [debut_zone, fin_zone] (micromètres) : des bords qui se touchent
+    n'empiètent pas.
+    """
+    return (debut - marge < fin_zone) & (debut + taille + marge > debut_zone)
+
+
+class IndexZones:
+    """
+    Grille uniforme des zones interdites (x, y, largeur, hauteur), en mm et
+    en coordonnées du panneau.
+
+    Un emplacement est interdit s'il empiète sur une zone agrandie de la
+    marge demandée (l'espacement entre PCB) : les bords peuvent se toucher.
+    Les bords des zones sont arrondis vers l'extérieur au micromètre.
+    """
+    def __init__(self, zones: Iterable[Tuple[float, float, float, float]], largeur: float, hauteur: float):
+        zones = np.array([(x, y, x + l, y + h) for x, y, l, h in zones], dtype=float).reshape(-1, 4)
+        # Bords des zones en micromètres : (x0, y0, x1, y1)
+        self.zones = np.hstack([np.floor(zones[:, :2] * MICRONS_PAR_MM + _BRUIT_MICRONS),
+                                np.ceil(zones[:, 2:] * MICRONS_PAR_MM - _BRUIT_MICRONS)]).astype(np.int64)
+
+        largeur, hauteur = microns(largeur), microns(hauteur)
+        self.taille_cellule = max(1, -(-max(largeur, hauteur) // CELLULES))
+        self.colonnes = max(1, -(-largeur // self.taille_cellule))
+        self.rangees = max(1, -(-hauteur // self.taille_cellule))
+
+        # Cellules touchées par au moins une zone, puis leurs sommes cumulées
+        occupation = np.zeros((self.colonnes, self.rangees), dtype=np.int32)
+        for x0, y0, x1, y1 in self.zones:
+            i0, i1 = self._intervalle(x0, x1, self.colonnes)
+            j0, j1 = self._intervalle(y0, y1, self.rangees)
+            occupation[i0:i1 + 1, j0:j1 + 1] = 1
+        self._cumul = np.zeros((self.colonnes + 1, self.rangees + 1), dtype=np.int32)
+        self._cumul[1:, 1:] = occupation.cumsum(axis=0).cumsum(axis=1)
+
+    def _intervalle(self, debut, fin, nombre):
+        """
+        Indices (bornés à la grille) des cellules couvrant [debut, fin],
+        en micromètres.
+        """
+        premier = np.clip(np.asarray(debut) // self.taille_cellule, 0, nombre - 1).astype(np.intp)
+        dernier = np.clip(np.asarray(fin) // self.taille_cellule, 0, nombre - 1).astype(np.intp)
+        return premier, dernier
+
+    def masque_rectangles(self, rectangles: list, marge: float = 0) -> np.ndarray:
+        """
+        Masque des RectanglePCB libres d'une liste.
+        """
+        valeurs = np.array([(r.x, r.y, r.largeur, r.hauteur) for r in rectangles], dtype=float).reshape(-1, 4)
+        return self.masque(valeurs[:, 0], valeurs[:, 1], valeurs[:, 2], valeurs[:, 3], marge)
+
+    def masque(self, x: np.ndarray, y: np.ndarray, largeur, hauteur, marge: float = 0) -> np.ndarray:
+        """
+        Masque des emplacements libres, calculé d'un bloc pour tous les
+        emplacements (largeur et hauteur scalaires ou par emplacement, en mm).
+        """
+        libres = np.ones(len(x), dtype=bool)
+        if not len(self.zones) or not len(x):
+            return libres
+
+        x, y = microns_tableau(x), microns_tableau(y)
+        largeur, hauteur = microns_tableau(largeur), microns_tableau(hauteur)
+        marge = microns(marge)
+        x0, y0 = x - marge, y - marge
+        x1, y1 = x + largeur + marge, y + hauteur + marge
+        i0, i1 = self._intervalle(x0, x1, self.colonnes)
+        j0, j1 = self._intervalle(y0, y1, self.rangees)
+        cumul = self._cumul
+        occupees = cumul[i1 + 1, j1 + 1] - cumul[i0, j1 + 1] - cumul[i1 + 1, j0] + cumul[i0, j0]
+
+        # Test exact des seuls emplacements proches d'une zone
+        proches = np.flatnonzero(occupees)
+        if len(proches):
+            zones = self.zones
+            x, y, largeur, hauteur = (np.broadcast_to(v, x.shape)[proches, None] for v in (x, y, largeur, hauteur))
+            empiete = _empiete(x, largeur, marge, zones[:, 0], zones[:, 2]) & \
+                _empiete(y, hauteur, marge, zones[:, 1], zones[:, 3])
+            libres[proches] = ~empiete.any(axis=1)
+        return libres
+
+    def compter_grilles(self, grilles: np.ndarray, marge: float = 0) -> np.ndarray:
+        """
+        Nombre d'emplacements interdits de chaque grille régulière, sans
+        construire les emplacements. grilles a une ligne par grille : x0, y0,
+        pas_x, pas_y, colonnes, rangées, largeur, hauteur, longueurs en
+        micromètres entiers ; la marge est en mm.
+
+        Les indices de colonne et de rangée qui empiètent sur une zone se
+        calculent directement depuis ses bords ; les emplacements interdits
+        d'une zone sont le produit de ses colonnes et de ses rangées, et ceux
+        de plusieurs zones sont dédoublonnés. Tout est calculé d'un bloc pour
+        toutes les grilles et toutes les zones.
+        """
+        bloques = np.zeros(len(grilles), dtype=np.int64)
+        if not len(self.zones) or not len(grilles):
+            return bloques
+
+        grilles = np.asarray(grilles, dtype=np.int64)
+        x0, y0, pas_x, pas_y, colonnes, rangees, largeur, hauteur = (grilles[:, k, None] for k in range(8))
+        marge = microns(marge)
+        zones = self.zones
+        grille_i, zone_i, i = self._indices(x0, pas_x, colonnes, largeur, marge, zones[:, 0], zones[:, 2])
+        grille_j, zone_j, j = self._indices(y0, pas_y, rangees, hauteur, marge, zones[:, 1], zones[:, 3])
+        if not len(i) or not len(j):
+            return bloques
+
+        # Produit des colonnes et des rangées de chaque couple (grille, zone)
+        nombre_couples = len(grilles) * len(zones)
+        couple_i = grille_i * len(zones) + zone_i
+        couple_j = grille_j * len(zones) + zone_j
+        n_i = np.bincount(couple_i, minlength=nombre_couples)
+        n_j = np.bincount(couple_j, minlength=nombre_couples)
+        debut_i = np.cumsum(n_i) - n_i
+        debut_j = np.cumsum(n_j) - n_j
+        produits = n_i * n_j
+        couples = np.repeat(np.arange(nombre_couples), produits)
+        rang = np.arange(len(couples)) - np.repeat(np.cumsum(produits) - produits, produits)
+        colonne = i[debut_i[couples] + rang // n_j[couples]]
+        rangee = j[debut_j[couples] + rang % n_j[couples]]
+
+        # Emplacements distincts, numérotés globalement grille par grille
+        grille = couples // len(zones)
+        tailles = (colonnes * rangees).ravel()
+        decalages = np.cumsum(tailles) - tailles
+        codes = np.unique(decalages[grille] + colonne * rangees.ravel()[grille] + rangee)
+        return np.bincount(np.searchsorted(decalages, codes, side='right') - 1, minlength=len(grilles))
+
+    @staticmethod
+    def _indices(origine, pas, nombre, taille, marge, debut_zone, fin_zone):
+        """
+        Couples (grille, zone, indice) des positions d'une grille, sur un axe,
+        qui empiètent sur l'intervalle d'une zone agrandi de la marge
+        (micromètres). Les bornes encadrent les positions candidates, que le
+        test _empiete départage.
+        """
+        premier = np.clip((debut_zone - marge - taille - origine) // pas, 0, None)
+        dernier = np.minimum(-((origine - fin_zone - marge) // pas), nombre - 1)
+        longueurs = np.maximum(dernier - premier + 1, 0).ravel()
+        total = int(longueurs.sum())
+        grille, zone = np.divmod(np.repeat(np.arange(longueurs.size), longueurs), premier.shape[1])
+        indices = premier.ravel()[grille * premier.shape[1] + zone] + \
+            np.arange(total) - np.repeat(np.cumsum(longueurs) - longueurs, longueurs)
+
+        position = origine.ravel()[grille] + indices * pas.ravel()[grille]
+        empiete = _empiete(position, taille.ravel()[grille], marge, debut_zone[zone], fin_zone[zone])
+        return grille[empiete], zone[empiete], indices[empiete]
@@ -1,10 +1,62 @@
-from math import floor, ceil
-from typing import Optional, List
+import json
+import os
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from functools import partial
+from itertools import islice
+from math import ceil, floor
+from typing import Optional, List, Tuple, Iterable, Iterator
+
+from instrumentation import chronometrer
+
+# Nombre de combinaisons envoyées à chaque processus par tâche
+TAILLE_BLOC = 2048
+
+# Formats de panneaux proposés par défaut
+PANNEAUX_LARGEURS_DEFAUT = [600, 580, 570, 457]
+PANNEAUX_HAUTEURS_DEFAUT = [500, 510, 480, 300]
+BORDURE_DEFAUT = 15
+
+# Les longueurs sont saisies en mm, mais les placements sont calculés en
+# micromètres entiers : divisions et comparaisons y sont exactes, et un PCB
+# qui tient tout juste n'est ni perdu ni accepté à tort par un arrondi.
+MICRONS_PAR_MM = 1000
+# Dépassement admis d'un PCB hors de la zone utile, en mm (négatif : marge exigée)
+TOLERANCE_AJUSTEMENT = 0.0
+# Écart au micromètre attribué à la représentation flottante d'une saisie
+_BRUIT_MICRONS = 1e-6
+
+
+def microns(longueur: float) -> int:
+    """
+    Convertit une longueur en mm en micromètres entiers, arrondie au
+    micromètre supérieur : dimensions des PCB, espacements et bordures ne
+    sont jamais sous-estimés.
+    """
+    return ceil(longueur * MICRONS_PAR_MM - _BRUIT_MICRONS)
+
+
+def microns_inf(longueur: float) -> int:
+    """
+    Convertit une longueur en mm en micromètres entiers, arrondie au
+    micromètre inférieur : dimensions des panneaux et tolérance ne sont
+    jamais surestimées. Un placement calculé reste ainsi valable pour les
+    longueurs saisies, même si elles ne tombent pas sur un micromètre.
+    """
+    return floor(longueur * MICRONS_PAR_MM + _BRUIT_MICRONS)
+
 
 class RectanglePCB:
     """
     Classe représentant un PCB avec ses dimensions, sa position et son orientation.
+
+    Sans __dict__ par instance : un placement peut compter des milliers de
+    PCB. Pour de nombreux placements en mémoire, PlacementPCB.coordonnees()
+    range les PCB par colonnes (DTYPE_PLACEMENT).
     """
+    __slots__ = ('largeur', 'hauteur', 'x', 'y', 'rotation')
+
     def __init__(self, largeur: float, hauteur: float, x: float = 0, y: float = 0, rotation: int = 0):
         self.largeur = largeur
         self.hauteur = hauteur
@@ -29,158 +81,738 @@ class RectanglePCB:
 class Panneau:
     """
     Classe représentant un panneau.
+
+    La zone utile est le panneau moins ses bordures, égales à `bordure` ou
+    données par côté (gauche, droite, bas, haut). Les zones interdites
+    (rails, trous d'outillage, mires, languettes), rectangles (x, y, largeur,
+    hauteur) en coordonnées du panneau, ne peuvent recevoir aucun PCB ; les
+    PCB en restent éloignés de l'espacement, comme entre eux.
     """
-    def __init__(self, largeur_totale: float, hauteur_totale: float, bordure: float = 15):
+    def __init__(self, largeur_totale: float, hauteur_totale: float, bordure: float = 15,
+                 bordures: Optional[Tuple[float, float, float, float]] = None,
+                 zones_interdites: Optional[List[Tuple[float, float, float, float]]] = None):
         self.largeur_totale = largeur_totale
         self.hauteur_totale = hauteur_totale
         self.bordure = bordure
+        self.bordure_gauche, self.bordure_droite, self.bordure_bas, self.bordure_haut = (
+            bordures if bordures is not None else (bordure,) * 4)
+        self.zones_interdites = list(zones_interdites or [])
+        self._index_zones = None
 
-        self.largeur = self.largeur_totale - 2 * self.bordure
-        self.hauteur = self.hauteur_totale - 2 * self.bordure
+        self.largeur = self.largeur_totale - self.bordure_gauche - self.bordure_droite
+        self.hauteur = self.hauteur_totale - self.bordure_bas - self.bordure_haut
         self.surface_utilisable = self.largeur * self.hauteur
 
+    @property
+    def standard(self) -> bool:
+        """
+        Vrai si le panneau n'a qu'une bordure uniforme, sans zone interdite.
+        """
+        return not self.zones_interdites and \
+            (self.bordure_gauche, self.bordure_droite, self.bordure_bas, self.bordure_haut) == (self.bordure,) * 4
+
+    @property
+    def index_zones(self):
+        """
+        Index spatial des zones interdites, construit au premier accès.
+        """
+        if self._index_zones is None:
+            from keepout import IndexZones
+            self._index_zones = IndexZones(self.zones_interdites, self.largeur_totale, self.hauteur_totale)
+        return self._index_zones
+
+
+class StrategiePlacement(ABC):
+    """
+    Interface d'une stratégie de placement.
+
+    Une stratégie cherche la meilleure configuration d'un PlacementPCB, puis
+    sait construire les rectangles de cette configuration. Une stratégie qui
+    ne définit pas chercher, placer et permuter ne peut pas être créée.
+    """
+    nom = ''
+
+    @abstractmethod
+    def chercher(self, placement: 'PlacementPCB') -> Tuple[int, float, Optional[dict]]:
+        """
+        Retourne (nombre_pcb, surface_occupee, configuration) pour le placement.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def placer(self, placement: 'PlacementPCB', configuration: dict):
+        """
+        Remplace placement.rectangles par les PCB de la configuration.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def permuter(self, configuration: dict) -> dict:
+        """
+        Retourne la configuration équivalente pour le PCB tourné de 90 degrés.
+        """
+        raise NotImplementedError
+
+    def parametres(self) -> dict:
+        """
+        Paramètres de la stratégie qui changent son résultat (aucun par défaut).
+        """
+        return {}
+
+    def candidats(self, placement: 'PlacementPCB') -> List[dict]:
+        """
+        Configurations évaluées, une fois retirés les PCB qui empiètent sur
+        une zone interdite, quand le panneau en a. Par défaut, la meilleure
+        configuration sans zones.
+        """
+        configuration = self.chercher(placement)[2]
+        return [] if configuration is None else [configuration]
+
+
+class StrategieHeuristique(StrategiePlacement):
+    """
+    Stratégie par défaut : grille principale complétée par une bande de PCB
+    rotés, avec au plus une colonne ou une rangée retirée (six configurations).
+    """
+    nom = 'heuristique'
+
+    def chercher(self, placement: 'PlacementPCB') -> Tuple[int, float, Optional[dict]]:
+        return placement._chercher_meilleure_configuration()
+
+    def placer(self, placement: 'PlacementPCB', configuration: dict):
+        placement.calculer_placement(cas=configuration['cas'], retrait=configuration['retrait'])
+
+    def permuter(self, configuration: dict) -> dict:
+        return {'cas': 3 - configuration['cas'], 'retrait': configuration['retrait']}
+
+    def candidats(self, placement: 'PlacementPCB') -> List[dict]:
+        return placement.configurations()
+
 
 class PlacementPCB:
     """
     Classe gérant le placement des PCB sur un panneau.
+
+    Un PCB tient si son bord dépasse au plus de `tolerance` (mm) la zone
+    utile ; les calculs sont faits en micromètres entiers (voir microns).
     """
-    def __init__(self, panneau: Panneau, pcb_prototype: RectanglePCB, espacement: float = 0, allow_rotation: bool = True):
+    def __init__(self, panneau: Panneau, pcb_prototype: RectanglePCB, espacement: float = 0, allow_rotation: bool = True,
+                 cache: Optional['CachePlacement'] = None, strategie: Optional[StrategiePlacement] = None,
+                 tolerance: float = TOLERANCE_AJUSTEMENT):
         self.panneau = panneau
         self.pcb_prototype = pcb_prototype
         self.espacement = espacement
         self.allow_rotation = allow_rotation
-        self.rectangles: List[RectanglePCB] = []
+        self.cache = cache
+        self.strategie = strategie if strategie is not None else StrategieHeuristique()
+        self.tolerance = tolerance
+        self._microns: Optional[Tuple[int, int, int, int, int]] = None
+        self._rectangles: Optional[List[RectanglePCB]] = []
+        self.configuration: Optional[dict] = None
         self.surface_occupee: float = 0
         self.nombre_pcb: int = 0
 
-    def calculer_meilleur_placement(self):
+    @property
+    def rectangles(self) -> List[RectanglePCB]:
         """
-        Calcule le meilleur placement possible.
+        Rectangles de la meilleure configuration, construits au premier accès.
         """
-        meilleures_rectangles = []
-        max_pcb = 0
-        max_surface_occupee = 0
+        if self._rectangles is None:
+            self._rectangles = []
+            if self.configuration is not None:
+                self.strategie.placer(self, self.configuration)
+                if self.panneau.zones_interdites:
+                    libres = self.panneau.index_zones.masque_rectangles(self._rectangles, self.espacement)
+                    self._rectangles = [r for r, libre in zip(self._rectangles, libres) if libre]
+        return self._rectangles
+
+    @rectangles.setter
+    def rectangles(self, rectangles: List[RectanglePCB]):
+        self._rectangles = rectangles
+
+    def zone_microns(self) -> Tuple[int, int, int, int, int]:
+        """
+        Zone utile en micromètres : origine x et y, largeur et hauteur admises
+        (tolérance comprise), et espacement. Calculée au premier appel.
+        """
+        if self._microns is None:
+            panneau = self.panneau
+            x0 = microns(panneau.bordure_gauche)
+            y0 = microns(panneau.bordure_bas)
+            tolerance = microns_inf(self.tolerance)
+            self._microns = (x0, y0, microns_inf(panneau.largeur_totale) - x0 - microns(panneau.bordure_droite) + tolerance,
+                             microns_inf(panneau.hauteur_totale) - y0 - microns(panneau.bordure_haut) + tolerance,
+                             microns(self.espacement))
+        return self._microns
+
+    @chronometrer('PlacementPCB.coordonnees', detail=False)
+    def coordonnees(self):
+        """
+        Retourne les coordonnées de la meilleure configuration sous forme de
+        tableau NumPy structuré (x, y, largeur, hauteur, rotation).
+        """
+        from placement_array import calculer_coordonnees
+        return calculer_coordonnees(self)
 
+    def configurations(self) -> List[dict]:
+        """
+        Retourne les configurations candidates (cas de rotation et retrait).
+        """
+        configurations = [
+            {'cas': 1, 'retrait': None},
+            {'cas': 1, 'retrait': 'colonne'},
+            {'cas': 1, 'retrait': 'rangée'},
+        ]
         if self.allow_rotation:
-            configurations = [
-                {'cas': 1, 'retrait': None},
-                {'cas': 1, 'retrait': 'colonne'},
-                {'cas': 1, 'retrait': 'rangée'},
+            configurations += [
                 {'cas': 2, 'retrait': None},
                 {'cas': 2, 'retrait': 'colonne'},
                 {'cas': 2, 'retrait': 'rangée'},
             ]
+        return configurations
+
+    @chronometrer('PlacementPCB.calculer_meilleur_placement', detail=False)
+    def calculer_meilleur_placement(self):
+        """
+        Calcule le meilleur placement possible.
+
+        Seuls les nombres de PCB sont évalués pour chaque configuration ; les
+        rectangles de la configuration retenue sont construits à la demande
+        via la propriété ``rectangles``. La recherche est déléguée à la
+        stratégie ; si un cache est fourni, le résultat y est lu ou enregistré
+        (panneaux à bordure uniforme sans zone interdite seulement).
+        """
+        if self.panneau.zones_interdites:
+            resultat = self._chercher_hors_zones()
+        elif self.cache is None or not self.panneau.standard:
+            resultat = self.strategie.chercher(self)
         else:
-            configurations = [
-                {'cas': 1, 'retrait': None},
-                {'cas': 1, 'retrait': 'colonne'},
-                {'cas': 1, 'retrait': 'rangée'},
-            ]
+            resultat = self.cache.calculer(self)
+        self.appliquer_resultat(resultat)
+
+    def appliquer_resultat(self, resultat: Tuple[int, float, Optional[dict]]):
+        """
+        Retient (nombre_pcb, surface_occupee, configuration) comme meilleur
+        placement, calculé ici ou relu (cache, historique des travaux).
+        """
+        self.nombre_pcb, self.surface_occupee, self.configuration = resultat
+        self._rectangles = None
+
+    def borne_superieure(self) -> int:
+        """
+        Majorant du nombre de PCB, valable pour toutes les stratégies : chaque
+        PCB occupe, avec son espacement, (largeur + e) x (hauteur + e) dans la
+        zone utile agrandie d'un espacement. Vaut 0 si le PCB ne tient dans
+        aucune orientation.
+        """
+        _, _, largeur, hauteur, espacement = self.zone_microns()
+        largeur_pcb = microns(self.pcb_prototype.largeur)
+        hauteur_pcb = microns(self.pcb_prototype.hauteur)
+        tient = largeur_pcb <= largeur and hauteur_pcb <= hauteur
+        if self.allow_rotation:
+            tient = tient or (hauteur_pcb <= largeur and largeur_pcb <= hauteur)
+        if not tient:
+            return 0
 
-        for config in configurations:
-            self.rectangles.clear()
-            self.calculer_placement(cas=config['cas'], retrait=config['retrait'])
+        return (largeur + espacement) * (hauteur + espacement) // ((largeur_pcb + espacement) * (hauteur_pcb + espacement))
+
+    def _chercher_hors_zones(self) -> Tuple[int, float, Optional[dict]]:
+        """
+        Évalue les configurations candidates de la stratégie sur un panneau à
+        zones interdites, PCB empiétant sur une zone exclus.
+        """
+        from placement_array import compter_hors_zones
+        configurations = self.strategie.candidats(self)
+        meilleur = (0, 0, None)
+        for configuration, (nombre_pcb, surface_occupee) in zip(configurations, compter_hors_zones(self, configurations)):
+            if nombre_pcb > meilleur[0] or (nombre_pcb == meilleur[0] and surface_occupee > meilleur[1]):
+                meilleur = (nombre_pcb, surface_occupee, configuration)
+        return meilleur
+
+    def _chercher_meilleure_configuration(self) -> Tuple[int, float, Optional[dict]]:
+        meilleure_configuration = None
+        max_pcb = 0
+        max_surface_occupee = 0
 
-            nombre_pcb = len(self.rectangles)
-            surface_occupee = sum(rect.largeur * rect.hauteur for rect in self.rectangles)
+        for config in self.configurations():
+            nombre_pcb, surface_occupee = self.compter_placement(cas=config['cas'], retrait=config['retrait'])
 
             if nombre_pcb > max_pcb or (nombre_pcb == max_pcb and surface_occupee > max_surface_occupee):
                 max_pcb = nombre_pcb
                 max_surface_occupee = surface_occupee
-                meilleures_rectangles = self.rectangles.copy()
+                meilleure_configuration = config
 
-        self.rectangles = meilleures_rectangles
-        self.nombre_pcb = max_pcb
-        self.surface_occupee = max_surface_occupee
+        return max_pcb, max_surface_occupee, meilleure_configuration
 
-    def calculer_placement(self, cas: int = 1, retrait: Optional[str] = None):
+    def compter_placement(self, cas: int = 1, retrait: Optional[str] = None) -> Tuple[int, float]:
         """
-        Calcule le placement pour une configuration donnée.
+        Calcule le nombre de PCB et la surface occupée d'une configuration
+        sans construire les rectangles.
         """
         pcb = self.pcb_prototype.copy()
 
         if cas == 2:
             pcb.rotate()
 
-        N_largeur = floor((self.panneau.largeur + self.espacement) / (pcb.largeur + self.espacement))
-        N_hauteur = floor((self.panneau.hauteur + self.espacement) / (pcb.hauteur + self.espacement))
+        N_largeur, N_hauteur = self._grille(pcb, retrait)
+        nombre_pcb = N_largeur * N_hauteur
+
+        if self.allow_rotation:
+            pcb_rot = pcb.copy()
+            pcb_rot.rotate()
+            x_origine, y_origine, largeur, hauteur, espacement = self.zone_microns()
+            largeur_rot = microns(pcb_rot.largeur)
+            hauteur_rot = microns(pcb_rot.hauteur)
+            for N_largeur_rot, N_hauteur_rot, x0, y0 in self._bandes_rotees(pcb, pcb_rot, retrait, N_largeur, N_hauteur):
+                nombre_pcb += (
+                    _compter_positions(N_largeur_rot, x0, largeur_rot + espacement, largeur_rot, x_origine + largeur)
+                    * _compter_positions(N_hauteur_rot, y0, hauteur_rot + espacement, hauteur_rot, y_origine + hauteur)
+                )
+
+        return nombre_pcb, nombre_pcb * pcb.largeur * pcb.hauteur
+
+    def _grille(self, pcb: RectanglePCB, retrait: Optional[str]) -> Tuple[int, int]:
+        """
+        Calcule le nombre de colonnes et de rangées de la grille principale.
+        """
+        _, _, largeur, hauteur, espacement = self.zone_microns()
+        N_largeur = (largeur + espacement) // (microns(pcb.largeur) + espacement)
+        N_hauteur = (hauteur + espacement) // (microns(pcb.hauteur) + espacement)
 
         if retrait == 'colonne' and N_largeur > 0:
             N_largeur -= 1
         elif retrait == 'rangée' and N_hauteur > 0:
             N_hauteur -= 1
 
-        largeur_occupee = N_largeur * pcb.largeur + max(0, N_largeur - 1) * self.espacement
-        hauteur_occupee = N_hauteur * pcb.hauteur + max(0, N_hauteur - 1) * self.espacement
+        return N_largeur, N_hauteur
 
-        R_largeur = self.panneau.largeur - largeur_occupee
-        R_hauteur = self.panneau.hauteur - hauteur_occupee
+    def _bandes_rotees(self, pcb, pcb_rot, retrait, N_largeur, N_hauteur):
+        """
+        Retourne les bandes de PCB rotés (colonnes, rangées, origine x, origine y)
+        qui complètent la grille principale, origines en micromètres.
+        """
+        offset_x, offset_y, largeur, hauteur, espacement = self.zone_microns()
+        pas_largeur = microns(pcb.largeur) + espacement
+        pas_hauteur = microns(pcb.hauteur) + espacement
+        largeur_rot = microns(pcb_rot.largeur)
+        hauteur_rot = microns(pcb_rot.hauteur)
+        x_bande = offset_x + N_largeur * pas_largeur
+        y_bande = offset_y + N_hauteur * pas_hauteur
 
-        offset_x = self.panneau.bordure
-        offset_y = self.panneau.bordure
+        if retrait == 'colonne':
+            return [(
+                (largeur - N_largeur * pas_largeur + espacement) // (largeur_rot + espacement),
+                (hauteur + espacement) // (hauteur_rot + espacement),
+                x_bande, offset_y,
+            )]
+
+        if retrait == 'rangée':
+            return [(
+                (largeur + espacement) // (largeur_rot + espacement),
+                (hauteur - N_hauteur * pas_hauteur + espacement) // (hauteur_rot + espacement),
+                offset_x, y_bande,
+            )]
+
+        R_largeur = largeur - (N_largeur * pas_largeur - espacement if N_largeur else 0)
+        R_hauteur = hauteur - (N_hauteur * pas_hauteur - espacement if N_hauteur else 0)
+
+        bandes = []
+        if R_largeur >= largeur_rot:
+            bandes.append((
+                (R_largeur + espacement) // (largeur_rot + espacement),
+                (hauteur + espacement) // (hauteur_rot + espacement),
+                x_bande, offset_y,
+            ))
+        if R_hauteur >= hauteur_rot:
+            bandes.append((
+                (largeur + espacement) // (largeur_rot + espacement),
+                (R_hauteur + espacement) // (hauteur_rot + espacement),
+                offset_x, y_bande,
+            ))
+        return bandes
+
+    def calculer_placement(self, cas: int = 1, retrait: Optional[str] = None):
+        """
+        Calcule le placement pour une configuration donnée ; ses rectangles
+        remplacent les précédents.
+        """
+        self._rectangles = []
+        pcb = self.pcb_prototype.copy()
+
+        if cas == 2:
+            pcb.rotate()
+
+        N_largeur, N_hauteur = self._grille(pcb, retrait)
+
+        offset_x, offset_y, _, _, espacement = self.zone_microns()
+        pas_largeur = microns(pcb.largeur) + espacement
+        pas_hauteur = microns(pcb.hauteur) + espacement
 
         # Placement des PCB sans rotation
         for i in range(N_largeur):
             for j in range(N_hauteur):
-                x = offset_x + i * (pcb.largeur + self.espacement)
-                y = offset_y + j * (pcb.hauteur + self.espacement)
+                x = (offset_x + i * pas_largeur) / MICRONS_PAR_MM
+                y = (offset_y + j * pas_hauteur) / MICRONS_PAR_MM
                 rect = RectanglePCB(pcb.largeur, pcb.hauteur, x, y, rotation=pcb.rotation)
                 self.rectangles.append(rect)
 
         # Placement rotés si autorisé
         if self.allow_rotation:
-            self._placer_pcb_rotes(pcb, retrait, N_largeur, N_hauteur, R_largeur, R_hauteur, offset_x, offset_y)
+            pcb_rot = pcb.copy()
+            pcb_rot.rotate()
+            for N_largeur_rot, N_hauteur_rot, x0, y0 in self._bandes_rotees(pcb, pcb_rot, retrait, N_largeur, N_hauteur):
+                self._placer_bande(pcb_rot, N_largeur_rot, N_hauteur_rot, x0, y0)
+
+    def _placer_bande(self, pcb_rot, N_largeur_rot, N_hauteur_rot, x0, y0):
+        x_origine, y_origine, largeur, hauteur, espacement = self.zone_microns()
+        largeur_rot = microns(pcb_rot.largeur)
+        hauteur_rot = microns(pcb_rot.hauteur)
+        for i in range(N_largeur_rot):
+            for j in range(N_hauteur_rot):
+                x = x0 + i * (largeur_rot + espacement)
+                y = y0 + j * (hauteur_rot + espacement)
+                if x + largeur_rot <= x_origine + largeur and y + hauteur_rot <= y_origine + hauteur:
+                    self.rectangles.append(RectanglePCB(pcb_rot.largeur, pcb_rot.hauteur, x / MICRONS_PAR_MM,
+                                                        y / MICRONS_PAR_MM, rotation=pcb_rot.rotation))
+
+
+def _compter_positions(n: int, debut: int, pas: int, taille: int, limite: int) -> int:
+    """
+    Compte les indices i de range(n) tels que debut + i * pas + taille <= limite
+    (longueurs en micromètres).
+    """
+    if n <= 0 or debut + taille > limite:
+        return 0
+    if pas <= 0:
+        return n
+    return min(n, (limite - taille - debut) // pas + 1)
+
+
+class StrategieRetraits(StrategiePlacement):
+    """
+    Recherche exhaustive du nombre de colonnes et de rangées à retirer de la
+    grille principale pour loger des PCB rotés.
+
+    Pour chaque orientation, la grille principale garde nc colonnes et nr
+    rangées ; la zone libérée en L est remplie de PCB rotés selon deux
+    découpes : bande droite sur toute la hauteur et bande haute sur la
+    largeur de la grille (disposition 1), ou l'inverse (disposition 2).
+
+    Les valeurs de nc sont parcourues avec une borne par surface : une bande
+    de largeur nc colonnes ne peut contenir plus de PCB que sa surface ne
+    le permet, ce qui élimine la plupart des retraits sans les évaluer. La
+    recherche s'arrête dès que la borne de surface du panneau est atteinte.
+    """
+    nom = 'retraits'
+
+    def chercher(self, placement: 'PlacementPCB') -> Tuple[int, float, Optional[dict]]:
+        meilleur = (0, None)
+        # Un PCB carré donne la même recherche dans les deux orientations
+        carre = placement.pcb_prototype.largeur == placement.pcb_prototype.hauteur
+        for cas in ([1, 2] if placement.allow_rotation and not carre else [1]):
+            meilleur = self._chercher_cas(placement, cas, meilleur)
+
+        nombre_pcb, configuration = meilleur
+        surface_pcb = placement.pcb_prototype.largeur * placement.pcb_prototype.hauteur
+        return nombre_pcb, nombre_pcb * surface_pcb, configuration
+
+    def _chercher_cas(self, placement: 'PlacementPCB', cas: int, meilleur: Tuple[int, Optional[dict]]) -> Tuple[int, Optional[dict]]:
+        pcb = placement.pcb_prototype.copy()
+        if cas == 2:
+            pcb.rotate()
 
-    def _placer_pcb_rotes(self, pcb, retrait, N_largeur, N_hauteur, R_largeur, R_hauteur, offset_x, offset_y):
+        _, _, largeur, hauteur, espacement = placement.zone_microns()
+        largeur += espacement
+        hauteur += espacement
+        pas_largeur = microns(pcb.largeur) + espacement
+        pas_hauteur = microns(pcb.hauteur) + espacement
+        if largeur <= 0 or hauteur <= 0 or pas_largeur <= 0 or pas_hauteur <= 0:
+            return meilleur
+
+        N_largeur = largeur // pas_largeur
+        N_hauteur = hauteur // pas_hauteur
+        borne = largeur * hauteur // (pas_largeur * pas_hauteur)
+        max_pcb, configuration = meilleur
+
+        if not placement.allow_rotation:
+            if N_largeur * N_hauteur > max_pcb:
+                return N_largeur * N_hauteur, {'cas': cas, 'colonnes': 0, 'rangees': 0, 'disposition': 1}
+            return meilleur
+
+        # Pas des PCB rotés
+        pas_largeur_rot = pas_hauteur
+        pas_hauteur_rot = pas_largeur
+        colonnes_rot_pleine = largeur // pas_largeur_rot
+        rangees_rot_pleine = hauteur // pas_hauteur_rot
+
+        for disposition in (1, 2):
+            # Disposition 1 : la boucle externe porte sur les colonnes, la bande
+            # droite est pleine hauteur. Disposition 2 : symétrique sur les rangées.
+            if disposition == 1:
+                N_externe, N_interne = N_largeur, N_hauteur
+                pas_externe, pas_interne = pas_largeur, pas_hauteur
+                longueur_externe, longueur_interne = largeur, hauteur
+                pas_externe_rot, pas_interne_rot = pas_largeur_rot, pas_hauteur_rot
+                pleine_rot = rangees_rot_pleine
+            else:
+                N_externe, N_interne = N_hauteur, N_largeur
+                pas_externe, pas_interne = pas_hauteur, pas_largeur
+                longueur_externe, longueur_interne = hauteur, largeur
+                pas_externe_rot, pas_interne_rot = pas_hauteur_rot, pas_largeur_rot
+                pleine_rot = colonnes_rot_pleine
+
+            for retrait_externe in range(N_externe + 1):
+                n_externe = N_externe - retrait_externe
+                bande_pleine = (longueur_externe - n_externe * pas_externe) // pas_externe_rot * pleine_rot
+                # Au-dessus de la grille, une bande de n_externe pas ne peut
+                # contenir plus de PCB que sa surface ne le permet.
+                if bande_pleine + n_externe * longueur_interne // pas_interne <= max_pcb:
+                    continue
+
+                colonnes_rot = n_externe * pas_externe // pas_externe_rot
+                for retrait_interne in range(N_interne + 1):
+                    n_interne = N_interne - retrait_interne
+                    nombre = (n_externe * n_interne + bande_pleine
+                              + colonnes_rot * ((longueur_interne - n_interne * pas_interne) // pas_interne_rot))
+                    if nombre > max_pcb:
+                        max_pcb = nombre
+                        configuration = {'cas': cas, 'colonnes': retrait_externe if disposition == 1 else retrait_interne,
+                                         'rangees': retrait_interne if disposition == 1 else retrait_externe,
+                                         'disposition': disposition}
+                        if max_pcb >= borne:
+                            return max_pcb, configuration
+
+        return max_pcb, configuration
+
+    def placer(self, placement: 'PlacementPCB', configuration: dict):
+        placement.rectangles = []
+        pcb = placement.pcb_prototype.copy()
+        if configuration['cas'] == 2:
+            pcb.rotate()
         pcb_rot = pcb.copy()
         pcb_rot.rotate()
 
-        if retrait == 'colonne':
-            N_largeur_rot = floor((self.panneau.largeur - (N_largeur * (pcb.largeur + self.espacement)) + self.espacement) / (pcb_rot.largeur + self.espacement))
-            N_hauteur_rot = floor((self.panneau.hauteur + self.espacement) / (pcb_rot.hauteur + self.espacement))
-
-            for i in range(N_largeur_rot):
-                for j in range(N_hauteur_rot):
-                    x = offset_x + N_largeur * (pcb.largeur + self.espacement) + i * (pcb_rot.largeur + self.espacement)
-                    y = offset_y + j * (pcb_rot.hauteur + self.espacement)
-                    if x + pcb_rot.largeur <= self.panneau.largeur_totale - self.panneau.bordure and y + pcb_rot.hauteur <= self.panneau.hauteur_totale - self.panneau.bordure:
-                        self.rectangles.append(RectanglePCB(pcb_rot.largeur, pcb_rot.hauteur, x, y, rotation=pcb_rot.rotation))
-
-        elif retrait == 'rangée':
-            N_largeur_rot = floor((self.panneau.largeur + self.espacement) / (pcb_rot.largeur + self.espacement))
-            N_hauteur_rot = floor((self.panneau.hauteur - (N_hauteur * (pcb.hauteur + self.espacement)) + self.espacement) / (pcb_rot.hauteur + self.espacement))
-
-            for i in range(N_largeur_rot):
-                for j in range(N_hauteur_rot):
-                    x = offset_x + i * (pcb_rot.largeur + self.espacement)
-                    y = offset_y + N_hauteur * (pcb.hauteur + self.espacement) + j * (pcb_rot.hauteur + self.espacement)
-                    if x + pcb_rot.largeur <= self.panneau.largeur_totale - self.panneau.bordure and y + pcb_rot.hauteur <= self.panneau.hauteur_totale - self.panneau.bordure:
-                        self.rectangles.append(RectanglePCB(pcb_rot.largeur, pcb_rot.hauteur, x, y, rotation=pcb_rot.rotation))
-        else:
-            self._placer_pcb_rotes_standard(pcb, pcb_rot, N_largeur, N_hauteur, R_largeur, R_hauteur, offset_x, offset_y)
+        origine_x, origine_y, largeur, hauteur, espacement = placement.zone_microns()
+        largeur += espacement
+        hauteur += espacement
+        pas_largeur = microns(pcb.largeur) + espacement
+        pas_hauteur = microns(pcb.hauteur) + espacement
+        pas_largeur_rot = pas_hauteur
+        pas_hauteur_rot = pas_largeur
+
+        n_colonnes = largeur // pas_largeur - configuration['colonnes']
+        n_rangees = hauteur // pas_hauteur - configuration['rangees']
+        x_bande = n_colonnes * pas_largeur
+        y_bande = n_rangees * pas_hauteur
+
+        blocs = [(pcb, pas_largeur, pas_hauteur, n_colonnes, n_rangees, 0, 0)]
+        if placement.allow_rotation:
+            if configuration['disposition'] == 1:
+                blocs.append((pcb_rot, pas_largeur_rot, pas_hauteur_rot, (largeur - x_bande) // pas_largeur_rot,
+                              hauteur // pas_hauteur_rot, x_bande, 0))
+                blocs.append((pcb_rot, pas_largeur_rot, pas_hauteur_rot, x_bande // pas_largeur_rot,
+                              (hauteur - y_bande) // pas_hauteur_rot, 0, y_bande))
+            else:
+                blocs.append((pcb_rot, pas_largeur_rot, pas_hauteur_rot, largeur // pas_largeur_rot,
+                              (hauteur - y_bande) // pas_hauteur_rot, 0, y_bande))
+                blocs.append((pcb_rot, pas_largeur_rot, pas_hauteur_rot, (largeur - x_bande) // pas_largeur_rot,
+                              y_bande // pas_hauteur_rot, x_bande, 0))
+
+        for bloc_pcb, pas_x, pas_y, colonnes, rangees, x0, y0 in blocs:
+            for i in range(colonnes):
+                for j in range(rangees):
+                    x = (origine_x + x0 + i * pas_x) / MICRONS_PAR_MM
+                    y = (origine_y + y0 + j * pas_y) / MICRONS_PAR_MM
+                    placement.rectangles.append(RectanglePCB(bloc_pcb.largeur, bloc_pcb.hauteur, x, y, rotation=bloc_pcb.rotation))
+
+    def permuter(self, configuration: dict) -> dict:
+        return dict(configuration, cas=3 - configuration['cas'])
+
+
+def strategie_par_nom(nom: str) -> StrategiePlacement:
+    """
+    Retourne une stratégie de placement à partir de son nom.
+    """
+    if nom == StrategieHeuristique.nom:
+        return StrategieHeuristique()
+    if nom == StrategieRetraits.nom:
+        return StrategieRetraits()
+    if nom == 'guillotine':
+        from guillotine import StrategieGuillotine
+        return StrategieGuillotine()
+    raise ValueError(f"Stratégie de placement inconnue : {nom}")
+
+
+class CachePlacement:
+    """
+    Cache LRU des meilleurs placements, indexé sur les paramètres normalisés
+    du calcul : dimensions du PCB et du panneau, bordure, espacement,
+    rotation, stratégie et ses paramètres, tolérance. Les longueurs de la clé
+    sont en micromètres entiers : deux saisies égales au micromètre près
+    partagent une entrée.
 
-    def _placer_pcb_rotes_standard(self, pcb, pcb_rot, N_largeur, N_hauteur, R_largeur, R_hauteur, offset_x, offset_y):
-        if R_largeur >= pcb_rot.largeur:
-            N_largeur_rot = floor((R_largeur + self.espacement) / (pcb_rot.largeur + self.espacement))
-            N_hauteur_rot = floor((self.panneau.hauteur + self.espacement) / (pcb_rot.hauteur + self.espacement))
+    Avec la rotation autorisée, un PCB l x h et un PCB h x l donnent le même
+    placement, à l'orientation des PCB près. Ils partagent une entrée, dont
+    la configuration est permutée par la stratégie.
 
-            for i in range(N_largeur_rot):
-                for j in range(N_hauteur_rot):
-                    x = offset_x + N_largeur * (pcb.largeur + self.espacement) + i * (pcb_rot.largeur + self.espacement)
-                    y = offset_y + j * (pcb_rot.hauteur + self.espacement)
-                    if x + pcb_rot.largeur <= self.panneau.largeur_totale - self.panneau.bordure and y + pcb_rot.hauteur <= self.panneau.hauteur_totale - self.panneau.bordure:
-                        self.rectangles.append(RectanglePCB(pcb_rot.largeur, pcb_rot.hauteur, x, y, rotation=pcb_rot.rotation))
+    Si un chemin est fourni, les entrées sont aussi conservées dans une base
+    sqlite, d'une session à l'autre.
+
+    Le cache peut être partagé entre threads : les accès aux entrées et à la
+    base sont protégés par un verrou, les recherches se font hors verrou.
+    """
+    TAILLE_LOT_ECRITURE = 256
+
+    def __init__(self, taille_max: int = 4096, chemin: Optional[str] = None):
+        self.taille_max = taille_max
+        self._entrees: 'OrderedDict[tuple, tuple]' = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.hits_disque = 0
+        self._connexion = None
+        self._ecritures_en_attente = 0
+        self._verrou = threading.RLock()
+
+        if chemin is not None:
+            import sqlite3
+            self._connexion = sqlite3.connect(chemin, check_same_thread=False)
+            self._connexion.execute(
+                "CREATE TABLE IF NOT EXISTS placements_parametres ("
+                "largeur INTEGER, hauteur INTEGER, largeur_panneau INTEGER, hauteur_panneau INTEGER, "
+                "bordure INTEGER, espacement INTEGER, allow_rotation INTEGER, strategie TEXT, parametres TEXT, "
+                "tolerance INTEGER, nombre_pcb INTEGER, surface_occupee REAL, configuration TEXT, "
+                "PRIMARY KEY (largeur, hauteur, largeur_panneau, hauteur_panneau, bordure, espacement, "
+                "allow_rotation, strategie, parametres, tolerance))"
+            )
+
+    @staticmethod
+    def cle(placement: PlacementPCB) -> Tuple[tuple, bool]:
+        """
+        Retourne la clé normalisée d'un placement et indique si le PCB a été
+        tourné pour l'obtenir. Les paramètres de la stratégie y figurent en
+        JSON trié, comme dans l'historique des travaux.
+        """
+        largeur = microns(placement.pcb_prototype.largeur)
+        hauteur = microns(placement.pcb_prototype.hauteur)
+        permute = placement.allow_rotation and largeur > hauteur
+        if permute:
+            largeur, hauteur = hauteur, largeur
+        parametres = placement.strategie.parametres()
+        parametres = json.dumps(parametres, sort_keys=True) if parametres else ''
+
+        cle = (largeur, hauteur, microns_inf(placement.panneau.largeur_totale),
+               microns_inf(placement.panneau.hauteur_totale), microns(placement.panneau.bordure),
+               microns(placement.espacement), bool(placement.allow_rotation), placement.strategie.nom, parametres,
+               microns_inf(placement.tolerance))
+        return cle, permute
+
+    def calculer(self, placement: PlacementPCB) -> Tuple[int, float, Optional[dict]]:
+        """
+        Retourne (nombre_pcb, surface_occupee, configuration) pour le placement,
+        en le calculant seulement s'il n'est pas déjà en cache.
+        """
+        cle, permute = self.cle(placement)
+        with self._verrou:
+            valeur = self._lire(cle)
+            if valeur is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+
+        if valeur is None:
+            nombre_pcb, surface_occupee, configuration = placement.strategie.chercher(placement)
+            valeur = (nombre_pcb, surface_occupee, self._permuter(placement, configuration, permute))
+            with self._verrou:
+                self._ajouter(cle, valeur)
+                self._ecrire(cle, valeur)
+
+        nombre_pcb, surface_occupee, configuration = valeur
+        return nombre_pcb, surface_occupee, self._permuter(placement, configuration, permute)
+
+    @staticmethod
+    def _permuter(placement: PlacementPCB, configuration: Optional[dict], permute: bool) -> Optional[dict]:
+        if configuration is None or not permute:
+            return configuration
+        return placement.strategie.permuter(configuration)
+
+    def _lire(self, cle: tuple) -> Optional[tuple]:
+        valeur = self._entrees.get(cle)
+        if valeur is not None:
+            self._entrees.move_to_end(cle)
+            return valeur
+
+        if self._connexion is not None:
+            ligne = self._connexion.execute(
+                "SELECT nombre_pcb, surface_occupee, configuration FROM placements_parametres "
+                "WHERE largeur = ? AND hauteur = ? AND largeur_panneau = ? AND hauteur_panneau = ? "
+                "AND bordure = ? AND espacement = ? AND allow_rotation = ? AND strategie = ? AND parametres = ? "
+                "AND tolerance = ?",
+                cle
+            ).fetchone()
+            if ligne is not None:
+                self.hits_disque += 1
+                nombre_pcb, surface_occupee, configuration = ligne
+                valeur = (nombre_pcb, surface_occupee, json.loads(configuration))
+                self._ajouter(cle, valeur)
+        return valeur
+
+    def _ajouter(self, cle: tuple, valeur: tuple):
+        self._entrees[cle] = valeur
+        if len(self._entrees) > self.taille_max:
+            self._entrees.popitem(last=False)
+
+    def _ecrire(self, cle: tuple, valeur: tuple):
+        if self._connexion is None:
+            return
+        nombre_pcb, surface_occupee, configuration = valeur
+        self._connexion.execute(
+            "INSERT OR REPLACE INTO placements_parametres VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            cle + (nombre_pcb, surface_occupee, json.dumps(configuration))
+        )
+        self._ecritures_en_attente += 1
+        if self._ecritures_en_attente >= self.TAILLE_LOT_ECRITURE:
+            self.enregistrer()
+
+    def enregistrer(self):
+        """
+        Valide sur disque les entrées en attente.
+        """
+        with self._verrou:
+            if self._connexion is not None and self._ecritures_en_attente:
+                self._connexion.commit()
+                self._ecritures_en_attente = 0
+
+    def fermer(self):
+        """
+        Enregistre les entrées en attente et ferme la base.
+        """
+        with self._verrou:
+            if self._connexion is not None:
+                self.enregistrer()
+                self._connexion.close()
+                self._connexion = None
 
-        if R_hauteur >= pcb_rot.hauteur:
-            N_largeur_rot = floor((self.panneau.largeur + self.espacement) / (pcb_rot.largeur + self.espacement))
-            N_hauteur_rot = floor((R_hauteur + self.espacement) / (pcb_rot.hauteur + self.espacement))
+    def vider(self):
+        """
+        Vide le cache mémoire et remet les statistiques à zéro.
+        """
+        with self._verrou:
+            self._entrees.clear()
+            self.hits = self.misses = self.hits_disque = 0
 
-            for i in range(N_largeur_rot):
-                for j in range(N_hauteur_rot):
-                    x = offset_x + i * (pcb_rot.largeur + self.espacement)
-                    y = offset_y + N_hauteur * (pcb.hauteur + self.espacement) + j * (pcb_rot.hauteur + self.espacement)
-                    if x + pcb_rot.largeur <= self.panneau.largeur_totale - self.panneau.bordure and y + pcb_rot.hauteur <= self.panneau.hauteur_totale - self.panneau.bordure:
-                        self.rectangles.append(RectanglePCB(pcb_rot.largeur, pcb_rot.hauteur, x, y, rotation=pcb_rot.rotation))
+    def statistiques(self) -> dict:
+        """
+        Retourne les statistiques d'utilisation du cache.
+        """
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hits_disque': self.hits_disque,
+            'taux_hits': self.hits / total if total else 0.0,
+            'entrees': len(self._entrees),
+            'taille_max': self.taille_max,
+        }
 
 
 def calcul_pourcentage_remplissage(surface_occupee: float, surface_utilisable: float) -> float:
@@ -199,3 +831,186 @@ def calcul_panneaux_necessaires(nombre_total_pcb: int, pcb_par_panneau: int) ->
     if pcb_par_panneau > 0:
         return ceil(nombre_total_pcb / pcb_par_panneau)
     return 0
+
+
+def calcul_nombre_total_pcb(nombre_pcb_a_fabriquer: int, pourcentage_surlancement: float) -> int:
+    """
+    Calcule le nombre total de PCB à lancer, surlancement (casse) compris.
+    """
+    return ceil(nombre_pcb_a_fabriquer * (1 + pourcentage_surlancement / 100))
+
+
+def calcul_resultat(numero: int, panneau: Panneau, nombre_pcb: int, surface_occupee: float, nombre_total_pcb: int) -> dict:
+    """
+    Construit la ligne de résultat d'un placement sur un panneau.
+    """
+    pourcentage_remplissage = calcul_pourcentage_remplissage(surface_occupee, panneau.surface_utilisable)
+    nombre_panneaux_necessaires = calcul_panneaux_necessaires(nombre_total_pcb, nombre_pcb)
+    quantite_produite = nombre_pcb * nombre_panneaux_necessaires
+
+    return {
+        'panneau': numero,
+        'dimensions_totales': f"{panneau.largeur_totale} x {panneau.hauteur_totale}",
+        'dimensions_utilisables': f"{panneau.largeur} x {panneau.hauteur}",
+        'nombre_pcb': nombre_pcb,
+        'pourcentage_remplissage': pourcentage_remplissage,
+        'nombre_panneaux_necessaires': nombre_panneaux_necessaires,
+        'quantite_produite': quantite_produite
+    }
+
+
+class TravailPCB:
+    """
+    Classe représentant une référence de PCB à panéliser.
+    """
+    def __init__(self, largeur: float, hauteur: float, espacement: float = 5, nombre_pcb_a_fabriquer: int = 1,
+                 pourcentage_surlancement: float = 5, allow_rotation: bool = True, reference: str = ''):
+        self.largeur = largeur
+        self.hauteur = hauteur
+        self.espacement = espacement
+        self.nombre_pcb_a_fabriquer = nombre_pcb_a_fabriquer
+        self.pourcentage_surlancement = pourcentage_surlancement
+        self.allow_rotation = allow_rotation
+        self.reference = reference
+
+    @property
+    def nombre_total_pcb(self) -> int:
+        return calcul_nombre_total_pcb(self.nombre_pcb_a_fabriquer, self.pourcentage_surlancement)
+
+
+# Cache partagé par les évaluations en lot (un par processus)
+cache_lot = CachePlacement()
+
+
+def placement_combinaison(largeur: float, hauteur: float, largeur_panneau: float, hauteur_panneau: float,
+                          espacement: float, bordure: float, allow_rotation: bool = True,
+                          strategie: str = StrategieHeuristique.nom, tolerance: float = TOLERANCE_AJUSTEMENT,
+                          bordures: Optional[Tuple[float, float, float, float]] = None,
+                          zones_interdites: Optional[Iterable[Tuple[float, float, float, float]]] = None) -> PlacementPCB:
+    """
+    Placement (non calculé) d'une combinaison de paramètres, avec le cache du lot.
+    """
+    panneau = Panneau(largeur_panneau, hauteur_panneau, bordure, bordures, zones_interdites)
+    return PlacementPCB(panneau, RectanglePCB(largeur, hauteur),
+                        espacement, allow_rotation=allow_rotation, cache=cache_lot,
+                        strategie=strategie_par_nom(strategie), tolerance=tolerance)
+
+
+def evaluer_combinaison(largeur: float, hauteur: float, largeur_panneau: float, hauteur_panneau: float,
+                        espacement: float, bordure: float, allow_rotation: bool = True,
+                        strategie: str = StrategieHeuristique.nom, tolerance: float = TOLERANCE_AJUSTEMENT,
+                        bordures: Optional[Tuple[float, float, float, float]] = None,
+                        zones_interdites: Optional[Iterable[Tuple[float, float, float, float]]] = None
+                        ) -> Tuple[int, float]:
+    """
+    Calcule le nombre de PCB et la surface occupée pour une combinaison de paramètres.
+    """
+    placement = placement_combinaison(largeur, hauteur, largeur_panneau, hauteur_panneau, espacement, bordure,
+                                      allow_rotation, strategie, tolerance, bordures, zones_interdites)
+    placement.calculer_meilleur_placement()
+    return placement.nombre_pcb, placement.surface_occupee
+
+
+def _evaluer_configuration(*combinaison) -> Tuple[int, float, Optional[dict]]:
+    placement = placement_combinaison(*combinaison)
+    placement.calculer_meilleur_placement()
+    return placement.nombre_pcb, placement.surface_occupee, placement.configuration
+
+
+def _evaluer_bloc(combinaisons: List[tuple], avec_configuration: bool = False) -> List[tuple]:
+    evaluer = _evaluer_configuration if avec_configuration else evaluer_combinaison
+    return [evaluer(*combinaison) for combinaison in combinaisons]
+
+
+def evaluer_combinaisons(combinaisons: Iterable[tuple], processus: Optional[int] = None,
+                         taille_bloc: int = TAILLE_BLOC, avec_configuration: bool = False) -> Iterator[tuple]:
+    """
+    Évalue des combinaisons (largeur, hauteur, largeur_panneau, hauteur_panneau,
+    espacement, bordure, allow_rotation[, strategie[, tolerance[, bordures[, zones_interdites]]]])
+    et produit les résultats (nombre_pcb, surface_occupee) au fur et à mesure,
+    dans l'ordre des combinaisons.
+    Avec avec_configuration, la configuration retenue suit la surface occupée.
+
+    Avec processus > 1 (None : un par cœur), les combinaisons sont envoyées par
+    blocs de taille_bloc tuples à un ProcessPoolExecutor.
+    """
+    if processus is None:
+        processus = os.cpu_count() or 1
+
+    if processus <= 1:
+        evaluer = _evaluer_configuration if avec_configuration else evaluer_combinaison
+        for combinaison in combinaisons:
+            yield evaluer(*combinaison)
+        return
+
+    # Import différé : inutile (et coûteux au démarrage) en mono-processus
+    from concurrent.futures import ProcessPoolExecutor
+
+    iterateur = iter(combinaisons)
+    blocs = iter(lambda: list(islice(iterateur, taille_bloc)), [])
+    with ProcessPoolExecutor(max_workers=processus) as executor:
+        evaluer_bloc = partial(_evaluer_bloc, avec_configuration=avec_configuration)
+        for resultats in executor.map(evaluer_bloc, blocs):
+            yield from resultats
+
+
+def _geometrie_panneau(panneau: Panneau) -> tuple:
+    # Bordures par côté et zones interdites d'un panneau, à la fin d'une
+    # combinaison : rien pour un panneau standard
+    if panneau.standard:
+        return ()
+    return ((panneau.bordure_gauche, panneau.bordure_droite, panneau.bordure_bas, panneau.bordure_haut),
+            tuple(tuple(zone) for zone in panneau.zones_interdites))
+
+
+def optimiser_lot(travaux: List[TravailPCB], panneaux: List[Panneau], processus: int = 1,
+                  strategie: str = StrategieHeuristique.nom, tolerance: float = TOLERANCE_AJUSTEMENT,
+                  historique=None) -> List[dict]:
+    """
+    Calcule le placement de chaque PCB sur chaque format de panneau.
+
+    Retourne une ligne par couple (PCB, panneau), dans l'ordre des travaux
+    puis des panneaux, avec les mêmes champs que le récapitulatif de
+    l'interface, plus 'travail' (indice) et 'reference'.
+
+    Avec un historique (job_history.HistoriqueTravaux), les couples déjà
+    calculés y sont relus au lieu d'être recalculés, et chaque ligne y est
+    enregistrée.
+    """
+    combinaisons = [
+        (travail.largeur, travail.hauteur, panneau.largeur_totale, panneau.hauteur_totale,
+         travail.espacement, panneau.bordure, travail.allow_rotation, strategie, tolerance,
+         *_geometrie_panneau(panneau))
+        for travail in travaux
+        for panneau in panneaux
+    ]
+    placements = []
+    repris = []
+    if historique is not None:
+        placements = [placement_combinaison(*combinaison) for combinaison in combinaisons]
+        repris = [historique.restaurer(placement) for placement in placements]
+        combinaisons = [combinaison for combinaison, trouve in zip(combinaisons, repris) if not trouve]
+    evaluations = evaluer_combinaisons(combinaisons, processus=processus, avec_configuration=historique is not None)
+
+    resultats = []
+    for index_travail, travail in enumerate(travaux):
+        nombre_total_pcb = travail.nombre_total_pcb
+
+        for index_panneau, panneau in enumerate(panneaux):
+            if historique is None:
+                nombre_pcb, surface_occupee = next(evaluations)
+            else:
+                rang = len(resultats)
+                placement = placements[rang]
+                if not repris[rang]:
+                    placement.appliquer_resultat(next(evaluations))
+                nombre_pcb, surface_occupee = placement.nombre_pcb, placement.surface_occupee
+
+            resultat = calcul_resultat(index_panneau + 1, panneau, nombre_pcb, surface_occupee, nombre_total_pcb)
+            resultat['travail'] = index_travail
+            resultat['reference'] = travail.reference
+            resultats.append(resultat)
+            if historique is not None:
+                historique.ajouter(placements[rang], resultat, nombre_total_pcb, travail.reference)
+
+    return resultats
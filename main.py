@@ -1,11 +1,36 @@
+import multiprocessing
 import sys
-from PyQt5.QtWidgets import QApplication
-from ui import MainWindow
+import time
+
+debut = time.perf_counter()
+
+import instrumentation
+from instrumentation import activer, mesurer_import, journaliser, rapport_imports, rapport_mesures, demarrer_profilage
+
+# Avant les imports mesurés, pour que le profil les couvre
+if '--profil' in sys.argv[1:]:
+    activer()
+if instrumentation.ACTIF:
+    demarrer_profilage()
+
+with mesurer_import('PyQt5'):
+    from PyQt5.QtCore import QTimer
+    from PyQt5.QtWidgets import QApplication
+with mesurer_import('ui'):
+    from ui import MainWindow
 from license_validator import LicenseValidator  # Si nécessaire
 
 if __name__ == "__main__":
+    # Les exports lancent des processus de travail, y compris depuis un exécutable figé
+    multiprocessing.freeze_support()
     app = QApplication(sys.argv)
     LicenseValidator.verifier_licence()  # Si nécessaire
     window = MainWindow()
     window.show()
-    sys.exit(app.exec_())
+    if instrumentation.ACTIF:
+        QTimer.singleShot(0, lambda: journaliser(
+            f"fenêtre affichée en {(time.perf_counter() - debut) * 1000:.0f} ms\n{rapport_imports()}"))
+    code = app.exec_()
+    if instrumentation.ACTIF:
+        journaliser(f"mesures de la session\n{rapport_mesures()}")
+    sys.exit(code)
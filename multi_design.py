@@ -0,0 +1,391 @@
+"""
+Panélisation mixte : plusieurs références de PCB sur les mêmes panneaux.
+
+Les PCB sont placés par blocs (grilles de PCB identiques) avec l'algorithme
+des rectangles maximaux (MaxRects) : la surface libre d'un panneau est
+décrite par la liste de ses rectangles libres maximaux, et chaque bloc est
+posé dans le coin inférieur gauche de l'un d'eux. Les panneaux sont remplis
+l'un après l'autre ; un panneau identique au précédent n'est pas recalculé
+mais répété.
+
+Plusieurs ordres de références et critères de choix sont essayés dans un
+budget de temps ; la recherche s'arrête dès que le nombre de panneaux
+atteint le minorant.
+
+Comme dans logic, positions, rectangles libres et zones interdites sont en
+micromètres entiers : les PCB ne sont convertis en mm que dans leurs
+coordonnées.
+"""
+import random
+import time
+from math import ceil
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from logic import (
+    MICRONS_PAR_MM, Panneau, PlacementPCB, RectanglePCB, TravailPCB, calcul_pourcentage_remplissage, microns,
+    microns_inf
+)
+
+# Colonnes d'un placement mixte : une ligne par PCB, avec l'indice de sa référence
+DTYPE_PLACEMENT_MIXTE = np.dtype([
+    ('x', 'f8'),
+    ('y', 'f8'),
+    ('largeur', 'f8'),
+    ('hauteur', 'f8'),
+    ('rotation', 'i2'),
+    ('design', 'i2'),
+])
+
+
+class DesignPCB:
+    """
+    Référence de PCB à placer, avec sa quantité.
+    """
+    def __init__(self, pcb_prototype: RectanglePCB, quantite: int, reference: str = ''):
+        self.pcb_prototype = pcb_prototype
+        self.quantite = quantite
+        self.reference = reference
+
+
+class PanneauMixte:
+    """
+    Disposition d'un panneau mixte, répétée `repetitions` fois.
+
+    Chaque bloc est un tuple (design, x, y, colonnes, rangées, rotation),
+    x et y étant relatifs au coin de la zone utile, en micromètres.
+    """
+    def __init__(self, blocs: List[tuple], repetitions: int = 1):
+        self.blocs = blocs
+        self.repetitions = repetitions
+
+    def quantites(self, nombre_designs: int) -> List[int]:
+        """
+        Nombre de PCB de chaque référence sur un panneau.
+        """
+        quantites = [0] * nombre_designs
+        for design, _, _, colonnes, rangees, _ in self.blocs:
+            quantites[design] += colonnes * rangees
+        return quantites
+
+    def coordonnees(self, designs: List[DesignPCB], panneau: Panneau, espacement: float) -> np.ndarray:
+        """
+        Coordonnées des PCB d'un panneau sous forme de tableau structuré.
+        """
+        x_origine, y_origine, _, _, espacement = _zone_microns(panneau, espacement)
+        tableaux = []
+        for design, x0, y0, colonnes, rangees, rotation in self.blocs:
+            pcb = designs[design].pcb_prototype
+            largeur, hauteur = (pcb.hauteur, pcb.largeur) if rotation else (pcb.largeur, pcb.hauteur)
+            gx, gy = np.meshgrid(x_origine + x0 + np.arange(colonnes, dtype=np.int64) * (microns(largeur) + espacement),
+                                 y_origine + y0 + np.arange(rangees, dtype=np.int64) * (microns(hauteur) + espacement),
+                                 indexing='ij')
+            tableau = np.empty(gx.size, dtype=DTYPE_PLACEMENT_MIXTE)
+            tableau['x'] = gx.ravel() / MICRONS_PAR_MM
+            tableau['y'] = gy.ravel() / MICRONS_PAR_MM
+            tableau['largeur'] = largeur
+            tableau['hauteur'] = hauteur
+            tableau['rotation'] = rotation
+            tableau['design'] = design
+            tableaux.append(tableau)
+        if not tableaux:
+            return np.empty(0, dtype=DTYPE_PLACEMENT_MIXTE)
+        return np.concatenate(tableaux)
+
+
+class ResultatMixte:
+    """
+    Résultat d'une panélisation mixte.
+    """
+    def __init__(self, panneaux: List[PanneauMixte], borne_inferieure: int, essais: int, duree: float):
+        self.panneaux = panneaux
+        self.nombre_panneaux = sum(p.repetitions for p in panneaux)
+        self.borne_inferieure = borne_inferieure
+        self.essais = essais
+        self.duree = duree
+
+    @property
+    def optimal(self) -> bool:
+        """
+        Vrai si le nombre de panneaux atteint le minorant.
+        """
+        return self.nombre_panneaux == self.borne_inferieure
+
+    def rapport(self) -> dict:
+        return {
+            'nombre_panneaux': self.nombre_panneaux,
+            'borne_inferieure': self.borne_inferieure,
+            'ecart': self.nombre_panneaux - self.borne_inferieure,
+            'optimal': self.optimal,
+            'dispositions': len(self.panneaux),
+            'essais': self.essais,
+            'duree': self.duree,
+        }
+
+
+def _zone_microns(panneau: Panneau, espacement: float) -> Tuple[int, int, int, int, int]:
+    """
+    Zone utile du panneau en micromètres, comme PlacementPCB.zone_microns
+    sans tolérance : origine x et y, largeur et hauteur agrandies de
+    l'espacement (chaque bloc le compte à droite et en haut), et espacement.
+    """
+    x0 = microns(panneau.bordure_gauche)
+    y0 = microns(panneau.bordure_bas)
+    espacement = microns(espacement)
+    return (x0, y0, microns_inf(panneau.largeur_totale) - x0 - microns(panneau.bordure_droite) + espacement,
+            microns_inf(panneau.hauteur_totale) - y0 - microns(panneau.bordure_haut) + espacement, espacement)
+
+
+def _pas(pcb: RectanglePCB, espacement: int, allow_rotation: bool) -> List[tuple]:
+    """
+    (pas_largeur, pas_hauteur, rotation) autorisés d'un PCB, en micromètres.
+    """
+    largeur, hauteur = microns(pcb.largeur), microns(pcb.hauteur)
+    pas = [(largeur + espacement, hauteur + espacement, 0)]
+    if allow_rotation and largeur != hauteur:
+        pas.append((hauteur + espacement, largeur + espacement, 90))
+    return pas
+
+
+def borne_inferieure(designs: List[DesignPCB], panneau: Panneau, espacement: float, allow_rotation: bool = True) -> int:
+    """
+    Minorant du nombre de panneaux : le plus grand du minorant par la surface
+    (chaque PCB occupant, avec son espacement, (largeur + e) x (hauteur + e))
+    et, pour chaque référence, de sa quantité divisée par sa capacité seule.
+    """
+    _, _, largeur_zone, hauteur_zone, e = _zone_microns(panneau, espacement)
+    surface_zone = largeur_zone * hauteur_zone
+    surface = sum(d.quantite * (microns(d.pcb_prototype.largeur) + e) * (microns(d.pcb_prototype.hauteur) + e)
+                  for d in designs)
+    borne = -(-surface // surface_zone) if largeur_zone > 0 and hauteur_zone > 0 else 0
+
+    for design in designs:
+        capacite = PlacementPCB(panneau, design.pcb_prototype, espacement, allow_rotation=allow_rotation).borne_superieure()
+        if design.quantite > 0 and capacite > 0:
+            borne = max(borne, ceil(design.quantite / capacite))
+    return borne
+
+
+def _decouper(libres: List[tuple], x: int, y: int, largeur: int, hauteur: int) -> List[tuple]:
+    """
+    Retire le rectangle posé des rectangles libres et ne garde que les
+    rectangles libres maximaux (micromètres).
+    """
+    decoupes = []
+    for fx, fy, fl, fh in libres:
+        if x >= fx + fl or x + largeur <= fx or y >= fy + fh or y + hauteur <= fy:
+            decoupes.append((fx, fy, fl, fh))
+            continue
+        if x > fx:
+            decoupes.append((fx, fy, x - fx, fh))
+        if x + largeur < fx + fl:
+            decoupes.append((x + largeur, fy, fx + fl - x - largeur, fh))
+        if y > fy:
+            decoupes.append((fx, fy, fl, y - fy))
+        if y + hauteur < fy + fh:
+            decoupes.append((fx, y + hauteur, fl, fy + fh - y - hauteur))
+
+    maximaux = []
+    for i, (ax, ay, al, ah) in enumerate(decoupes):
+        contenu = False
+        for j, (bx, by, bl, bh) in enumerate(decoupes):
+            if i != j and bx <= ax and by <= ay and ax + al <= bx + bl and ay + ah <= by + bh \
+                    and (j < i or (bx, by, bl, bh) != (ax, ay, al, ah)):
+                contenu = True
+                break
+        if not contenu:
+            maximaux.append((ax, ay, al, ah))
+    return maximaux
+
+
+class _Emballeur:
+    """
+    Une passe de remplissage des panneaux, pour un ordre des références et
+    un critère de choix des rectangles libres donnés.
+    """
+    def __init__(self, pas: List[List[tuple]], libres: List[tuple], ordre: List[int], critere: str):
+        # pas[design] : liste des (pas_largeur, pas_hauteur, rotation) autorisés ;
+        # libres : rectangles libres d'un panneau vide (micromètres)
+        self.pas = pas
+        self.libres = libres
+        self.ordre = ordre
+        self.critere = critere
+
+    def _meilleur_bloc(self, libres: List[tuple], design: int, restant: int) -> Tuple[Optional[tuple], bool]:
+        """
+        Meilleur bloc de la référence dans les rectangles libres,
+        (score, x, y, colonnes, rangées, rotation), et indique si un des blocs
+        candidats a été limité par la quantité restante.
+        """
+        meilleur = None
+        limite = False
+        for fx, fy, fl, fh in libres:
+            for pas_largeur, pas_hauteur, rotation in self.pas[design]:
+                colonnes = fl // pas_largeur
+                rangees = fh // pas_hauteur
+                if colonnes <= 0 or rangees <= 0:
+                    continue
+                if restant < colonnes * rangees:
+                    limite = True
+                    if restant >= colonnes:
+                        rangees = restant // colonnes
+                    else:
+                        colonnes, rangees = restant, 1
+                nombre = colonnes * rangees
+                reste_court = min(fl - colonnes * pas_largeur, fh - rangees * pas_hauteur)
+                if self.critere == 'nombre':
+                    score = (nombre, -reste_court)
+                else:
+                    score = (-reste_court, nombre)
+                if meilleur is None or score > meilleur[0]:
+                    meilleur = (score, fx, fy, colonnes, rangees, rotation)
+        return meilleur, limite
+
+    def remplir(self, restants: List[int]) -> Tuple[List[tuple], bool]:
+        """
+        Remplit un panneau ; retourne ses blocs et indique si un choix a
+        dépendu de la quantité restante.
+        """
+        libres = self.libres
+        blocs = []
+        tronque = False
+        while libres:
+            choix = None
+            for design in self.ordre:
+                if restants[design] > 0:
+                    choix, limite = self._meilleur_bloc(libres, design, restants[design])
+                    tronque = tronque or limite
+                    if choix is not None:
+                        break
+            if choix is None:
+                break
+            _, x, y, colonnes, rangees, rotation = choix
+            pas_largeur, pas_hauteur, _ = next(p for p in self.pas[design] if p[2] == rotation)
+            blocs.append((design, x, y, colonnes, rangees, rotation))
+            restants[design] -= colonnes * rangees
+            libres = _decouper(libres, x, y, colonnes * pas_largeur, rangees * pas_hauteur)
+        return blocs, tronque
+
+    def emballer(self, quantites: List[int], limite: Optional[int]) -> Optional[List[PanneauMixte]]:
+        """
+        Remplit des panneaux jusqu'à épuisement des quantités. Abandonne (None)
+        dès que le nombre de panneaux atteint la limite.
+        """
+        restants = list(quantites)
+        panneaux = []
+        nombre = 0
+        while any(restants):
+            if limite is not None and nombre >= limite:
+                return None
+            blocs, tronque = self.remplir(restants)
+            if not blocs:
+                raise ValueError("Un PCB ne tient pas sur le panneau.")
+            panneau = PanneauMixte(blocs)
+
+            # Si aucun choix n'a dépendu des quantités, le même panneau se répète
+            # tant que chaque référence utilisée en a assez pour un panneau.
+            if not tronque:
+                utilises = panneau.quantites(len(restants))
+                repetitions = min(restants[d] // n for d, n in enumerate(utilises) if n)
+                for d, n in enumerate(utilises):
+                    restants[d] -= repetitions * n
+                panneau.repetitions += repetitions
+
+            panneaux.append(panneau)
+            nombre += panneau.repetitions
+        return panneaux
+
+
+def emballer_designs(designs: List[DesignPCB], panneau: Panneau, espacement: float = 0, allow_rotation: bool = True,
+                     budget: float = 2.0, graine: int = 0) -> ResultatMixte:
+    """
+    Place plusieurs références de PCB sur des panneaux identiques en
+    minimisant le nombre de panneaux, dans un budget de temps en secondes.
+    """
+    debut = time.perf_counter()
+    x_origine, y_origine, largeur_zone, hauteur_zone, e = _zone_microns(panneau, espacement)
+
+    pas = []
+    for design in designs:
+        pcb = design.pcb_prototype
+        orientations = _pas(pcb, e, allow_rotation)
+        if design.quantite > 0 and not any(pl <= largeur_zone and ph <= hauteur_zone for pl, ph, _ in orientations):
+            raise ValueError(f"Le PCB {design.reference or f'{pcb.largeur} x {pcb.hauteur}'} ne tient pas sur le panneau.")
+        pas.append(orientations)
+
+    # Les zones interdites sont retirées d'emblée des rectangles libres, agrandies
+    # de l'espacement (les blocs comptent l'espacement à droite et en haut) ; leurs
+    # bords sont arrondis vers l'extérieur, comme dans keepout
+    libres = [(0, 0, largeur_zone, hauteur_zone)]
+    for x, y, largeur, hauteur in panneau.zones_interdites:
+        x0, y0 = microns_inf(x), microns_inf(y)
+        libres = _decouper(libres, x0 - x_origine, y0 - y_origine, microns(x + largeur) - x0 + e,
+                           microns(y + hauteur) - y0 + e)
+
+    quantites = [d.quantite for d in designs]
+    borne = borne_inferieure(designs, panneau, espacement, allow_rotation)
+
+    # Ordres de départ : des plus gros PCB aux plus petits selon plusieurs mesures,
+    # puis des ordres aléatoires tant que le budget le permet.
+    indices = list(range(len(designs)))
+    mesures = [
+        lambda d: designs[d].pcb_prototype.largeur * designs[d].pcb_prototype.hauteur,
+        lambda d: max(designs[d].pcb_prototype.largeur, designs[d].pcb_prototype.hauteur),
+        lambda d: designs[d].pcb_prototype.largeur + designs[d].pcb_prototype.hauteur,
+        lambda d: designs[d].quantite * designs[d].pcb_prototype.largeur * designs[d].pcb_prototype.hauteur,
+    ]
+    ordres = [sorted(indices, key=mesure, reverse=True) for mesure in mesures]
+    generateur = random.Random(graine)
+
+    meilleur = None
+    essais = 0
+    while True:
+        if essais < 2 * len(ordres):
+            ordre = ordres[essais // 2]
+        else:
+            ordre = list(ordres[0])
+            generateur.shuffle(ordre)
+        critere = 'nombre' if essais % 2 == 0 else 'ajustement'
+        essais += 1
+
+        limite = None if meilleur is None else sum(p.repetitions for p in meilleur)
+        panneaux = _Emballeur(pas, libres, ordre, critere).emballer(quantites, limite)
+        if panneaux is not None:
+            meilleur = panneaux
+
+        nombre = sum(p.repetitions for p in meilleur)
+        if nombre <= borne or time.perf_counter() - debut >= budget:
+            break
+
+    return ResultatMixte(meilleur, borne, essais, time.perf_counter() - debut)
+
+
+def panneliser_mixte(travaux: List[TravailPCB], panneaux: List[Panneau], budget: float = 2.0) -> List[dict]:
+    """
+    Place tous les travaux ensemble, en panélisation mixte, sur chaque format
+    de panneau, et retourne une ligne de résultat par format.
+
+    Les quantités comprennent le surlancement ; l'espacement retenu est le
+    plus grand des travaux, et la rotation n'est permise que si tous
+    l'autorisent.
+    """
+    designs = [DesignPCB(RectanglePCB(t.largeur, t.hauteur), t.nombre_total_pcb, t.reference or f"travail {i + 1}")
+               for i, t in enumerate(travaux)]
+    espacement = max((t.espacement for t in travaux), default=0)
+    allow_rotation = all(t.allow_rotation for t in travaux)
+    surface_pcb = sum(d.quantite * d.pcb_prototype.largeur * d.pcb_prototype.hauteur for d in designs)
+
+    resultats = []
+    for numero, panneau in enumerate(panneaux, start=1):
+        resultat = emballer_designs(designs, panneau, espacement, allow_rotation, budget)
+        ligne = {
+            'panneau': numero,
+            'dimensions_totales': f"{panneau.largeur_totale} x {panneau.hauteur_totale}",
+            'dimensions_utilisables': f"{panneau.largeur} x {panneau.hauteur}",
+            'pourcentage_remplissage': calcul_pourcentage_remplissage(
+                surface_pcb, resultat.nombre_panneaux * panneau.surface_utilisable),
+        }
+        ligne.update(resultat.rapport())
+        resultats.append(ligne)
+    return resultats
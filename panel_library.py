@@ -0,0 +1,143 @@
+"""
+Bibliothèque de formats de panneaux (stock), lue en JSON ou CSV, et
+classement des formats pour un PCB donné.
+
+Un fichier JSON contient soit une liste de formats, soit un objet
+{"panneaux": [...]}. Champs d'un format : largeur, hauteur, et
+facultativement nom, bordure, cout (coût d'un panneau). En JSON seulement,
+"bordures" donne des bordures par côté ({"gauche": 20, "bas": 10}, les
+côtés absents valant bordure) et "zones" les zones interdites
+([{"x": 5, "y": 240, "largeur": 8, "hauteur": 8}, ...]).
+"""
+import csv
+import io
+import json
+from bisect import insort
+from math import ceil
+from typing import List, Optional, TextIO, Tuple
+
+from logic import (
+    Panneau, PlacementPCB, RectanglePCB, StrategiePlacement, CachePlacement, BORDURE_DEFAUT, TOLERANCE_AJUSTEMENT
+)
+
+
+class FormatPanneau:
+    """
+    Format de panneau de la bibliothèque, avec son coût unitaire éventuel.
+    """
+    def __init__(self, largeur: float, hauteur: float, bordure: float = BORDURE_DEFAUT, cout: Optional[float] = None,
+                 nom: str = '', bordures: Optional[Tuple[float, float, float, float]] = None,
+                 zones_interdites: Optional[List[Tuple[float, float, float, float]]] = None):
+        self.largeur = largeur
+        self.hauteur = hauteur
+        self.bordure = bordure
+        self.cout = cout
+        self.nom = nom or f"{largeur:g} x {hauteur:g}"
+        self.bordures = bordures
+        self.zones_interdites = zones_interdites or []
+
+    def panneau(self) -> Panneau:
+        return Panneau(self.largeur, self.hauteur, self.bordure, self.bordures, self.zones_interdites)
+
+
+def format_depuis_dict(donnees: dict) -> FormatPanneau:
+    """
+    Construit un FormatPanneau à partir d'un dictionnaire (ligne JSON ou CSV).
+    """
+    try:
+        largeur = float(donnees['largeur'])
+        hauteur = float(donnees['hauteur'])
+    except KeyError as e:
+        raise ValueError(f"Champ obligatoire manquant : {e.args[0]}")
+    bordure = float(donnees['bordure']) if donnees.get('bordure') not in (None, '') else BORDURE_DEFAUT
+    cout = float(donnees['cout']) if donnees.get('cout') not in (None, '') else None
+
+    bordures = None
+    if donnees.get('bordures'):
+        cotes = donnees['bordures']
+        bordures = tuple(float(cotes.get(cote, bordure)) for cote in ('gauche', 'droite', 'bas', 'haut'))
+    try:
+        zones = [(float(z['x']), float(z['y']), float(z['largeur']), float(z['hauteur']))
+                 for z in donnees.get('zones') or []]
+    except KeyError as e:
+        raise ValueError(f"Champ de zone interdite manquant : {e.args[0]}")
+
+    if largeur <= 0 or hauteur <= 0 or bordure < 0 or (cout is not None and cout < 0):
+        raise ValueError("Les dimensions des panneaux doivent être positives et le coût non négatif.")
+    gauche, droite, bas, haut = bordures or (bordure,) * 4
+    if min(gauche, droite, bas, haut) < 0 or any(l <= 0 or h <= 0 for _, _, l, h in zones):
+        raise ValueError("Les bordures doivent être positives et les zones interdites non vides.")
+    if largeur <= gauche + droite or hauteur <= bas + haut:
+        raise ValueError(f"La bordure du panneau {largeur:g} x {hauteur:g} ne laisse aucune surface utile.")
+    return FormatPanneau(largeur, hauteur, bordure, cout, str(donnees.get('nom') or ''), bordures, zones)
+
+
+def lire_bibliotheque(fichier: TextIO) -> List[FormatPanneau]:
+    """
+    Lit une bibliothèque de formats en JSON ou CSV, le format étant reconnu
+    au premier caractère.
+    """
+    contenu = fichier.read()
+    if contenu.lstrip()[:1] in ('[', '{'):
+        donnees = json.loads(contenu)
+        if isinstance(donnees, dict):
+            donnees = donnees.get('panneaux', [])
+        formats = [format_depuis_dict(d) for d in donnees]
+    else:
+        formats = [format_depuis_dict(ligne) for ligne in csv.DictReader(io.StringIO(contenu))]
+
+    if not formats:
+        raise ValueError("La bibliothèque ne contient aucun format de panneau.")
+    return formats
+
+
+def _cle_classement(cout_panneau: float, nombre_pcb: int, nombre_total_pcb: int) -> Tuple[float, float]:
+    """
+    Clé de classement d'un format : coût de la commande, puis coût par PCB.
+    """
+    return ceil(nombre_total_pcb / nombre_pcb) * cout_panneau, cout_panneau / nombre_pcb
+
+
+def classer_formats(formats: List[FormatPanneau], pcb_prototype: RectanglePCB, espacement: float,
+                    nombre_total_pcb: int, allow_rotation: bool = True, strategie: Optional[StrategiePlacement] = None,
+                    cache: Optional[CachePlacement] = None, nombre: int = 4,
+                    tolerance: float = TOLERANCE_AJUSTEMENT) -> Tuple[List[Tuple[FormatPanneau, PlacementPCB]], int]:
+    """
+    Retourne les `nombre` formats les moins coûteux pour la commande, du
+    meilleur au moins bon, avec leur placement, et le nombre de formats dont
+    le placement a été calculé.
+
+    Si tous les formats ont un coût, le classement porte sur le coût de la
+    commande ; sinon, la surface totale du panneau tient lieu de coût.
+
+    Les formats sont d'abord classés par un minorant de leur coût, tiré du
+    majorant du nombre de PCB par la surface. Les placements sont ensuite
+    calculés dans cet ordre, jusqu'à ce que le minorant du format suivant ne
+    puisse plus battre le dernier format retenu.
+    """
+    avec_couts = all(f.cout is not None for f in formats)
+
+    candidats = []
+    for format_panneau in formats:
+        placement = PlacementPCB(format_panneau.panneau(), pcb_prototype, espacement, allow_rotation=allow_rotation,
+                                 cache=cache, strategie=strategie, tolerance=tolerance)
+        borne = placement.borne_superieure()
+        if borne > 0:
+            cout_panneau = format_panneau.cout if avec_couts else format_panneau.largeur * format_panneau.hauteur
+            candidats.append((_cle_classement(cout_panneau, borne, nombre_total_pcb), cout_panneau, format_panneau, placement))
+    candidats.sort(key=lambda candidat: candidat[0])
+
+    retenus = []
+    evalues = 0
+    for minorant, cout_panneau, format_panneau, placement in candidats:
+        if len(retenus) >= nombre and minorant >= retenus[-1][0]:
+            break
+        placement.calculer_meilleur_placement()
+        evalues += 1
+        if placement.nombre_pcb == 0:
+            continue
+        insort(retenus, (_cle_classement(cout_panneau, placement.nombre_pcb, nombre_total_pcb), evalues,
+                         format_panneau, placement))
+        del retenus[nombre:]
+
+    return [(format_panneau, placement) for _, _, format_panneau, placement in retenus], evalues
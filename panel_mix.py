@@ -0,0 +1,103 @@
+"""
+Mélange de formats de panneaux pour une commande : combien de panneaux de
+chaque format lancer pour produire la quantité demandée au moindre coût.
+"""
+from typing import List, Optional
+
+import numpy as np
+
+from logic import Panneau, PlacementPCB, RectanglePCB, StrategiePlacement, CachePlacement, calcul_nombre_total_pcb
+
+# Tolérance relative sur les coûts lors de la reconstruction de la solution
+TOLERANCE = 1e-9
+
+
+def optimiser_melange(nombres_pcb: List[int], couts: List[float], nombre_total_pcb: int) -> dict:
+    """
+    Retourne le mélange de panneaux de coût minimal produisant au moins
+    nombre_total_pcb PCB, nombres_pcb[i] étant le nombre de PCB d'un panneau
+    du format i et couts[i] son coût. À coût égal, le mélange produisant le
+    moins de PCB en trop est retenu.
+
+    Problème de sac à dos non borné (en couverture), résolu exactement par
+    programmation dynamique sur la quantité produite. Pour chaque format, la
+    récurrence f[m] = min(f[m], f[m - n] + c) est calculée d'un bloc sur
+    chaque classe de m modulo n, par minimum cumulé.
+
+    Le format de meilleur coût par PCB (n, c) couvre l'essentiel de la
+    commande : il existe une solution optimale comptant moins de n panneaux
+    des autres formats (parmi n panneaux, un sous-ensemble produit un
+    multiple de n PCB et peut être remplacé par des panneaux de ce format
+    sans surcoût). Seul le reste de la commande passe par la programmation
+    dynamique, ce qui la borne à n x max(nombres_pcb) quel que soit le total.
+    """
+    formats = [i for i, n in enumerate(nombres_pcb) if n > 0]
+    if not formats:
+        raise ValueError("Aucun format de panneau ne peut recevoir le PCB.")
+
+    quantites = [0] * len(nombres_pcb)
+    if nombre_total_pcb > 0:
+        meilleur = min(formats, key=lambda i: (couts[i] / nombres_pcb[i], -nombres_pcb[i]))
+        pcb_meilleur = nombres_pcb[meilleur]
+        pcb_max = max(nombres_pcb[i] for i in formats)
+
+        fixes = max(0, (nombre_total_pcb - pcb_meilleur * pcb_max) // pcb_meilleur)
+        reste = nombre_total_pcb - fixes * pcb_meilleur
+        quantites[meilleur] = fixes
+
+        # f[m] : coût minimal pour produire exactement m PCB ; une solution
+        # optimale produit moins de reste + pcb_max PCB.
+        taille = reste + pcb_max
+        f = np.full(taille, np.inf)
+        f[0] = 0.0
+        for i in formats:
+            n, cout = nombres_pcb[i], couts[i]
+            lignes = -(-taille // n)
+            g = np.full(lignes * n, np.inf)
+            g[:taille] = f
+            g = g.reshape(lignes, n)
+            decalage = np.arange(lignes)[:, None] * cout
+            f = (np.minimum.accumulate(g - decalage, axis=0) + decalage).ravel()[:taille]
+
+        m = reste + int(np.argmin(f[reste:]))
+        while m > 0:
+            for i in formats:
+                n = nombres_pcb[i]
+                if n <= m and f[m - n] + couts[i] <= f[m] + TOLERANCE * max(abs(f[m]), 1.0):
+                    quantites[i] += 1
+                    m -= n
+                    break
+            else:
+                raise RuntimeError("Reconstruction du mélange impossible.")
+
+    quantite_produite = sum(q * n for q, n in zip(quantites, nombres_pcb))
+    return {
+        'panneaux': quantites,
+        'nombre_panneaux': sum(quantites),
+        'cout_total': sum(q * c for q, c in zip(quantites, couts)),
+        'quantite_produite': quantite_produite,
+        'surplus': quantite_produite - nombre_total_pcb,
+    }
+
+
+def optimiser_commande(panneaux: List[Panneau], pcb_prototype: RectanglePCB, espacement: float,
+                       nombre_pcb_a_fabriquer: int, pourcentage_surlancement: float,
+                       couts: Optional[List[float]] = None, allow_rotation: bool = True,
+                       strategie: Optional[StrategiePlacement] = None, cache: Optional[CachePlacement] = None) -> dict:
+    """
+    Calcule le placement du PCB sur chaque format puis le mélange de panneaux
+    de coût minimal pour la commande, surlancement compris. Sans coûts, chaque
+    panneau coûte 1 : le nombre total de panneaux est minimisé.
+    """
+    nombres_pcb = []
+    for panneau in panneaux:
+        placement = PlacementPCB(panneau, pcb_prototype, espacement, allow_rotation=allow_rotation,
+                                 cache=cache, strategie=strategie)
+        placement.calculer_meilleur_placement()
+        nombres_pcb.append(placement.nombre_pcb)
+
+    nombre_total_pcb = calcul_nombre_total_pcb(nombre_pcb_a_fabriquer, pourcentage_surlancement)
+    melange = optimiser_melange(nombres_pcb, couts if couts is not None else [1.0] * len(panneaux), nombre_total_pcb)
+    melange['nombres_pcb'] = nombres_pcb
+    melange['nombre_total_pcb'] = nombre_total_pcb
+    return melange
@@ -0,0 +1,214 @@
+"""
+Rapport PDF vectoriel des placements, écrit directement avec reportlab :
+une page par panneau, avec son dessin et son récapitulatif.
+
+Les pages sont lues une à une depuis un itérable et dessinées aussitôt : les
+placements d'un lot ne sont pas gardés en mémoire. La mémoire n'est pas
+constante pour autant : reportlab conserve les instructions de dessin de
+toutes les pages (une quarantaine d'octets par PCB) jusqu'à l'écriture du
+fichier, et croît donc avec le nombre total de PCB du rapport. Un très gros
+lot est à répartir sur plusieurs rapports. Chaque PCB d'une dimension et d'une orientation
+donnée est dessiné une seule fois, dans un formulaire (XObject) du
+document, puis placé à chacune de ses positions.
+
+Les opérateurs qui placent les PCB d'une page, hormis le premier de chaque
+formulaire, sont écrits sans canvas (operateurs_pcb) : ils peuvent être
+préparés dans d'autres processus (voir export), puis insérés tels quels
+dans la page.
+"""
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.units import mm
+from reportlab.pdfbase.pdfdoc import xObjectName
+from reportlab.pdfgen import canvas
+
+from logic import Panneau
+
+# Couleurs opaques équivalentes à l'affichage (PCB bleus ou verts à 60 %,
+# panneau gris clair à 30 %, sur fond blanc) : sans transparence, les
+# formulaires n'ont besoin d'aucun état graphique propre.
+COULEURS_ROTATION = {0: colors.Color(0.4, 0.4, 1.0), 90: colors.Color(0.4, 0.7, 0.4)}
+COULEUR_PANNEAU = colors.Color(0.95, 0.95, 0.95)
+COULEUR_ZONE_INTERDITE = colors.Color(1.0, 0.6, 0.6)
+
+MARGE = 15 * mm
+HAUTEUR_DESSIN = 0.55 * A4[1]
+INTERLIGNE = 14
+
+# Épaisseur des traits, en mm du panneau
+EPAISSEUR_TRAIT = 0.2
+
+
+class PageRapport:
+    """
+    Une page du rapport : un panneau, les coordonnées de ses PCB
+    (tableau DTYPE_PLACEMENT) et la ligne de résultat correspondante.
+
+    operateurs, s'il est donné, est le résultat de operateurs_pcb pour ces
+    coordonnées, déjà calculé.
+    """
+    def __init__(self, titre: str, panneau: Panneau, coordonnees: np.ndarray, resultat: Optional[dict] = None):
+        self.titre = titre
+        self.panneau = panneau
+        self.coordonnees = coordonnees
+        self.resultat = resultat
+        self.operateurs: Optional[Tuple[str, List[tuple]]] = None
+
+
+def nom_formulaire(largeur: float, hauteur: float, rotation: int) -> str:
+    """
+    Nom du formulaire d'un PCB, tiré de ses dimensions : le même dans tous
+    les processus.
+    """
+    return "pcb_" + "_".join(repr(v).replace('.', 'p').replace('-', 'm').replace('+', '')
+                             for v in (largeur, hauteur, rotation))
+
+
+def operateurs_pcb(coordonnees: np.ndarray) -> Tuple[str, List[tuple]]:
+    """
+    Premier PCB de chaque formulaire, (largeur, hauteur, rotation, x, y), dans
+    l'ordre d'apparition, et opérateurs PDF qui placent tous les autres PCB
+    (leur formulaire, translaté à leur position). Les premiers sont dessinés
+    par le canvas, qui déclare ainsi les formulaires utilisés par la page.
+    """
+    noms = {}
+    premiers = []
+    lignes = []
+    for x, y, largeur, hauteur, rotation in np.asarray(coordonnees)[['x', 'y', 'largeur', 'hauteur', 'rotation']].tolist():
+        cle = (largeur, hauteur, rotation)
+        nom = noms.get(cle)
+        if nom is None:
+            noms[cle] = xObjectName(nom_formulaire(*cle))
+            premiers.append((largeur, hauteur, rotation, x, y))
+        else:
+            lignes.append(f"q 1 0 0 1 {x:.4f} {y:.4f} cm /{nom} Do Q")
+    return "\n".join(lignes), premiers
+
+
+def lignes_resultat(resultat: dict) -> List[str]:
+    """
+    Lignes de texte du récapitulatif d'un panneau.
+    """
+    lignes = [
+        f"Panneau {resultat['panneau']}:",
+        f"    Dimensions Totales: {resultat['dimensions_totales']}",
+        f"    Dimensions Utilisables: {resultat['dimensions_utilisables']}",
+        f"    PCB par Panneau: {resultat['nombre_pcb']}",
+        f"    Remplissage: {resultat['pourcentage_remplissage']:.2f}%",
+        f"    Panneaux Nécessaires: {resultat['nombre_panneaux_necessaires']}",
+        f"    Quantité Produite: {resultat['quantite_produite']}"
+    ]
+    if resultat.get('cout_total') is not None:
+        lignes.append(f"    Coût Total: {resultat['cout_total']:.2f}")
+    return lignes
+
+
+class _RapportPDF:
+    """
+    Écriture des pages sur un canvas reportlab, avec les formulaires des PCB
+    déjà définis dans le document.
+    """
+    def __init__(self, fichier, titre: str):
+        self.canvas = canvas.Canvas(fichier, pagesize=A4, pageCompression=1)
+        self.canvas.setTitle(titre)
+        self.titre = titre
+        self.formulaires = {}
+        self.pages = 0
+        self.y = 0
+
+    def formulaire(self, largeur: float, hauteur: float, rotation: int) -> str:
+        """
+        Nom du formulaire d'un PCB, défini au premier usage (en mm du panneau).
+        """
+        cle = (largeur, hauteur, rotation)
+        nom = self.formulaires.get(cle)
+        if nom is None:
+            nom = nom_formulaire(largeur, hauteur, rotation)
+            c = self.canvas
+            c.beginForm(nom, lowerx=0, lowery=0, upperx=largeur, uppery=hauteur)
+            c.setLineWidth(EPAISSEUR_TRAIT)
+            c.setStrokeColor(colors.black)
+            c.setFillColor(COULEURS_ROTATION.get(rotation, COULEURS_ROTATION[0]))
+            c.rect(0, 0, largeur, hauteur, stroke=1, fill=1)
+            c.endForm()
+            self.formulaires[cle] = nom
+        return nom
+
+    def nouvelle_page(self):
+        if self.pages:
+            self.canvas.showPage()
+        self.pages += 1
+        self.y = A4[1] - MARGE
+
+    def texte(self, ligne: str, police: str = 'Helvetica', taille: int = 10):
+        if self.y < MARGE:
+            self.nouvelle_page()
+        self.canvas.setFont(police, taille)
+        self.canvas.drawString(MARGE, self.y, ligne)
+        self.y -= INTERLIGNE
+
+    def page(self, page: PageRapport):
+        self.nouvelle_page()
+        self.texte(page.titre, 'Helvetica-Bold', 14)
+
+        panneau = page.panneau
+        largeur_dessin = A4[0] - 2 * MARGE
+        echelle = min(largeur_dessin / panneau.largeur_totale, HAUTEUR_DESSIN / panneau.hauteur_totale)
+        hauteur = panneau.hauteur_totale * echelle
+        self.y -= hauteur
+
+        c = self.canvas
+        c.saveState()
+        c.translate(MARGE + (largeur_dessin - panneau.largeur_totale * echelle) / 2, self.y)
+        c.scale(echelle, echelle)
+        c.setLineWidth(EPAISSEUR_TRAIT)
+        c.setStrokeColor(colors.black)
+        c.setFillColor(COULEUR_PANNEAU)
+        c.rect(0, 0, panneau.largeur_totale, panneau.hauteur_totale, stroke=1, fill=1)
+        c.rect(panneau.bordure_gauche, panneau.bordure_bas, panneau.largeur, panneau.hauteur, stroke=1, fill=0)
+        c.setFillColor(COULEUR_ZONE_INTERDITE)
+        for x, y, largeur, hauteur in panneau.zones_interdites:
+            c.rect(x, y, largeur, hauteur, stroke=0, fill=1)
+
+        operateurs, premiers = page.operateurs or operateurs_pcb(page.coordonnees)
+        for largeur, hauteur_pcb, rotation, x, y in premiers:
+            nom = self.formulaire(largeur, hauteur_pcb, rotation)
+            c.saveState()
+            c.translate(x, y)
+            c.doForm(nom)
+            c.restoreState()
+        if operateurs:
+            c.addLiteral(operateurs)
+        c.restoreState()
+
+        self.y -= 2 * INTERLIGNE
+        if page.resultat is not None:
+            for ligne in lignes_resultat(page.resultat):
+                self.texte(ligne)
+
+
+def ecrire_rapport(fichier, pages: Iterable[PageRapport], titre: str = "Récapitulatif de la panélisation",
+                   notes: Iterable[str] = ()) -> int:
+    """
+    Écrit le rapport dans un fichier (chemin ou fichier binaire) et retourne
+    le nombre de pages. Les pages peuvent être produites à la demande par un
+    générateur ; les notes sont ajoutées après la dernière page.
+    """
+    rapport = _RapportPDF(fichier, titre)
+    for page in pages:
+        rapport.page(page)
+
+    if not rapport.pages:
+        rapport.nouvelle_page()
+        rapport.texte(titre, 'Helvetica-Bold', 14)
+    notes = list(notes)
+    if notes:
+        rapport.y -= INTERLIGNE
+        for note in notes:
+            rapport.texte(note, 'Helvetica-Bold', 10)
+
+    rapport.canvas.save()
+    return rapport.pages
@@ -0,0 +1,309 @@
+"""
+Calcul incrémental de la panélisation, modélisé comme un petit graphe de
+dépendances : entrées -> géométrie des panneaux -> placements -> chiffres de
+production -> rendu.
+
+Chaque étape n'est recalculée que si l'une de ses dépendances a changé
+depuis son dernier calcul : modifier la quantité ou le surlancement ne
+recalcule que les chiffres de production, sans reconstruire les panneaux,
+refaire les placements ni redessiner. Le graphe compte, par étape, les
+calculs faits et ceux qui ont été évités.
+"""
+from functools import partial
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from logic import (
+    TOLERANCE_AJUSTEMENT, CachePlacement, Panneau, PlacementPCB, RectanglePCB, calcul_nombre_total_pcb, calcul_resultat,
+    strategie_par_nom
+)
+
+# Entrées communes à tous les panneaux
+ENTREES = ('largeur_pcb', 'hauteur_pcb', 'espacement', 'bordure', 'allow_rotation', 'strategie', 'tolerance',
+           'nombre_pcb_a_fabriquer', 'pourcentage_surlancement')
+
+
+def _identiques(a, b) -> bool:
+    """
+    Vrai si une nouvelle valeur est égale à la précédente ; les objets sans
+    égalité propre (panneaux, placements) sont toujours considérés changés.
+    """
+    try:
+        return a is b or (type(a) is type(b) and bool(a == b))
+    except (TypeError, ValueError):
+        return False
+
+
+def _nom_etape(nom: str) -> str:
+    """
+    Nom d'une étape sans son indice de panneau ('placement[2]' -> 'placement').
+    """
+    return nom.split('[', 1)[0]
+
+
+class GrapheCalcul:
+    """
+    Graphe de dépendances entre des entrées et des étapes de calcul.
+
+    Chaque nœud porte une version, incrémentée quand sa valeur change. Une
+    étape retient les versions de ses dépendances à son dernier calcul (sa
+    signature) : tant qu'elles sont inchangées, sa valeur est réutilisée.
+    Une étape recalculée dont la valeur est égale à la précédente garde sa
+    version, et les étapes qui en dépendent ne sont pas recalculées.
+    """
+    def __init__(self):
+        self._etapes: Dict[str, Tuple[Callable, Tuple[str, ...]]] = {}
+        self._valeurs = {}
+        self._versions: Dict[str, int] = {}
+        self._signatures: Dict[str, tuple] = {}
+        # Par étape (sans indice de panneau) : [calculs, sauts]. Un nœud
+        # n'est compté qu'une fois entre deux modifications des entrées.
+        self.compteurs: Dict[str, List[int]] = {}
+        self._comptes = set()
+
+    def entree(self, nom: str, valeur=None):
+        """
+        Déclare une entrée, avec sa valeur initiale.
+        """
+        self._valeurs[nom] = valeur
+        self._versions[nom] = 0
+
+    def etape(self, nom: str, fonction: Callable, dependances: Iterable[str]):
+        """
+        Déclare une étape calculée par fonction(*valeurs des dépendances).
+        """
+        dependances = tuple(dependances)
+        inconnues = [d for d in dependances if d not in self._versions and d not in self._etapes]
+        if inconnues:
+            raise ValueError(f"Dépendances inconnues de {nom} : {', '.join(inconnues)}")
+        self._etapes[nom] = (fonction, dependances)
+        self._versions[nom] = 0
+        self.compteurs.setdefault(_nom_etape(nom), [0, 0])
+
+    def definir(self, **valeurs):
+        """
+        Modifie des entrées ; seules celles dont la valeur change invalident
+        les étapes qui en dépendent.
+        """
+        for nom, valeur in valeurs.items():
+            if nom not in self._versions or nom in self._etapes:
+                raise ValueError(f"Entrée inconnue : {nom}")
+            if not _identiques(self._valeurs[nom], valeur):
+                self._valeurs[nom] = valeur
+                self._versions[nom] += 1
+        self._comptes.clear()
+
+    def signature(self, nom: str) -> tuple:
+        """
+        Versions des dépendances d'une étape, mises à jour au besoin.
+        """
+        _, dependances = self._etapes[nom]
+        for dependance in dependances:
+            if dependance in self._etapes:
+                self.calculer(dependance)
+        return tuple(self._versions[d] for d in dependances)
+
+    def valeur(self, nom: str):
+        """
+        Dernière valeur d'un nœud, sans recalcul.
+        """
+        return self._valeurs.get(nom)
+
+    def calculer(self, nom: str):
+        """
+        Valeur d'un nœud, après recalcul des seules étapes périmées.
+        """
+        if nom not in self._etapes:
+            return self._valeurs[nom]
+        signature = self.signature(nom)
+        if self._signatures.get(nom) == signature:
+            self._compter_saut(nom)
+            return self._valeurs[nom]
+
+        fonction, dependances = self._etapes[nom]
+        valeur = fonction(*(self._valeurs[d] for d in dependances))
+        self.fixer(nom, valeur, signature)
+        return valeur
+
+    def fixer(self, nom: str, valeur, signature: tuple):
+        """
+        Enregistre la valeur d'une étape calculée hors du graphe (par exemple
+        dans un thread), avec la signature relevée avant son calcul.
+        """
+        if nom not in self._signatures or not _identiques(self._valeurs.get(nom), valeur):
+            self._valeurs[nom] = valeur
+            self._versions[nom] += 1
+        self._signatures[nom] = signature
+        self.compteurs[_nom_etape(nom)][0] += 1
+        self._comptes.add(nom)
+
+    def _compter_saut(self, nom: str):
+        if nom not in self._comptes:
+            self.compteurs[_nom_etape(nom)][1] += 1
+            self._comptes.add(nom)
+
+    def invalider(self, nom: str):
+        """
+        Force le recalcul d'une étape à sa prochaine lecture (et de celles qui
+        en dépendent, si sa valeur change).
+        """
+        self._signatures.pop(nom, None)
+
+    def remettre_a_zero_compteurs(self):
+        for compteur in self.compteurs.values():
+            compteur[:] = [0, 0]
+        self._comptes.clear()
+
+    def rapport(self) -> str:
+        """
+        Nœuds recalculés sur nœuds lus, par étape, depuis la dernière remise
+        à zéro (« placement 1/4 » : un placement refait, trois réutilisés).
+        """
+        etapes = ", ".join(f"{etape} {calculs}/{calculs + sauts}"
+                           for etape, (calculs, sauts) in self.compteurs.items() if calculs or sauts)
+        return f"Étapes recalculées : {etapes}" if etapes else ""
+
+
+def _production(numero: int, placement: PlacementPCB, nombre_total_pcb: int) -> dict:
+    resultat = calcul_resultat(numero, placement.panneau, placement.nombre_pcb, placement.surface_occupee,
+                               nombre_total_pcb)
+    resultat['cout_total'] = None
+    return resultat
+
+
+class GraphePanelisation(GrapheCalcul):
+    """
+    Graphe de calcul d'un PCB sur plusieurs formats de panneau, utilisable
+    sans interface :
+
+        graphe = GraphePanelisation(2)
+        graphe.definir(largeur_pcb=20, hauteur_pcb=15, panneaux_largeurs=[600, 457], panneaux_hauteurs=[500, 300])
+        resultats = graphe.resultats()
+        graphe.definir(nombre_pcb_a_fabriquer=5000)
+        resultats = graphe.resultats()   # placements réutilisés
+
+    Les étapes de chaque panneau portent son indice : panneau[i],
+    placement[i], production[i] et, si une fonction de rendu est donnée,
+    rendu[i] (rendu(i, placement), appelée seulement quand le placement change).
+
+    Avec un historique (job_history.HistoriqueTravaux), un placement déjà
+    calculé avec les mêmes entrées y est relu au lieu d'être recalculé, et
+    l'étape historique[i] y enregistre chaque nouvelle ligne de résultat, à
+    la place de la précédente pour le même placement.
+    """
+    def __init__(self, nombre_panneaux: int, cache: Optional[CachePlacement] = None,
+                 rendu: Optional[Callable[[int, PlacementPCB], object]] = None, historique=None):
+        super().__init__()
+        self.nombre_panneaux = nombre_panneaux
+        self.cache = cache
+        self.avec_rendu = rendu is not None
+        self.historique = historique
+        # Placements relus dans l'historique depuis la dernière remise à zéro
+        self.repris = 0
+
+        valeurs_defaut = {'espacement': 5, 'bordure': 15, 'allow_rotation': True, 'strategie': 'heuristique',
+                          'tolerance': TOLERANCE_AJUSTEMENT, 'nombre_pcb_a_fabriquer': 1, 'pourcentage_surlancement': 5}
+        for nom in ENTREES:
+            self.entree(nom, valeurs_defaut.get(nom))
+        self.etape('pcb', RectanglePCB, ('largeur_pcb', 'hauteur_pcb'))
+        self.etape('nombre_total_pcb', calcul_nombre_total_pcb, ('nombre_pcb_a_fabriquer', 'pourcentage_surlancement'))
+
+        for i in range(nombre_panneaux):
+            self.entree(f'largeur_panneau[{i}]')
+            self.entree(f'hauteur_panneau[{i}]')
+            self.etape(f'panneau[{i}]', Panneau, (f'largeur_panneau[{i}]', f'hauteur_panneau[{i}]', 'bordure'))
+            self.etape(f'placement[{i}]', self._placer, self._dependances_placement(i))
+            self.etape(f'production[{i}]', partial(_production, i + 1), (f'placement[{i}]', 'nombre_total_pcb'))
+            if rendu is not None:
+                self.etape(f'rendu[{i}]', partial(rendu, i), (f'placement[{i}]',))
+            if historique is not None:
+                self.etape(f'historique[{i}]', self._archiver, (f'placement[{i}]', f'production[{i}]',
+                                                                 'nombre_total_pcb'))
+
+    @staticmethod
+    def _dependances_placement(index: int) -> Tuple[str, ...]:
+        return f'panneau[{index}]', 'pcb', 'espacement', 'allow_rotation', 'strategie', 'tolerance'
+
+    def definir(self, panneaux_largeurs: Optional[List[float]] = None, panneaux_hauteurs: Optional[List[float]] = None,
+                **valeurs):
+        """
+        Modifie des entrées ; les dimensions des panneaux peuvent être
+        données en listes (un élément par panneau).
+        """
+        for nom, dimensions in (('largeur_panneau', panneaux_largeurs), ('hauteur_panneau', panneaux_hauteurs)):
+            if dimensions is not None:
+                valeurs.update({f'{nom}[{i}]': d for i, d in enumerate(dimensions[:self.nombre_panneaux])})
+        super().definir(**valeurs)
+
+    def _nouveau_placement(self, panneau: Panneau, pcb: RectanglePCB, espacement: float, allow_rotation: bool,
+                           strategie: str, tolerance: float) -> PlacementPCB:
+        return PlacementPCB(panneau, pcb, espacement, allow_rotation=allow_rotation, cache=self.cache,
+                            strategie=strategie_par_nom(strategie), tolerance=tolerance)
+
+    def _placer(self, *valeurs) -> PlacementPCB:
+        placement = self._nouveau_placement(*valeurs)
+        if not self._restaurer(placement):
+            placement.calculer_meilleur_placement()
+        return placement
+
+    def _restaurer(self, placement: PlacementPCB) -> bool:
+        """
+        Vrai si le placement a été relu dans l'historique.
+        """
+        if self.historique is None or not self.historique.restaurer(placement):
+            return False
+        self.repris += 1
+        return True
+
+    def _archiver(self, placement: PlacementPCB, production: dict, nombre_total_pcb: int):
+        self.historique.ajouter(placement, production, nombre_total_pcb)
+
+    def placement_a_calculer(self, index: int) -> Optional[Tuple[PlacementPCB, tuple]]:
+        """
+        Pour un calcul hors du graphe : None si le placement du panneau est à
+        jour (le saut est compté) ou a été relu dans l'historique, sinon le
+        placement à calculer et la signature à rendre à fixer().
+        """
+        nom = f'placement[{index}]'
+        signature = self.signature(nom)
+        if self._signatures.get(nom) == signature:
+            self._compter_saut(nom)
+            return None
+        _, dependances = self._etapes[nom]
+        placement = self._nouveau_placement(*(self._valeurs[d] for d in dependances))
+        if self._restaurer(placement):
+            self.fixer(nom, placement, signature)
+            return None
+        return placement, signature
+
+    def placements(self) -> List[PlacementPCB]:
+        return [self.calculer(f'placement[{i}]') for i in range(self.nombre_panneaux)]
+
+    def resultats(self) -> List[dict]:
+        """
+        Ligne de résultat de chaque panneau, après rendu des panneaux dont le
+        placement a changé et enregistrement dans l'historique.
+        """
+        resultats = [self.calculer(f'production[{i}]') for i in range(self.nombre_panneaux)]
+        self.terminer(range(self.nombre_panneaux))
+        return resultats
+
+    def terminer(self, indices: Iterable[int]):
+        """
+        Rend et enregistre dans l'historique les panneaux donnés dont le
+        placement ou les chiffres de production ont changé.
+        """
+        for i in indices:
+            if self.avec_rendu:
+                self.calculer(f'rendu[{i}]')
+            if self.historique is not None:
+                self.calculer(f'historique[{i}]')
+
+    def remettre_a_zero_compteurs(self):
+        super().remettre_a_zero_compteurs()
+        self.repris = 0
+
+    def rapport(self) -> str:
+        rapport = super().rapport()
+        if rapport and self.repris:
+            rapport += f" ; placements relus dans l'historique : {self.repris}"
+        return rapport
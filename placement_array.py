@@ -0,0 +1,171 @@
+import numpy as np
+from typing import List, Optional, Tuple
+
+from logic import MICRONS_PAR_MM, PlacementPCB, RectanglePCB, StrategieHeuristique, _compter_positions, microns
+
+# Colonnes d'un placement : une ligne par PCB
+DTYPE_PLACEMENT = np.dtype([
+    ('x', 'f8'),
+    ('y', 'f8'),
+    ('largeur', 'f8'),
+    ('hauteur', 'f8'),
+    ('rotation', 'i2'),
+])
+
+
+def _grille(N_largeur: int, N_hauteur: int, x0: int, y0: int, pcb: RectanglePCB, espacement: int,
+            x_max: Optional[int] = None, y_max: Optional[int] = None) -> np.ndarray:
+    """
+    Construit une grille de PCB identiques par broadcasting.
+    Origines, espacement et limites sont en micromètres ; le contrôle de
+    dépassement est appliqué comme un masque sur chaque axe.
+    """
+    largeur = microns(pcb.largeur)
+    hauteur = microns(pcb.hauteur)
+    xs = x0 + np.arange(max(N_largeur, 0), dtype=np.int64) * (largeur + espacement)
+    ys = y0 + np.arange(max(N_hauteur, 0), dtype=np.int64) * (hauteur + espacement)
+    if x_max is not None:
+        xs = xs[xs + largeur <= x_max]
+    if y_max is not None:
+        ys = ys[ys + hauteur <= y_max]
+
+    gx, gy = np.meshgrid(xs, ys, indexing='ij')
+    tableau = np.empty(gx.size, dtype=DTYPE_PLACEMENT)
+    tableau['x'] = gx.ravel() / MICRONS_PAR_MM
+    tableau['y'] = gy.ravel() / MICRONS_PAR_MM
+    tableau['largeur'] = pcb.largeur
+    tableau['hauteur'] = pcb.hauteur
+    tableau['rotation'] = pcb.rotation
+    return tableau
+
+
+def calculer_coordonnees(placement: PlacementPCB, cas: Optional[int] = None, retrait: Optional[str] = None) -> np.ndarray:
+    """
+    Calcule les coordonnées des PCB d'une configuration sous forme de tableau structuré.
+    Sans configuration explicite, utilise celle retenue par calculer_meilleur_placement.
+    Les configurations des autres stratégies sont converties depuis leurs rectangles.
+    Les PCB qui empiètent sur une zone interdite du panneau sont exclus.
+    """
+    if cas is None:
+        if placement.configuration is None:
+            return np.empty(0, dtype=DTYPE_PLACEMENT)
+        if not isinstance(placement.strategie, StrategieHeuristique):
+            return tableau_depuis_rectangles(placement.rectangles)
+        cas = placement.configuration['cas']
+        retrait = placement.configuration['retrait']
+
+    pcb = placement.pcb_prototype.copy()
+    if cas == 2:
+        pcb.rotate()
+
+    x_origine, y_origine, largeur, hauteur, espacement = placement.zone_microns()
+    N_largeur, N_hauteur = placement._grille(pcb, retrait)
+    blocs = [_grille(N_largeur, N_hauteur, x_origine, y_origine, pcb, espacement)]
+
+    if placement.allow_rotation:
+        pcb_rot = pcb.copy()
+        pcb_rot.rotate()
+        for N_largeur_rot, N_hauteur_rot, x0, y0 in placement._bandes_rotees(pcb, pcb_rot, retrait, N_largeur, N_hauteur):
+            blocs.append(_grille(N_largeur_rot, N_hauteur_rot, x0, y0, pcb_rot, espacement,
+                                 x_origine + largeur, y_origine + hauteur))
+
+    return _hors_zones(placement, np.concatenate(blocs))
+
+
+def _hors_zones(placement: PlacementPCB, tableau: np.ndarray) -> np.ndarray:
+    """
+    Retire du tableau les PCB qui empiètent sur une zone interdite, d'un bloc.
+    """
+    if not placement.panneau.zones_interdites:
+        return tableau
+    libres = placement.panneau.index_zones.masque(tableau['x'], tableau['y'], tableau['largeur'], tableau['hauteur'],
+                                                  placement.espacement)
+    return tableau[libres]
+
+
+def _grilles_heuristique(placement: PlacementPCB, cas: int, retrait: Optional[str]) -> List[tuple]:
+    """
+    Grilles régulières (x0, y0, pas_x, pas_y, colonnes, rangées, largeur,
+    hauteur) d'une configuration de la stratégie heuristique, en micromètres
+    entiers pour l'index des zones.
+    """
+    pcb = placement.pcb_prototype.copy()
+    if cas == 2:
+        pcb.rotate()
+
+    x_origine, y_origine, largeur, hauteur, espacement = placement.zone_microns()
+    N_largeur, N_hauteur = placement._grille(pcb, retrait)
+    largeur_pcb, hauteur_pcb = microns(pcb.largeur), microns(pcb.hauteur)
+    grilles = [(x_origine, y_origine, largeur_pcb + espacement, hauteur_pcb + espacement,
+                max(N_largeur, 0), max(N_hauteur, 0), largeur_pcb, hauteur_pcb)]
+
+    if placement.allow_rotation:
+        pcb_rot = pcb.copy()
+        pcb_rot.rotate()
+        largeur_rot = microns(pcb_rot.largeur)
+        hauteur_rot = microns(pcb_rot.hauteur)
+        pas_x = largeur_rot + espacement
+        pas_y = hauteur_rot + espacement
+        for N_largeur_rot, N_hauteur_rot, x0, y0 in placement._bandes_rotees(pcb, pcb_rot, retrait, N_largeur, N_hauteur):
+            grilles.append((x0, y0, pas_x, pas_y,
+                            _compter_positions(N_largeur_rot, x0, pas_x, largeur_rot, x_origine + largeur),
+                            _compter_positions(N_hauteur_rot, y0, pas_y, hauteur_rot, y_origine + hauteur),
+                            largeur_rot, hauteur_rot))
+    return grilles
+
+
+def compter_hors_zones(placement: PlacementPCB, configurations: List[dict]) -> List[Tuple[int, float]]:
+    """
+    Nombre de PCB et surface occupée de chaque configuration de la stratégie
+    du placement, PCB empiétant sur une zone interdite exclus.
+
+    Les configurations heuristiques sont des grilles régulières : leurs PCB
+    interdits sont comptés d'un bloc par l'index des zones, sans construire
+    les coordonnées. Celles des autres stratégies sont construites puis
+    filtrées.
+    """
+    surface_pcb = placement.pcb_prototype.largeur * placement.pcb_prototype.hauteur
+    if not isinstance(placement.strategie, StrategieHeuristique):
+        nombres = []
+        for configuration in configurations:
+            rectangles = placement._rectangles
+            placement._rectangles = []
+            try:
+                placement.strategie.placer(placement, configuration)
+                nombres.append(len(_hors_zones(placement, tableau_depuis_rectangles(placement._rectangles))))
+            finally:
+                placement._rectangles = rectangles
+        return [(nombre, nombre * surface_pcb) for nombre in nombres]
+
+    grilles = []
+    groupes = []
+    for k, configuration in enumerate(configurations):
+        for grille in _grilles_heuristique(placement, configuration['cas'], configuration['retrait']):
+            grilles.append(grille)
+            groupes.append(k)
+    if not grilles:
+        return []
+    grilles = np.array(grilles, dtype=np.int64)
+    libres = grilles[:, 4] * grilles[:, 5] - placement.panneau.index_zones.compter_grilles(grilles, placement.espacement)
+    nombres = np.bincount(groupes, weights=libres, minlength=len(configurations))
+    return [(int(nombre), int(nombre) * surface_pcb) for nombre in nombres]
+
+
+def rectangles_depuis_tableau(tableau: np.ndarray) -> List[RectanglePCB]:
+    """
+    Convertit un tableau de coordonnées en liste de RectanglePCB.
+    """
+    return [
+        RectanglePCB(largeur, hauteur, x, y, rotation)
+        for x, y, largeur, hauteur, rotation in tableau.tolist()
+    ]
+
+
+def tableau_depuis_rectangles(rectangles: List[RectanglePCB]) -> np.ndarray:
+    """
+    Convertit une liste de RectanglePCB en tableau de coordonnées.
+    """
+    return np.array(
+        [(r.x, r.y, r.largeur, r.hauteur, r.rotation) for r in rectangles],
+        dtype=DTYPE_PLACEMENT,
+    )
@@ -0,0 +1,53 @@
+import numpy as np
+from matplotlib import patches
+from matplotlib.collections import PolyCollection
+
+from logic import Panneau
+
+# Couleur des PCB selon leur rotation
+COULEURS_ROTATION = {0: 'blue', 90: 'green'}
+
+
+def sommets(coordonnees: np.ndarray) -> np.ndarray:
+    """
+    Retourne les sommets (n, 4, 2) des rectangles d'un tableau de coordonnées.
+    """
+    x = coordonnees['x']
+    y = coordonnees['y']
+    x2 = x + coordonnees['largeur']
+    y2 = y + coordonnees['hauteur']
+    return np.stack([
+        np.column_stack([x, y]),
+        np.column_stack([x2, y]),
+        np.column_stack([x2, y2]),
+        np.column_stack([x, y2]),
+    ], axis=1)
+
+
+def dessiner_panneau(ax, panneau: Panneau, coordonnees: np.ndarray, titre: str):
+    """
+    Dessine un panneau et ses PCB sur un axe, avec une collection par rotation.
+    """
+    panneau_patch = patches.Rectangle((0, 0), panneau.largeur_totale, panneau.hauteur_totale,
+                                      linewidth=1, edgecolor='black', facecolor='lightgray', alpha=0.3)
+    ax.add_patch(panneau_patch)
+
+    surface_utilisable_patch = patches.Rectangle((panneau.bordure_gauche, panneau.bordure_bas), panneau.largeur, panneau.hauteur,
+                                                 linewidth=1, edgecolor='black', facecolor='none')
+    ax.add_patch(surface_utilisable_patch)
+
+    for x, y, largeur, hauteur in panneau.zones_interdites:
+        ax.add_patch(patches.Rectangle((x, y), largeur, hauteur, linewidth=0.5, edgecolor='red', facecolor='red',
+                                       alpha=0.4, hatch='//'))
+
+    for rotation, couleur in COULEURS_ROTATION.items():
+        selection = coordonnees[coordonnees['rotation'] == rotation]
+        if len(selection):
+            ax.add_collection(PolyCollection(sommets(selection), linewidths=1, edgecolors='black',
+                                             facecolors=couleur, alpha=0.6), autolim=False)
+
+    ax.set_xlim(0, panneau.largeur_totale)
+    ax.set_ylim(0, panneau.hauteur_totale)
+    ax.set_aspect('equal', adjustable='box')
+    ax.set_title(titre)
+    ax.axis('off')
@@ -0,0 +1,167 @@
+import csv
+from typing import Iterable, Optional, TextIO, Tuple
+
+import numpy as np
+
+from logic import (
+    MICRONS_PAR_MM, TOLERANCE_AJUSTEMENT, Panneau, PlacementPCB, RectanglePCB, StrategieHeuristique, StrategiePlacement,
+    _BRUIT_MICRONS, microns, microns_inf
+)
+
+DTYPE_BALAYAGE = np.dtype([
+    ('espacement', 'f8'),
+    ('bordure', 'f8'),
+    ('largeur_panneau', 'f8'),
+    ('hauteur_panneau', 'f8'),
+    ('nombre_pcb', 'i8'),
+    ('pourcentage_remplissage', 'f8'),
+])
+
+
+def _microns(longueurs: np.ndarray, inferieur: bool = False) -> np.ndarray:
+    """
+    Longueurs en micromètres, arrondies comme microns (ou microns_inf).
+    """
+    if inferieur:
+        return np.floor(longueurs * MICRONS_PAR_MM + _BRUIT_MICRONS).astype(np.int64)
+    return np.ceil(longueurs * MICRONS_PAR_MM - _BRUIT_MICRONS).astype(np.int64)
+
+
+def points_de_rupture(longueur_max: int, largeur_pcb: int, hauteur_pcb: int, espacement: int,
+                      complet: bool = True) -> np.ndarray:
+    """
+    Retourne les longueurs utiles a * (largeur + espacement) + b * (hauteur + espacement) - espacement
+    jusqu'au premier point au-delà de longueur_max, toutes longueurs en
+    micromètres. Le nombre de PCB placés ne change, le long d'un axe, qu'en
+    ces valeurs.
+
+    Avec complet=False, seules les combinaisons utilisées par l'heuristique
+    sont retenues : une bande rotée n'occupe jamais plus de deux pas de la
+    grille principale (reste de la grille plus une colonne retirée).
+    """
+    pas = np.array([largeur_pcb + espacement, hauteur_pcb + espacement], dtype=np.int64)
+    if np.any(pas <= 0):
+        return np.empty(0, dtype=np.int64)
+    limite = max(longueur_max, 0) + espacement + int(pas.max())
+
+    combinaisons = []
+    for pas_grille, pas_bande in (pas, pas[::-1]):
+        a = np.arange(limite // pas_grille + 1, dtype=np.int64)
+        b_max = limite // pas_bande if complet else 2 * pas_grille // pas_bande
+        b = np.arange(b_max + 1, dtype=np.int64)
+        combinaisons.append((a[:, None] * pas_grille + b[None, :] * pas_bande).ravel())
+
+    points = np.concatenate(combinaisons) - espacement
+    return np.unique(points[points <= limite])
+
+
+def _cellules(longueurs: np.ndarray, points: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Retourne l'indice de cellule de chaque longueur (en micromètres) et une
+    longueur représentative de la cellule : le point de rupture qui la
+    commence. Une longueur égale à un point de rupture appartient à la
+    cellule qui commence en ce point.
+    """
+    indices = np.searchsorted(points, longueurs, side='right')
+    representants = longueurs.copy()
+    dans = indices > 0
+    representants[dans] = points[indices[dans] - 1]
+    return indices, representants
+
+
+def balayer(largeur_pcb: float, hauteur_pcb: float, espacements: Iterable[float], bordures: Iterable[float],
+            largeurs_panneau: Iterable[float], hauteurs_panneau: Iterable[float], allow_rotation: bool = True,
+            strategie: Optional[StrategiePlacement] = None, tolerance: float = TOLERANCE_AJUSTEMENT) -> np.ndarray:
+    """
+    Évalue le placement d'un PCB sur toute la grille espacement x bordure x
+    largeur x hauteur de panneau.
+
+    Retourne un tableau structuré de forme (espacements, bordures, largeurs,
+    hauteurs) avec le nombre de PCB et le pourcentage de remplissage.
+
+    Le nombre de PCB ne dépend du panneau que par ses dimensions utiles, et
+    reste constant entre deux points de rupture de chaque axe : une seule
+    évaluation est faite par cellule de la grille des points de rupture. Les
+    longueurs sont comparées en micromètres entiers : une valeur tombant
+    exactement sur un point de rupture reçoit le résultat exact (le PCB qui
+    tient juste est compté).
+    """
+    espacements = np.asarray(list(espacements), dtype=float)
+    bordures = np.asarray(list(bordures), dtype=float)
+    largeurs_panneau = np.asarray(list(largeurs_panneau), dtype=float)
+    hauteurs_panneau = np.asarray(list(hauteurs_panneau), dtype=float)
+
+    tableau = np.empty((len(espacements), len(bordures), len(largeurs_panneau), len(hauteurs_panneau)),
+                       dtype=DTYPE_BALAYAGE)
+    e, b, lp, hp = np.meshgrid(espacements, bordures, largeurs_panneau, hauteurs_panneau, indexing='ij')
+    tableau['espacement'] = e
+    tableau['bordure'] = b
+    tableau['largeur_panneau'] = lp
+    tableau['hauteur_panneau'] = hp
+
+    # Dimensions utiles de chaque couple (bordure, dimension totale), en
+    # micromètres, puis longueurs admises (tolérance comprise)
+    largeurs = _microns(largeurs_panneau, inferieur=True)[None, :] - 2 * _microns(bordures)[:, None]
+    hauteurs = _microns(hauteurs_panneau, inferieur=True)[None, :] - 2 * _microns(bordures)[:, None]
+    largeurs_uniques, indices_largeur = np.unique(largeurs, return_inverse=True)
+    hauteurs_uniques, indices_hauteur = np.unique(hauteurs, return_inverse=True)
+    indices_largeur = indices_largeur.reshape(largeurs.shape)
+    indices_hauteur = indices_hauteur.reshape(hauteurs.shape)
+    tolerance_microns = microns_inf(tolerance)
+    largeurs_admises = largeurs_uniques + tolerance_microns
+    hauteurs_admises = hauteurs_uniques + tolerance_microns
+
+    pcb_prototype = RectanglePCB(largeur_pcb, hauteur_pcb)
+    surface_pcb = largeur_pcb * hauteur_pcb
+    complet = strategie is not None and not isinstance(strategie, StrategieHeuristique)
+
+    for index_espacement, espacement in enumerate(espacements):
+        pas = (microns(largeur_pcb), microns(hauteur_pcb), microns(espacement))
+        cellules_largeur, representants_largeur = _cellules(largeurs_admises, points_de_rupture(
+            int(largeurs_admises.max(initial=0)), *pas, complet))
+        cellules_hauteur, representants_hauteur = _cellules(hauteurs_admises, points_de_rupture(
+            int(hauteurs_admises.max(initial=0)), *pas, complet))
+
+        # Une évaluation par couple de cellules, sur ses longueurs représentatives
+        evaluations = {}
+        nombres = np.zeros((len(largeurs_uniques), len(hauteurs_uniques)), dtype=np.int64)
+        for i, largeur in enumerate(largeurs_uniques):
+            for j, hauteur in enumerate(hauteurs_uniques):
+                if largeur <= 0 or hauteur <= 0:
+                    continue
+                cle = (cellules_largeur[i], cellules_hauteur[j])
+                nombre = evaluations.get(cle)
+                if nombre is None:
+                    nombre = _compter((int(representants_largeur[i]) - tolerance_microns) / MICRONS_PAR_MM,
+                                      (int(representants_hauteur[j]) - tolerance_microns) / MICRONS_PAR_MM,
+                                      pcb_prototype, espacement, allow_rotation, strategie, tolerance)
+                    evaluations[cle] = nombre
+                nombres[i, j] = nombre
+
+        # nombres_panneau[bordure, largeur, hauteur]
+        nombres_panneau = nombres[indices_largeur[:, :, None], indices_hauteur[:, None, :]]
+        tableau['nombre_pcb'][index_espacement] = nombres_panneau
+
+    surfaces = (largeurs[:, :, None] / MICRONS_PAR_MM * hauteurs[:, None, :] / MICRONS_PAR_MM)[None]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        remplissage = np.where(surfaces > 0, tableau['nombre_pcb'] * surface_pcb / surfaces * 100, 0.0)
+    tableau['pourcentage_remplissage'] = remplissage
+    return tableau
+
+
+def _compter(largeur: float, hauteur: float, pcb_prototype: RectanglePCB, espacement: float,
+             allow_rotation: bool, strategie: Optional[StrategiePlacement], tolerance: float) -> int:
+    placement = PlacementPCB(Panneau(largeur, hauteur, 0), pcb_prototype, espacement,
+                             allow_rotation=allow_rotation, strategie=strategie, tolerance=tolerance)
+    placement.calculer_meilleur_placement()
+    return placement.nombre_pcb
+
+
+def ecrire_csv(tableau: np.ndarray, fichier: TextIO):
+    """
+    Écrit un tableau de balayage au format CSV, une ligne par point de la grille.
+    """
+    writer = csv.writer(fichier)
+    writer.writerow(DTYPE_BALAYAGE.names)
+    for ligne in tableau.ravel().tolist():
+        writer.writerow(ligne)
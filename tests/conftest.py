@@ -0,0 +1,74 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# Modules du dépôt importables depuis les tests, sans installation
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Aucun test ne doit écrire dans l'historique de l'utilisateur, ni ouvrir de fenêtre
+os.environ['PANELISATION_HISTORIQUE'] = ':memory:'
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+# Écart admis sur les coordonnées flottantes, en mm
+EPSILON = 1e-6
+
+
+def _verifier_coordonnees(coordonnees, panneau, espacement, tolerance=0):
+    """
+    Vérifie des coordonnées de PCB : toutes dans la zone utile du panneau,
+    sans chevauchement et séparées de l'espacement entre elles et des zones
+    interdites.
+    """
+    x, y = coordonnees['x'], coordonnees['y']
+    largeur, hauteur = coordonnees['largeur'], coordonnees['hauteur']
+    assert np.all(x >= panneau.bordure_gauche - EPSILON)
+    assert np.all(y >= panneau.bordure_bas - EPSILON)
+    assert np.all(x + largeur <= panneau.largeur_totale - panneau.bordure_droite + tolerance + EPSILON)
+    assert np.all(y + hauteur <= panneau.hauteur_totale - panneau.bordure_haut + tolerance + EPSILON)
+
+    # Deux rectangles agrandis d'un demi-espacement ne se recouvrent pas
+    marge = espacement / 2 - EPSILON
+    x0, y0, x1, y1 = x - marge, y - marge, x + largeur + marge, y + hauteur + marge
+    for i in range(len(coordonnees) - 1):
+        recouvre = (np.minimum(x1[i], x1[i + 1:]) > np.maximum(x0[i], x0[i + 1:])) & \
+                   (np.minimum(y1[i], y1[i + 1:]) > np.maximum(y0[i], y0[i + 1:]))
+        assert not recouvre.any(), f"PCB {i} chevauche un autre PCB"
+
+    marge = espacement - EPSILON
+    for zx, zy, zl, zh in panneau.zones_interdites:
+        recouvre = (np.minimum(x + largeur + marge, zx + zl) > np.maximum(x - marge, zx)) & \
+                   (np.minimum(y + hauteur + marge, zy + zh) > np.maximum(y - marge, zy))
+        assert not recouvre.any(), f"un PCB empiète sur la zone interdite {(zx, zy, zl, zh)}"
+
+
+def _verifier_disposition(placement):
+    """
+    Vérifie la disposition calculée d'un placement : autant de PCB que
+    nombre_pcb, aux dimensions du PCB (tourné ou non), et placés comme le
+    demande _verifier_coordonnees. Retourne les coordonnées.
+    """
+    pcb = placement.pcb_prototype
+    coordonnees = np.asarray(placement.coordonnees())
+    assert len(coordonnees) == placement.nombre_pcb
+
+    largeur, hauteur = coordonnees['largeur'], coordonnees['hauteur']
+    droits = np.isclose(largeur, pcb.largeur) & np.isclose(hauteur, pcb.hauteur)
+    tournes = np.isclose(largeur, pcb.hauteur) & np.isclose(hauteur, pcb.largeur)
+    assert np.all(droits | tournes)
+    if not placement.allow_rotation:
+        assert np.all(droits)
+
+    _verifier_coordonnees(coordonnees, placement.panneau, placement.espacement, placement.tolerance)
+    return coordonnees
+
+
+@pytest.fixture
+def verifier_disposition():
+    return _verifier_disposition
+
+
+@pytest.fixture
+def verifier_coordonnees():
+    return _verifier_coordonnees
@@ -0,0 +1,52 @@
+import csv
+import io
+import json
+
+import pytest
+
+from cli import main
+
+
+def _entree(tmp_path, nom, contenu):
+    chemin = tmp_path / nom
+    chemin.write_text(contenu, encoding='utf-8')
+    return str(chemin)
+
+
+def test_json_vers_csv(tmp_path):
+    entree = _entree(tmp_path, 'travaux.json', json.dumps([{'largeur': 20, 'hauteur': 15, 'reference': 'A'}]))
+    sortie = tmp_path / 'resultats.csv'
+    assert main([entree, '-o', str(sortie), '-p', '600x500']) == 0
+    (ligne,) = csv.DictReader(io.StringIO(sortie.read_text(encoding='utf-8')))
+    assert (ligne['reference'], ligne['nombre_pcb']) == ('A', '536')
+
+
+def test_csv_vers_json(tmp_path, capsys):
+    entree = _entree(tmp_path, 'travaux.csv', "largeur,hauteur,espacement,nombre_pcb_a_fabriquer,allow_rotation\n"
+                                              "20,15,5,1000,1\n100,80,3,50,0\n")
+    assert main([entree, '-p', '600x500', '-p', '300x200']) == 0
+    resultats = json.loads(capsys.readouterr().out)
+    assert [(r['travail'], r['nombre_pcb']) for r in resultats] == [(0, 536), (0, 92), (1, 25), (1, 4)]
+
+
+def test_mode_mixte(tmp_path, capsys):
+    entree = _entree(tmp_path, 'travaux.json', json.dumps([{'largeur': 20, 'hauteur': 15, 'nombre_pcb_a_fabriquer': 100},
+                                                           {'largeur': 47, 'hauteur': 33, 'nombre_pcb_a_fabriquer': 20}]))
+    assert main([entree, '--mixte', '--budget', '0.2', '-p', '300x200', '-f', 'csv']) == 0
+    (ligne,) = csv.DictReader(io.StringIO(capsys.readouterr().out))
+    assert int(ligne['nombre_panneaux']) >= int(ligne['borne_inferieure']) >= 1
+
+
+@pytest.mark.parametrize('options', [['--mixte', '--rapport', 'r.pdf'], ['--mixte', '--png', 'pages'],
+                                     ['--mixte', '--historique', 'h.sqlite']])
+def test_options_incompatibles_avec_le_mode_mixte(tmp_path, capsys, options):
+    entree = _entree(tmp_path, 'travaux.json', '[{"largeur": 20, "hauteur": 15}]')
+    assert main([entree] + options) == 2
+    assert capsys.readouterr().err.startswith("Erreur")
+    assert list(tmp_path.iterdir()) == [tmp_path / 'travaux.json']
+
+
+@pytest.mark.parametrize('contenu', ['[{"largeur": 20}]', '[{"largeur": "x", "hauteur": 15}]', '{"travaux": [}'])
+def test_entree_invalide(tmp_path, capsys, contenu):
+    assert main([_entree(tmp_path, 'travaux.json', contenu)]) == 2
+    assert capsys.readouterr().err.startswith("Erreur")
@@ -0,0 +1,69 @@
+import threading
+
+import pytest
+
+pytest.importorskip('reportlab')
+
+from export import ExportAnnule, exporter_pdf, exporter_png  # noqa: E402
+from logic import Panneau, PlacementPCB, RectanglePCB, calcul_resultat  # noqa: E402
+from pdf_report import PageRapport  # noqa: E402
+
+
+def _pages(nombre=3):
+    pages = []
+    for numero, (largeur, hauteur) in enumerate([(600, 500), (457, 300), (300, 200), (570, 480)][:nombre], 1):
+        placement = PlacementPCB(Panneau(largeur, hauteur, 15), RectanglePCB(20, 15), 5)
+        placement.calculer_meilleur_placement()
+        resultat = calcul_resultat(numero, placement.panneau, placement.nombre_pcb, placement.surface_occupee, 1000)
+        pages.append(PageRapport(f"Panneau {numero}", placement.panneau, placement.coordonnees(), resultat))
+    return pages
+
+
+def _sans_dates(contenu):
+    # Dates de création et identifiant du document, propres à chaque écriture
+    return [ligne for ligne in contenu.split(b'\n') if b'Date' not in ligne and not ligne.startswith(b'[<')]
+
+
+def test_pdf_identique_en_parallele(tmp_path):
+    progressions = []
+    chemins = [tmp_path / 'un.pdf', tmp_path / 'deux.pdf']
+    assert exporter_pdf(str(chemins[0]), _pages(), processus=1) == 3
+    assert exporter_pdf(str(chemins[1]), iter(_pages()), processus=2,
+                        progression=lambda faites, total: progressions.append((faites, total))) == 3
+    assert progressions == [(1, None), (2, None), (3, None)]
+    assert _sans_dates(chemins[0].read_bytes()) == _sans_dates(chemins[1].read_bytes())
+
+
+def test_pdf_sans_page(tmp_path):
+    chemin = tmp_path / 'vide.pdf'
+    assert exporter_pdf(str(chemin), [], notes=["Aucun placement"]) == 1
+    assert chemin.read_bytes().startswith(b'%PDF')
+
+
+@pytest.mark.parametrize('processus', [1, 2])
+def test_pdf_annule_sans_fichier(tmp_path, processus):
+    annulation = threading.Event()
+    chemin = tmp_path / 'rapport.pdf'
+
+    def progression(faites, total):
+        if faites == 2:
+            annulation.set()
+
+    with pytest.raises(ExportAnnule):
+        exporter_pdf(str(chemin), _pages(4), processus=processus, progression=progression, annulation=annulation)
+    assert not chemin.exists()
+
+
+def test_png(tmp_path):
+    pytest.importorskip('matplotlib')
+
+    dossier = tmp_path / 'pages'
+    chemins = exporter_png(str(dossier), _pages(2), dpi=30, processus=2)
+    assert [p.name for p in sorted(dossier.iterdir())] == ['page_0001.png', 'page_0002.png']
+    assert chemins == [str(dossier / 'page_0001.png'), str(dossier / 'page_0002.png')]
+    assert all((dossier / nom).read_bytes().startswith(b'\x89PNG') for nom in ('page_0001.png', 'page_0002.png'))
+
+    annulation = threading.Event()
+    annulation.set()
+    with pytest.raises(ExportAnnule):
+        exporter_png(str(tmp_path / 'annule'), _pages(2), dpi=30, processus=1, annulation=annulation)
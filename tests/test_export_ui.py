@@ -0,0 +1,80 @@
+import pytest
+
+pytest.importorskip('PyQt5.QtWidgets')
+pytest.importorskip('matplotlib')
+pytest.importorskip('reportlab')
+
+from PyQt5.QtWidgets import QApplication, QFileDialog, QMessageBox  # noqa: E402
+
+
+@pytest.fixture
+def messages(monkeypatch):
+    recus = []
+    for nom in ('information', 'warning', 'critical'):
+        monkeypatch.setattr(QMessageBox, nom, staticmethod(lambda _parent, _titre, texte, *a, **k: recus.append(texte)))
+    return recus
+
+
+@pytest.fixture
+def fenetre(messages):
+    import ui
+
+    app = QApplication.instance() or QApplication([])
+    fenetre = ui.MainWindow()
+    fenetre.largeur_pcb_input.setText('20')
+    fenetre.hauteur_pcb_input.setText('15')
+    fenetre.calculer_et_visualiser()
+    fenetre.pool_calcul.waitForDone()
+    app.processEvents()
+    yield fenetre
+    fenetre.close()
+
+
+def _titres(fenetre):
+    return [page.titre.split(' :')[0] for page in fenetre._pages_export()]
+
+
+def test_pages_des_panneaux_affiches(fenetre):
+    pages = fenetre._pages_export()
+    assert _titres(fenetre) == ['Panneau 1', 'Panneau 2', 'Panneau 3', 'Panneau 4']
+    for idx, page in enumerate(pages):
+        assert page.panneau is fenetre.placements_calcules[idx].panneau
+        assert len(page.coordonnees) == page.resultat['nombre_pcb']
+
+
+def test_export_apres_bascule_de_bibliotheque(fenetre, messages, monkeypatch, tmp_path):
+    chemin = tmp_path / 'rapport.pdf'
+    monkeypatch.setattr(QFileDialog, 'getSaveFileName', staticmethod(lambda *a, **k: (str(chemin), '')))
+
+    fenetre.bibliotheque_checkbox.setChecked(True)
+    assert fenetre.resultats == []
+    assert fenetre.table_widget.rowCount() == 0
+    assert fenetre._pages_export() == []
+    fenetre.exporter_pdf()
+    fenetre.pool_calcul.waitForDone()
+    assert not chemin.exists()
+    assert len(messages) == 1
+
+    fenetre.bibliotheque_checkbox.setChecked(False)
+    fenetre.calculer_et_visualiser()
+    fenetre.pool_calcul.waitForDone()
+    QApplication.processEvents()
+    fenetre.exporter_pdf()
+    fenetre.pool_calcul.waitForDone()
+    QApplication.processEvents()
+    assert chemin.stat().st_size > 0
+    assert messages[-1] == f"Export terminé : {chemin}"
+
+
+def test_resultats_partiels(fenetre):
+    # Calcul interrompu : seuls les panneaux 1, 3 et 4 ont un résultat
+    del fenetre._resultats_calcul[1]
+    fenetre._publier_resultats()
+    assert _titres(fenetre) == ['Panneau 1', 'Panneau 3', 'Panneau 4']
+    for idx, page in zip((0, 2, 3), fenetre._pages_export()):
+        assert page.panneau is fenetre.placements_calcules[idx].panneau
+
+    # Un placement manquant est omis, et l'export est refusé
+    del fenetre.placements_calcules[2]
+    assert _titres(fenetre) == ['Panneau 1', 'Panneau 4']
+    assert not fenetre._pret_pour_export()
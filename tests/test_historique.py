@@ -0,0 +1,100 @@
+import sqlite3
+
+import numpy as np
+
+from guillotine import StrategieGuillotine
+from job_history import HistoriqueTravaux
+from logic import (
+    Panneau, PlacementPCB, RectanglePCB, StrategieRetraits, TravailPCB, calcul_resultat, optimiser_lot
+)
+
+
+def _placement(largeur=20, hauteur=15, panneau=None, **options):
+    return PlacementPCB(panneau or Panneau(300, 200, 5), RectanglePCB(largeur, hauteur), 5, **options)
+
+
+def _ajouter(historique, placement, nombre_total_pcb=100, reference=''):
+    placement.calculer_meilleur_placement()
+    resultat = calcul_resultat(1, placement.panneau, placement.nombre_pcb, placement.surface_occupee,
+                               nombre_total_pcb)
+    historique.ajouter(placement, resultat, nombre_total_pcb, reference)
+    return resultat
+
+
+def test_aller_retour(tmp_path):
+    chemin = str(tmp_path / 'historique.sqlite')
+    panneau = Panneau(300, 200, 5, (20, 20, 5, 5), [(100, 50, 40, 60)])
+    calcules = [_placement(20, 15), _placement(15, 20), _placement(47, 33, panneau, strategie=StrategieRetraits())]
+    historique = HistoriqueTravaux(chemin)
+    resultats = [_ajouter(historique, placement, reference=f'R{i}') for i, placement in enumerate(calcules)]
+    historique.fermer()
+
+    historique = HistoriqueTravaux(chemin)
+    for placement, resultat in zip(calcules, resultats):
+        relu = _placement(placement.pcb_prototype.largeur, placement.pcb_prototype.hauteur, placement.panneau,
+                          strategie=placement.strategie)
+        assert historique.restaurer(relu)
+        assert relu.nombre_pcb == placement.nombre_pcb
+        assert relu.surface_occupee == placement.surface_occupee
+        assert np.array_equal(np.asarray(relu.coordonnees()), np.asarray(placement.coordonnees()))
+        assert historique.retrouver(relu)['resultat'] == resultat
+    assert historique.repris == 3
+    assert not historique.restaurer(_placement(21, 15))
+    historique.fermer()
+
+
+def test_une_ligne_par_travail():
+    historique = HistoriqueTravaux(':memory:')
+    placement = _placement()
+    for nombre_total_pcb in (100, 200, 300):
+        _ajouter(historique, placement, nombre_total_pcb)
+    historique.enregistrer()
+    lignes = historique._connexion.execute("SELECT nombre_total_pcb FROM travaux").fetchall()
+    assert lignes == [(300,)]
+
+
+def test_parametres_de_strategie_dans_la_cle():
+    historique = HistoriqueTravaux(':memory:')
+    _ajouter(historique, _placement(47, 33, strategie=StrategieGuillotine(motifs_max=300)))
+    assert historique.restaurer(_placement(47, 33, strategie=StrategieGuillotine(motifs_max=300)))
+    assert not historique.restaurer(_placement(47, 33, strategie=StrategieGuillotine(motifs_max=50)))
+
+
+def test_plus_proches():
+    historique = HistoriqueTravaux(':memory:')
+    for largeur, hauteur in ((20, 15), (25, 18), (60, 40)):
+        _ajouter(historique, _placement(largeur, hauteur))
+    travaux = historique.plus_proches(16, 21, 300, 200, nombre=2)
+    assert [(t['largeur'], t['hauteur']) for t in travaux] == [(15, 20), (18, 25)]
+    assert travaux[0]['ecart'] == 1
+    assert historique.plus_proches(16, 21, 600, 500) == []
+
+
+def test_lot_relu_dans_l_historique():
+    historique = HistoriqueTravaux(':memory:')
+    travaux = [TravailPCB(20, 15, nombre_pcb_a_fabriquer=500), TravailPCB(47, 33, 3, allow_rotation=False)]
+    panneaux = [Panneau(300, 200, 5), Panneau(300, 200, 5, (20, 20, 5, 5), [(100, 50, 40, 60)])]
+    premier = optimiser_lot(travaux, panneaux, historique=historique)
+    second = optimiser_lot(travaux, panneaux, historique=historique)
+    assert second == premier
+    assert historique.repris == len(premier)
+
+
+def test_migration_d_une_ancienne_base(tmp_path):
+    chemin = str(tmp_path / 'ancienne.sqlite')
+    historique = HistoriqueTravaux(chemin)
+    _ajouter(historique, _placement())
+    historique.fermer()
+    # Base écrite avant la colonne des paramètres, avec un doublon
+    connexion = sqlite3.connect(chemin)
+    connexion.execute("DROP INDEX travaux_cle")
+    connexion.execute("ALTER TABLE travaux DROP COLUMN parametres")
+    connexion.execute("INSERT INTO travaux SELECT NULL, date + 1, 'doublon', " + ', '.join(
+        nom for nom in [r[1] for r in connexion.execute("PRAGMA table_info(travaux)")][3:]) + " FROM travaux")
+    connexion.commit()
+    connexion.close()
+
+    historique = HistoriqueTravaux(chemin)
+    assert historique._connexion.execute("SELECT reference FROM travaux").fetchall() == [('doublon',)]
+    assert historique.restaurer(_placement())
+    historique.fermer()
@@ -0,0 +1,25 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+pytest.importorskip('PyQt5.QtWidgets')
+
+RACINE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules déjà chargés dans le processus des tests : l'import est vérifié
+# dans un processus séparé
+SCRIPT = """
+import sys
+import {module}
+print(sorted(m for m in ('matplotlib', 'reportlab', 'export', 'rendering') if m in sys.modules))
+"""
+
+
+@pytest.mark.parametrize('module', ['ui', 'cli'])
+def test_matplotlib_charge_a_la_demande(module):
+    env = {**os.environ, 'QT_QPA_PLATFORM': 'offscreen'}
+    sortie = subprocess.run([sys.executable, '-c', SCRIPT.format(module=module)], cwd=RACINE, env=env,
+                            capture_output=True, text=True, check=True).stdout.strip()
+    assert sortie == "[]"
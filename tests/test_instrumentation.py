@@ -0,0 +1,42 @@
+import os
+import subprocess
+import sys
+
+RACINE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Activer l'instrumentation dans le processus des tests la laisserait active
+# pour les suivants : chaque cas est exécuté dans un processus séparé
+SCRIPT = """
+import instrumentation
+import logic
+{activation}
+placement = logic.PlacementPCB(logic.Panneau(300, 200, 5), logic.RectanglePCB(20, 15), 5)
+placement.calculer_meilleur_placement()
+print(instrumentation.ACTIF, sorted(instrumentation.mesures))
+"""
+
+
+def _executer(activation, **environnement):
+    env = {**os.environ, 'PANELISATION_PROFIL': '', **environnement}
+    return subprocess.run([sys.executable, '-c', SCRIPT.format(activation=activation)], cwd=RACINE, env=env,
+                          capture_output=True, text=True, check=True).stdout.strip()
+
+
+def test_inactive_par_defaut():
+    assert _executer('') == "False []"
+
+
+def test_activer_apres_les_imports():
+    assert _executer('instrumentation.activer()') == "True ['PlacementPCB.calculer_meilleur_placement']"
+
+
+def test_variable_d_environnement():
+    assert _executer('', PANELISATION_PROFIL='1') == "True ['PlacementPCB.calculer_meilleur_placement']"
+
+
+def test_option_profil_de_la_ligne_de_commande():
+    env = dict(os.environ, PANELISATION_PROFIL='')
+    sortie = subprocess.run([sys.executable, 'cli.py', '--profil', '--format', 'csv'], cwd=RACINE, env=env,
+                            input='[{"largeur": 20, "hauteur": 15}]', capture_output=True, text=True, check=True)
+    assert 'PlacementPCB.calculer_meilleur_placement' in sortie.stderr
+    assert sortie.stdout.startswith('travail,')
@@ -0,0 +1,71 @@
+import random
+
+import numpy as np
+import pytest
+
+from logic import Panneau, PlacementPCB, RectanglePCB, TravailPCB
+from multi_design import DesignPCB, borne_inferieure, emballer_designs, panneliser_mixte
+
+
+def _designs(graine):
+    hasard = random.Random(graine)
+    return [DesignPCB(RectanglePCB(round(hasard.uniform(8, 150), 1), round(hasard.uniform(8, 150), 1)),
+                      hasard.choice([10, 50, 300, 1000]), f"R{i}") for i in range(hasard.randint(1, 6))]
+
+
+PANNEAUX = [
+    Panneau(600, 500, 15),
+    Panneau(457, 300, 10, (25, 10, 8, 15), [(5, 5, 8, 8), (444, 5, 8, 8), (200, 120, 30, 30)]),
+    Panneau(600, 500, 15, (15, 15, 30, 30), [(0, 240, 600, 20)]),
+]
+
+
+@pytest.mark.parametrize('panneau', PANNEAUX)
+@pytest.mark.parametrize('espacement', [0, 2.5])
+def test_panneaux_mixtes_valides(panneau, espacement, verifier_coordonnees):
+    for graine in range(8):
+        designs = _designs(graine)
+        resultat = emballer_designs(designs, panneau, espacement, budget=0)
+        assert resultat.nombre_panneaux >= resultat.borne_inferieure
+
+        produits = np.zeros(len(designs), dtype=int)
+        for disposition in resultat.panneaux:
+            coordonnees = disposition.coordonnees(designs, panneau, espacement)
+            verifier_coordonnees(coordonnees, panneau, espacement)
+            for design in designs:
+                pcb = design.pcb_prototype
+                tableau = coordonnees[coordonnees['design'] == designs.index(design)]
+                assert np.all(np.isclose(tableau['largeur'], pcb.largeur) | np.isclose(tableau['largeur'], pcb.hauteur))
+            produits += disposition.repetitions * np.bincount(coordonnees['design'], minlength=len(designs))
+        assert np.all(produits >= [d.quantite for d in designs])
+
+
+def test_pcb_juste_a_la_largeur_utile():
+    # 3 x 190 mm remplissent exactement les 570 mm utiles, à l'arrondi flottant près
+    panneau = Panneau(600, 500, 15)
+    designs = [DesignPCB(RectanglePCB(0.1 * 1900, 0.1 * 1000), 15)]
+    resultat = emballer_designs(designs, panneau, 0, allow_rotation=False, budget=0)
+    assert resultat.panneaux[0].quantites(1) == [12]
+    assert resultat.nombre_panneaux == resultat.borne_inferieure == 2
+
+
+def test_une_reference_comme_le_placement_simple():
+    panneau = Panneau(300, 200, 5)
+    placement = PlacementPCB(panneau, RectanglePCB(47, 33), 3, allow_rotation=False)
+    placement.calculer_meilleur_placement()
+    designs = [DesignPCB(RectanglePCB(47, 33), 10 * placement.nombre_pcb)]
+    resultat = emballer_designs(designs, panneau, 3, allow_rotation=False, budget=0)
+    assert [(p.repetitions, p.quantites(1)) for p in resultat.panneaux] == [(10, [placement.nombre_pcb])]
+    assert borne_inferieure(designs, panneau, 3, allow_rotation=False) <= 10
+
+
+def test_pcb_trop_grand():
+    with pytest.raises(ValueError):
+        emballer_designs([DesignPCB(RectanglePCB(571, 10), 1)], Panneau(600, 500, 15), allow_rotation=False)
+
+
+def test_lignes_de_resultat():
+    travaux = [TravailPCB(20, 15, 5, nombre_pcb_a_fabriquer=1000), TravailPCB(100, 80, 3, nombre_pcb_a_fabriquer=50)]
+    lignes = panneliser_mixte(travaux, PANNEAUX[:1], budget=0.2)
+    assert [ligne['panneau'] for ligne in lignes] == [1]
+    assert lignes[0]['nombre_panneaux'] >= lignes[0]['borne_inferieure'] > 0
@@ -0,0 +1,80 @@
+import io
+import json
+import random
+
+import pytest
+
+from logic import CachePlacement, PlacementPCB, RectanglePCB, StrategieRetraits
+from panel_library import FormatPanneau, _cle_classement, classer_formats, lire_bibliotheque
+
+
+def _bibliotheque(hasard, avec_couts):
+    formats = []
+    for i in range(hasard.randint(5, 25)):
+        largeur, hauteur = hasard.randint(150, 650), hasard.randint(120, 550)
+        cout = round(largeur * hauteur / 10000 * hasard.uniform(0.7, 1.3), 2) if avec_couts else None
+        zones = [(hasard.uniform(0, largeur - 30), hasard.uniform(0, hauteur - 30), 20, 20)] if i % 4 == 0 else []
+        formats.append(FormatPanneau(largeur, hauteur, hasard.choice([5, 10, 15]), cout, f"F{i}",
+                                     zones_interdites=zones))
+    return formats
+
+
+def _classement_exhaustif(formats, pcb, espacement, nombre_total_pcb, allow_rotation, strategie, nombre):
+    """
+    Clés de classement des `nombre` meilleurs formats, chaque placement étant calculé.
+    """
+    avec_couts = all(f.cout is not None for f in formats)
+    cles = []
+    for format_panneau in formats:
+        placement = PlacementPCB(format_panneau.panneau(), pcb, espacement, allow_rotation=allow_rotation,
+                                 strategie=strategie)
+        placement.calculer_meilleur_placement()
+        if placement.nombre_pcb:
+            cout = format_panneau.cout if avec_couts else format_panneau.largeur * format_panneau.hauteur
+            cles.append(_cle_classement(cout, placement.nombre_pcb, nombre_total_pcb))
+    return sorted(cles)[:nombre]
+
+
+@pytest.mark.parametrize('avec_couts', [True, False])
+def test_preselection_comme_le_calcul_exhaustif(avec_couts):
+    hasard = random.Random(11)
+    for essai in range(40):
+        formats = _bibliotheque(hasard, avec_couts)
+        pcb = RectanglePCB(round(hasard.uniform(5, 120), 1), round(hasard.uniform(5, 120), 1))
+        espacement = hasard.choice([0, 2, 5])
+        nombre_total_pcb = hasard.choice([1, 100, 5000])
+        allow_rotation = hasard.random() < 0.7
+        strategie = StrategieRetraits() if essai % 3 == 0 else None
+        nombre = hasard.choice([1, 4])
+
+        classement, evalues = classer_formats(formats, pcb, espacement, nombre_total_pcb, allow_rotation, strategie,
+                                              CachePlacement(), nombre)
+        assert evalues <= len(formats)
+        avec_cout = all(f.cout is not None for f in formats)
+        cles = [_cle_classement(f.cout if avec_cout else f.largeur * f.hauteur, p.nombre_pcb, nombre_total_pcb)
+                for f, p in classement]
+        assert cles == _classement_exhaustif(formats, pcb, espacement, nombre_total_pcb, allow_rotation, strategie,
+                                             nombre)
+
+
+def test_preselection_evite_des_placements():
+    formats = [FormatPanneau(600, 500, 15, cout=30), FormatPanneau(580, 510, 15, cout=29.5)]
+    formats += [FormatPanneau(100 + 10 * i, 100, 10, cout=20) for i in range(20)]
+    classement, evalues = classer_formats(formats, RectanglePCB(20, 15), 5, 10000, nombre=1)
+    assert [f.nom for f, _ in classement] == ['580 x 510']
+    assert evalues < len(formats)
+
+
+def test_lecture_json_et_csv():
+    json_texte = json.dumps({'panneaux': [{'largeur': 600, 'hauteur': 500, 'cout': 30, 'nom': 'grand'},
+                                          {'largeur': 300, 'hauteur': 200, 'bordures': {'gauche': 20}}]})
+    grand, petit = lire_bibliotheque(io.StringIO(json_texte))
+    assert (grand.nom, grand.cout, grand.bordure) == ('grand', 30.0, 15)
+    assert petit.panneau().bordure_gauche == 20 and petit.panneau().bordure_droite == 15
+
+    (format_csv,) = lire_bibliotheque(io.StringIO("largeur,hauteur,bordure,cout\n457,300,10,\n"))
+    assert (format_csv.largeur, format_csv.bordure, format_csv.cout, format_csv.nom) == (457, 10, None, '457 x 300')
+
+    for texte in ("[]", "largeur,hauteur\n0,100\n", '[{"largeur": 100}]', "largeur,hauteur,bordure\n20,20,10\n"):
+        with pytest.raises(ValueError):
+            lire_bibliotheque(io.StringIO(texte))
@@ -0,0 +1,64 @@
+import random
+from itertools import product
+
+import pytest
+
+from logic import Panneau, RectanglePCB
+from panel_mix import optimiser_commande, optimiser_melange
+
+
+def _force_brute(nombres_pcb, couts, nombre_total_pcb):
+    """
+    (coût, quantité produite) minimal parmi tous les mélanges d'au plus
+    nombre_total_pcb // n + 1 panneaux de chaque format.
+    """
+    limites = [nombre_total_pcb // n + 1 if n else 0 for n in nombres_pcb]
+    meilleur = None
+    for quantites in product(*(range(limite + 1) for limite in limites)):
+        produite = sum(q * n for q, n in zip(quantites, nombres_pcb))
+        if produite >= nombre_total_pcb:
+            cle = (round(sum(q * c for q, c in zip(quantites, couts)), 6), produite)
+            if meilleur is None or cle < meilleur:
+                meilleur = cle
+    return meilleur
+
+
+def test_melange_comme_la_force_brute():
+    hasard = random.Random(2)
+    for _ in range(300):
+        formats = hasard.randint(1, 3)
+        nombres_pcb = [hasard.choice([0, hasard.randint(3, 40)]) for _ in range(formats)]
+        if not any(nombres_pcb):
+            continue
+        couts = [hasard.choice([1.0, round(hasard.uniform(1, 20), 2)]) for _ in range(formats)]
+        nombre_total_pcb = hasard.randint(0, 200)
+
+        melange = optimiser_melange(nombres_pcb, couts, nombre_total_pcb)
+        cout, produite = _force_brute(nombres_pcb, couts, nombre_total_pcb)
+        assert melange['cout_total'] == pytest.approx(cout, abs=1e-6)
+        assert melange['quantite_produite'] == produite
+        assert melange['surplus'] == produite - nombre_total_pcb
+        assert melange['quantite_produite'] == sum(q * n for q, n in zip(melange['panneaux'], nombres_pcb))
+
+
+def test_grande_commande():
+    # Le format de meilleur coût par PCB prend l'essentiel de la commande
+    melange = optimiser_melange([536, 533, 490, 233], [42.5, 41, 39, 19.9], 10 ** 6)
+    assert melange['quantite_produite'] >= 10 ** 6
+    seul = min(-(-10 ** 6 // n) * c for n, c in zip([536, 533, 490, 233], [42.5, 41, 39, 19.9]))
+    assert melange['cout_total'] <= seul
+
+
+def test_aucun_format():
+    with pytest.raises(ValueError):
+        optimiser_melange([0, 0], [1.0, 1.0], 10)
+    assert optimiser_melange([5], [1.0], 0)['nombre_panneaux'] == 0
+
+
+def test_commande_sans_couts():
+    panneaux = [Panneau(600, 500, 15), Panneau(300, 200, 15)]
+    melange = optimiser_commande(panneaux, RectanglePCB(20, 15), 5, 1000, 5)
+    assert melange['nombre_total_pcb'] == 1050
+    assert melange['nombres_pcb'] == [536, 92]
+    assert melange['quantite_produite'] >= 1050
+    assert melange['nombre_panneaux'] == melange['cout_total'] == 2
@@ -0,0 +1,80 @@
+import pytest
+
+from job_history import HistoriqueTravaux
+from logic import Panneau, PlacementPCB, RectanglePCB, calcul_nombre_total_pcb, calcul_resultat
+from pipeline import GraphePanelisation
+
+LARGEURS, HAUTEURS = [600, 457, 300], [500, 300, 200]
+
+
+def _graphe(**options):
+    rendus = []
+    graphe = GraphePanelisation(len(LARGEURS), rendu=lambda i, placement: rendus.append(i), **options)
+    graphe.definir(largeur_pcb=20, hauteur_pcb=15, panneaux_largeurs=LARGEURS, panneaux_hauteurs=HAUTEURS)
+    return graphe, rendus
+
+
+def test_resultats_comme_le_placement_direct():
+    graphe, _ = _graphe()
+    graphe.definir(nombre_pcb_a_fabriquer=1000, tolerance=0.05)
+    nombre_total_pcb = calcul_nombre_total_pcb(1000, 5)
+    for numero, (resultat, largeur, hauteur) in enumerate(zip(graphe.resultats(), LARGEURS, HAUTEURS), 1):
+        placement = PlacementPCB(Panneau(largeur, hauteur, 15), RectanglePCB(20, 15), 5, tolerance=0.05)
+        placement.calculer_meilleur_placement()
+        attendu = calcul_resultat(numero, placement.panneau, placement.nombre_pcb, placement.surface_occupee,
+                                  nombre_total_pcb)
+        assert resultat == {**attendu, 'cout_total': None}
+
+
+def test_quantite_ne_recalcule_que_la_production():
+    graphe, rendus = _graphe()
+    premiers = graphe.resultats()
+    placements = graphe.placements()
+    assert rendus == [0, 1, 2]
+
+    graphe.remettre_a_zero_compteurs()
+    graphe.definir(nombre_pcb_a_fabriquer=5000, pourcentage_surlancement=10)
+    resultats = graphe.resultats()
+    assert graphe.compteurs['placement'][0] == graphe.compteurs['panneau'][0] == 0
+    assert graphe.compteurs['production'][0] == len(LARGEURS)
+    assert graphe.placements() == placements and all(a is b for a, b in zip(graphe.placements(), placements))
+    assert rendus == [0, 1, 2]
+    assert [r['nombre_pcb'] for r in resultats] == [r['nombre_pcb'] for r in premiers]
+    assert resultats[0]['nombre_panneaux_necessaires'] == -(-calcul_nombre_total_pcb(5000, 10) // 536)
+
+
+@pytest.mark.parametrize('entree, valeur', [('espacement', 3), ('tolerance', -0.5), ('strategie', 'retraits')])
+def test_entree_de_placement_recalcule_les_placements(entree, valeur):
+    graphe, _ = _graphe()
+    graphe.resultats()
+    graphe.remettre_a_zero_compteurs()
+    graphe.definir(**{entree: valeur})
+    graphe.resultats()
+    assert graphe.compteurs['placement'][0] == len(LARGEURS)
+    assert graphe.compteurs['panneau'][0] == 0
+
+
+def test_un_seul_panneau_modifie():
+    graphe, rendus = _graphe()
+    graphe.resultats()
+    graphe.remettre_a_zero_compteurs()
+    graphe.definir(panneaux_largeurs=[600, 457, 310])
+    graphe.resultats()
+    assert graphe.compteurs['placement'] == [1, 2]
+    assert rendus[3:] == [2]
+
+
+def test_calcul_hors_du_graphe_et_historique():
+    historique = HistoriqueTravaux(':memory:')
+    graphe, _ = _graphe(historique=historique)
+    for i in range(len(LARGEURS)):
+        placement, signature = graphe.placement_a_calculer(i)
+        placement.calculer_meilleur_placement()
+        graphe.fixer(f'placement[{i}]', placement, signature)
+    resultats = graphe.resultats()
+    assert graphe.placement_a_calculer(0) is None
+
+    relu, _ = _graphe(historique=historique)
+    assert all(relu.placement_a_calculer(i) is None for i in range(len(LARGEURS)))
+    assert relu.repris == len(LARGEURS)
+    assert relu.resultats() == resultats
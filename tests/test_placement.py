@@ -0,0 +1,116 @@
+import pytest
+
+from logic import CachePlacement, Panneau, PlacementPCB, RectanglePCB, StrategieHeuristique, StrategieRetraits
+
+PANNEAUX = [(600, 500), (570, 480), (457, 300), (300, 200)]
+
+# (largeur, hauteur, espacement, rotation) -> nombre de PCB sur chaque
+# panneau de PANNEAUX (bordure 15), relevés avec l'heuristique d'origine
+# (placement rectangle par rectangle, avant le calcul arithmétique)
+REFERENCES = [
+    ((20, 15, 5, True), [536, 490, 233, 92]),
+    ((20, 15, 5, False), [529, 462, 221, 88]),
+    ((47, 33, 3, True), [148, 135, 60, 24]),
+    ((100, 80, 3, False), [25, 25, 12, 4]),
+    ((9.5, 5.3, 2, True), [3198, 2906, 1378, 550]),
+    ((33.3, 21.7, 2.5, True), [305, 277, 128, 51]),
+    ((150, 95, 5, True), [16, 14, 6, 2]),
+    ((60, 60, 4, True), [56, 56, 24, 8]),
+    ((12.7, 25.4, 1.6, False), [663, 592, 290, 108]),
+    ((250, 180, 5, True), [5, 4, 2, 0]),
+]
+
+
+def _placement(largeur, hauteur, espacement, rotation, largeur_panneau, hauteur_panneau, **options):
+    placement = PlacementPCB(Panneau(largeur_panneau, hauteur_panneau, 15), RectanglePCB(largeur, hauteur), espacement,
+                             allow_rotation=rotation, **options)
+    placement.calculer_meilleur_placement()
+    return placement
+
+
+@pytest.mark.parametrize('pcb, attendus', REFERENCES)
+def test_heuristique_comme_la_reference(pcb, attendus, verifier_disposition):
+    for (largeur_panneau, hauteur_panneau), attendu in zip(PANNEAUX, attendus):
+        placement = _placement(*pcb, largeur_panneau, hauteur_panneau)
+        assert placement.nombre_pcb == attendu, (largeur_panneau, hauteur_panneau)
+        verifier_disposition(placement)
+
+
+@pytest.mark.parametrize('pcb, attendus', REFERENCES[:4])
+def test_retraits_au_moins_l_heuristique(pcb, attendus, verifier_disposition):
+    for (largeur_panneau, hauteur_panneau), attendu in zip(PANNEAUX, attendus):
+        placement = _placement(*pcb, largeur_panneau, hauteur_panneau, strategie=StrategieRetraits())
+        assert placement.nombre_pcb >= attendu
+        verifier_disposition(placement)
+
+
+def test_guillotine_au_moins_l_heuristique(verifier_disposition):
+    from guillotine import StrategieGuillotine
+
+    for pcb, attendus in REFERENCES[2:4]:
+        placement = _placement(*pcb, 300, 200, strategie=StrategieGuillotine())
+        assert placement.nombre_pcb >= attendus[-1]
+        verifier_disposition(placement)
+
+
+def test_cache_et_pcb_tourne():
+    cache = CachePlacement()
+    direct = _placement(47, 33, 3, True, 600, 500, strategie=StrategieHeuristique())
+    en_cache = _placement(47, 33, 3, True, 600, 500, cache=cache)
+    tourne = _placement(33, 47, 3, True, 600, 500, cache=cache)
+    assert cache.hits == 1
+    assert direct.nombre_pcb == en_cache.nombre_pcb == tourne.nombre_pcb == 148
+    assert direct.surface_occupee == pytest.approx(tourne.surface_occupee)
+
+
+def test_cle_du_cache():
+    from guillotine import StrategieGuillotine
+
+    def cle(largeur, hauteur, rotation=True, strategie=None):
+        options = {} if strategie is None else {'strategie': strategie}
+        return CachePlacement.cle(PlacementPCB(Panneau(600, 500, 15), RectanglePCB(largeur, hauteur), 3,
+                                               allow_rotation=rotation, **options))
+
+    # Longueurs au micromètre près, PCB tourné ramené à largeur <= hauteur
+    assert cle(47, 33) == (cle(33, 47)[0], True)
+    assert cle(33, 47)[1] is False
+    assert cle(46.9995, 0.1 * 333) == cle(47, 33.3)
+    assert cle(47.001, 33) != cle(47, 33)
+    assert cle(47, 33, rotation=False)[0] != cle(33, 47, rotation=False)[0]
+    assert cle(47, 33, strategie=StrategieRetraits())[0] != cle(47, 33)[0]
+    assert (cle(47, 33, strategie=StrategieGuillotine(motifs_max=50))[0]
+            != cle(47, 33, strategie=StrategieGuillotine(motifs_max=300))[0])
+
+
+def test_cache_sur_disque_et_parametres_de_strategie(tmp_path):
+    from guillotine import StrategieGuillotine
+
+    chemin = str(tmp_path / 'cache.sqlite')
+    cache = CachePlacement(chemin=chemin)
+    premier = _placement(47, 33, 3, True, 300, 200, strategie=StrategieGuillotine(motifs_max=300), cache=cache)
+    _placement(47, 33, 3, True, 300, 200, strategie=StrategieGuillotine(motifs_max=50), cache=cache)
+    assert (cache.hits, cache.misses) == (0, 2)
+    cache.fermer()
+
+    cache = CachePlacement(chemin=chemin)
+    relu = _placement(33, 47, 3, True, 300, 200, strategie=StrategieGuillotine(motifs_max=300), cache=cache)
+    assert cache.hits_disque == 1
+    assert relu.nombre_pcb == premier.nombre_pcb
+    assert len(relu.coordonnees()) == relu.nombre_pcb
+    cache.fermer()
+
+
+def test_rectangles_sans_doublons():
+    from guillotine import StrategieGuillotine
+
+    for strategie in (StrategieHeuristique(), StrategieRetraits(), StrategieGuillotine()):
+        placement = _placement(47, 33, 3, True, 300, 200, strategie=strategie)
+        # Placé avant le premier accès aux rectangles, puis une seconde fois
+        strategie.placer(placement, placement.configuration)
+        strategie.placer(placement, placement.configuration)
+        assert len(placement.rectangles) == placement.nombre_pcb
+
+    placement = _placement(47, 33, 3, True, 300, 200)
+    placement.calculer_placement(cas=1)
+    placement.calculer_placement(cas=1)
+    assert len(placement.rectangles) == len({(r.x, r.y) for r in placement.rectangles}) > 0
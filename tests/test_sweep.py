@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+
+from logic import StrategieRetraits, evaluer_combinaison
+from sweep import balayer
+
+
+def _comparer(tableau, largeur_pcb, hauteur_pcb, allow_rotation, strategie, tolerance):
+    for point in tableau.ravel().tolist():
+        espacement, bordure, largeur_panneau, hauteur_panneau, nombre_pcb, _ = point
+        attendu, _ = evaluer_combinaison(largeur_pcb, hauteur_pcb, largeur_panneau, hauteur_panneau, espacement,
+                                         bordure, allow_rotation, strategie, tolerance)
+        assert nombre_pcb == attendu, point
+
+
+@pytest.mark.parametrize('largeur_pcb, hauteur_pcb, allow_rotation', [(20, 15, True), (33.3, 21.7, False)])
+def test_balayage_comme_l_evaluation_directe(largeur_pcb, hauteur_pcb, allow_rotation):
+    # Les largeurs comprennent des panneaux où une colonne tient tout juste :
+    # 2 x 10 de bordure + n x (20 + 5) - 5
+    largeurs = list(np.arange(280, 330, 3.7)) + [2 * 10 + 12 * 25 - 5, 2 * 10 + 13 * 25 - 5]
+    hauteurs = list(np.arange(180, 230, 4.1)) + [2 * 10 + 9 * 20 - 5]
+    tableau = balayer(largeur_pcb, hauteur_pcb, [2, 3.5, 5], [5, 10, 15], largeurs, hauteurs,
+                      allow_rotation=allow_rotation)
+    assert tableau.shape == (3, 3, len(largeurs), len(hauteurs))
+    _comparer(tableau, largeur_pcb, hauteur_pcb, allow_rotation, 'heuristique', 0.0)
+
+
+def test_balayage_avec_strategie_et_tolerance():
+    largeurs = [240.05, 250, 262.5, 275]
+    hauteurs = [170, 185.2, 199.9]
+    for tolerance in (0.1, -0.5):
+        tableau = balayer(20, 15, [2.5, 5], [5, 12], largeurs, hauteurs, strategie=StrategieRetraits(),
+                          tolerance=tolerance)
+        _comparer(tableau, 20, 15, True, 'retraits', tolerance)
+
+
+def test_remplissage():
+    tableau = balayer(20, 15, [5], [15], [600], [500])
+    point = tableau.ravel()[0]
+    assert point['nombre_pcb'] == 536
+    assert point['pourcentage_remplissage'] == pytest.approx(536 * 20 * 15 / (570 * 470) * 100)
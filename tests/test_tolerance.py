@@ -0,0 +1,56 @@
+import pytest
+
+from logic import Panneau, PlacementPCB, RectanglePCB, StrategieRetraits, microns, microns_inf
+from panel_library import FormatPanneau, classer_formats
+from pipeline import GraphePanelisation
+
+
+def _nombre(largeur, hauteur, espacement, tolerance=0.0, strategie=None):
+    options = {} if strategie is None else {'strategie': strategie}
+    placement = PlacementPCB(Panneau(600, 500, 15), RectanglePCB(largeur, hauteur), espacement, allow_rotation=False,
+                             tolerance=tolerance, **options)
+    placement.calculer_meilleur_placement()
+    return placement.nombre_pcb
+
+
+def test_arrondi_au_micrometre():
+    # Le bruit flottant ne change pas le micromètre ; un reste réel arrondit
+    # les PCB vers le haut et les panneaux vers le bas
+    assert microns(0.1 + 0.2) == microns_inf(0.1 + 0.2) == 300
+    assert microns(0.1 * 3) == microns_inf(0.3) == 300
+    assert (microns(1.0005), microns_inf(1.0005)) == (1001, 1000)
+    assert microns(0) == microns_inf(0) == 0
+    assert microns_inf(-0.0005) == -1
+
+
+@pytest.mark.parametrize('strategie', [None, StrategieRetraits()])
+def test_ajustement_exact(strategie):
+    # 5 x 110 + 4 x 5 = 570 mm : les cinq colonnes tiennent tout juste
+    assert _nombre(110, 110, 5, strategie=strategie) == 20
+    assert _nombre(0.1 * 1100, 110, 5, strategie=strategie) == 20
+    assert _nombre(110.001, 110, 5, strategie=strategie) == 16
+
+
+def test_tolerance():
+    # Cinq PCB de 110,001 mm dépassent de 5 µm
+    assert _nombre(110.001, 110, 5, tolerance=0.005) == 20
+    assert _nombre(110.001, 110, 5, tolerance=0.0049) == 16
+    assert _nombre(110, 110, 5, tolerance=-0.001) == 16
+
+
+def test_tolerance_dans_le_graphe():
+    graphe = GraphePanelisation(1)
+    graphe.definir(largeur_pcb=110.001, hauteur_pcb=110, allow_rotation=False, panneaux_largeurs=[600],
+                   panneaux_hauteurs=[500])
+    assert graphe.resultats()[0]['nombre_pcb'] == 16
+    graphe.definir(tolerance=0.005)
+    assert graphe.resultats()[0]['nombre_pcb'] == 20
+    assert graphe.placements()[0].tolerance == 0.005
+
+
+def test_tolerance_du_classement_de_bibliotheque():
+    formats = [FormatPanneau(600, 500, 15, cout=10)]
+    for tolerance, attendu in ((0.0, 16), (0.005, 20)):
+        ((_, placement),), _ = classer_formats(formats, RectanglePCB(110.001, 110), 5, 100, allow_rotation=False,
+                                               tolerance=tolerance)
+        assert placement.nombre_pcb == attendu
@@ -0,0 +1,99 @@
+import io
+import json
+import random
+
+import pytest
+
+from cli import lire_entree
+from logic import (
+    Panneau, PlacementPCB, RectanglePCB, StrategieHeuristique, StrategieRetraits, TravailPCB, optimiser_lot
+)
+
+# Rails latéraux, bordures inégales, trous d'outillage et mires
+PANNEAUX = [
+    Panneau(300, 200, 5, (20, 20, 5, 5)),
+    Panneau(300, 200, 5, None, [(100, 50, 40, 60)]),
+    Panneau(457, 300, 10, (25, 10, 8, 15), [(5, 5, 8, 8), (444, 5, 8, 8), (5, 287, 8, 8), (200, 120, 30, 30)]),
+    Panneau(600, 500, 15, (15, 15, 30, 30), [(0, 240, 600, 20)]),
+]
+
+PCB = [(20, 15, 5, True), (47, 33, 3, True), (12.7, 25.4, 1.6, False)]
+
+
+@pytest.mark.parametrize('panneau', PANNEAUX)
+@pytest.mark.parametrize('largeur, hauteur, espacement, rotation', PCB)
+def test_disposition_valide(panneau, largeur, hauteur, espacement, rotation, verifier_disposition):
+    for strategie in (None, StrategieRetraits()):
+        options = {} if strategie is None else {'strategie': strategie}
+        placement = PlacementPCB(panneau, RectanglePCB(largeur, hauteur), espacement, allow_rotation=rotation,
+                                 **options)
+        placement.calculer_meilleur_placement()
+        assert placement.nombre_pcb > 0
+        verifier_disposition(placement)
+
+
+def test_zones_et_bordures_reduisent_le_placement():
+    def nombre(panneau):
+        placement = PlacementPCB(panneau, RectanglePCB(20, 15), 5)
+        placement.calculer_meilleur_placement()
+        return placement.nombre_pcb
+
+    standard = nombre(Panneau(300, 200, 5))
+    assert nombre(PANNEAUX[0]) < standard
+    assert nombre(PANNEAUX[1]) < standard
+
+
+def _tirage(graine):
+    hasard = random.Random(graine)
+    largeur, hauteur = hasard.choice([300, 457, 600]), hasard.choice([200, 300, 500])
+    bordures = tuple(round(hasard.uniform(5, 25) * 2) / 2 for _ in range(4))
+    zones = [(round(hasard.uniform(0, largeur - 20), 1), round(hasard.uniform(0, hauteur - 20), 1),
+              round(hasard.uniform(1, 40), 1), round(hasard.uniform(1, 40), 1)) for _ in range(hasard.randint(0, 5))]
+    pcb = RectanglePCB(round(hasard.uniform(5, 80), 1), round(hasard.uniform(5, 80), 1))
+    return Panneau(largeur, hauteur, 10, bordures, zones), pcb, round(hasard.uniform(0, 3), 1), hasard.random() < 0.8
+
+
+# Bords de zones qui touchent tout juste un emplacement
+CAS_LIMITES = [
+    (Panneau(600, 500, 15, (22.5, 15, 22.5, 15), [(327.7, 433.5, 12.5, 35.1), (442.4, 411.1, 30.8, 1.9),
+                                                 (238.2, 432.1, 3.1, 4.6), (419.1, 181.7, 4.1, 15.7),
+                                                 (395.4, 60.1, 7.2, 8.0)]), RectanglePCB(77.8, 14.3), 1.8, True),
+    (Panneau(600, 200, 15, (10, 5, 15, 15)), RectanglePCB(9.7, 58.7), 1.2, True),
+]
+
+
+@pytest.mark.parametrize('strategie', [StrategieHeuristique, StrategieRetraits])
+def test_nombre_annonce_comme_le_placement(strategie):
+    # Le comptage des emplacements hors zones et le masque appliqué aux
+    # coordonnées doivent donner le même nombre de PCB
+    for panneau, pcb, espacement, rotation in CAS_LIMITES + [_tirage(graine) for graine in range(300)]:
+        placement = PlacementPCB(panneau, pcb, espacement, allow_rotation=rotation, strategie=strategie())
+        placement.calculer_meilleur_placement()
+        assert placement.nombre_pcb == len(placement.coordonnees()) == len(placement.rectangles), (
+            panneau.zones_interdites, pcb.largeur, pcb.hauteur, espacement)
+
+
+@pytest.mark.parametrize('processus', [1, 2])
+def test_lot_comme_le_placement_direct(processus):
+    travaux = [TravailPCB(largeur, hauteur, espacement, allow_rotation=rotation)
+               for largeur, hauteur, espacement, rotation in PCB]
+    resultats = optimiser_lot(travaux, PANNEAUX, processus=processus)
+
+    for resultat in resultats:
+        travail = travaux[resultat['travail']]
+        placement = PlacementPCB(PANNEAUX[resultat['panneau'] - 1], RectanglePCB(travail.largeur, travail.hauteur),
+                                 travail.espacement, allow_rotation=travail.allow_rotation)
+        placement.calculer_meilleur_placement()
+        assert resultat['nombre_pcb'] == placement.nombre_pcb
+
+
+def test_panneaux_json_de_la_ligne_de_commande():
+    donnees = {
+        'travaux': [{'largeur': 20, 'hauteur': 15}],
+        'panneaux': [{'largeur': 300, 'hauteur': 200, 'bordure': 5, 'bordures': {'gauche': 20, 'droite': 20},
+                      'zones': [{'x': 100, 'y': 50, 'largeur': 40, 'hauteur': 60}]}],
+    }
+    _, (panneau,) = lire_entree(io.StringIO(json.dumps(donnees)))
+    assert (panneau.bordure_gauche, panneau.bordure_droite, panneau.bordure_bas, panneau.bordure_haut) == (20, 20, 5, 5)
+    assert panneau.zones_interdites == [(100, 50, 40, 60)]
+    assert not panneau.standard
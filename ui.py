@@ -1,37 +1,47 @@
 # ui.py
 
-import sys
-from math import ceil
+import threading
+import time
+
 from PyQt5 import QtCore
+from PyQt5.QtCore import QThreadPool, QTimer
 from PyQt5.QtWidgets import (
-    QApplication, QMainWindow, QLabel, QLineEdit, QPushButton,
+    QMainWindow, QLabel, QLineEdit, QPushButton,
     QVBoxLayout, QHBoxLayout, QWidget, QGroupBox, QMessageBox, QTableWidget,
     QTableWidgetItem, QHeaderView, QCheckBox, QProgressBar, QFileDialog
 )
 from PyQt5.QtGui import QFont
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg
-import matplotlib.patches as patches
-from matplotlib.backends.backend_pdf import PdfPages
-
-from reportlab.pdfgen import canvas as rcanvas
-from reportlab.lib.pagesizes import A4
-from reportlab.lib.units import mm
-
-import textwrap
 
 # Import de la logique
-from logic import Panneau, RectanglePCB, PlacementPCB, calcul_pourcentage_remplissage, calcul_panneaux_necessaires
-
-class MplCanvas(FigureCanvasQTAgg):
-    """
-    Classe pour intégrer une figure Matplotlib dans PyQt5.
-    """
-    def __init__(self, parent=None, width=15, height=85, dpi=100):
-        fig, self.axes = plt.subplots(2, 2, figsize=(width, height), dpi=dpi)
-        super().__init__(fig)
-        self.setParent(parent)
-        plt.close(fig)
+from logic import (
+    CachePlacement, StrategieHeuristique, StrategieRetraits, calcul_resultat,
+    PANNEAUX_LARGEURS_DEFAUT, PANNEAUX_HAUTEURS_DEFAUT, TOLERANCE_AJUSTEMENT
+)
+import instrumentation
+from instrumentation import chronometrer, enregistrer, journaliser, mesurer_import, rapport_mesures
+from panel_library import lire_bibliotheque
+from pipeline import GraphePanelisation
+from worker import SignauxCalcul, SignauxExport, TacheCalcul, TacheClassement, TacheExport
+
+# Matplotlib n'est importé qu'au premier calcul ou au premier export,
+# pour que la fenêtre s'affiche sans attendre.
+
+# Délai sans saisie avant le recalcul en mode direct
+DELAI_CALCUL_DIRECT_MS = 300
+
+# Nombre de formats affichés (saisis à la main, ou les mieux classés de la bibliothèque)
+NOMBRE_FORMATS_AFFICHES = 4
+
+COLONNES_RECAPITULATIF = [
+    'Panneau',
+    'Dimensions Totales',
+    'Dimensions Utilisables',
+    'PCB par Panneau',
+    'Remplissage (%)',
+    'Panneaux Nécessaires',
+    'Quantité Produite',
+    'Coût Total'
+]
 
 class MainWindow(QMainWindow):
     """
@@ -47,13 +57,59 @@ class MainWindow(QMainWindow):
         self.largeur_pcb = 0
         self.hauteur_pcb = 0
         self.espacement = 5
+        self.tolerance = TOLERANCE_AJUSTEMENT
         self.bordure = 15
         self.nombre_pcb_a_fabriquer = 1
         self.pourcentage_surlancement = 5
         self.allow_rotation = True
-        self.panneaux_largeurs = [600, 580, 570, 457]
-        self.panneaux_hauteurs = [500, 510, 480, 300]
+        self.recherche_etendue = False
+        self.panneaux_largeurs = list(PANNEAUX_LARGEURS_DEFAUT)
+        self.panneaux_hauteurs = list(PANNEAUX_HAUTEURS_DEFAUT)
         self.resultats = []
+        # Indice du panneau de chaque ligne de self.resultats
+        self.indices_resultats = []
+        self.cache_placement = CachePlacement()
+        self._canvas = None
+        self.signatures_axes = {}
+
+        # Calcul en arrière-plan : une tâche par panneau dans le pool de threads.
+        # Chaque calcul est une génération ; les résultats d'une génération
+        # annulée ou remplacée sont ignorés.
+        self.pool_calcul = QThreadPool(self)
+        self.pool_calcul.setMaxThreadCount(NOMBRE_FORMATS_AFFICHES)
+        self.generation_calcul = 0
+        self._annulation = threading.Event()
+        self._debut_calcul = 0.0
+        self._taches = []
+        self._taches_annulees = []
+        self._resultats_calcul = {}
+        self._signatures_calcul = {}
+        self._coordonnees_recues = {}
+        self._nombre_total_pcb = 0
+        self._nombre_attendu = 0
+        # Bibliothèque de formats chargée, et formats affichés par rang
+        self.bibliotheque = None
+        self._formats_affiches = {}
+        # Dernier placement affiché de chaque panneau
+        self.placements_calcules = {}
+        # Historique persistant des travaux : un placement déjà calculé avec
+        # les mêmes entrées y est relu au lieu d'être recalculé
+        self.historique = self._ouvrir_historique()
+        # Formats saisis : géométrie, placement, production et rendu de chaque
+        # panneau ne sont recalculés que si leurs entrées ont changé
+        self.graphe = GraphePanelisation(NOMBRE_FORMATS_AFFICHES, cache=self.cache_placement,
+                                         rendu=self._rendre_panneau, historique=self.historique)
+        self.signaux_calcul = SignauxCalcul()
+        self.signaux_calcul.termine.connect(self.panneau_calcule)
+        self.signaux_calcul.erreur.connect(self.erreur_calcul)
+        self.signaux_calcul.classe.connect(self.formats_classes)
+        # Export en cours (PDF ou PNG), dans le pool de threads
+        self._export = None
+        self._annulation_export = threading.Event()
+        self.signaux_export = SignauxExport()
+        self.signaux_export.progression.connect(self.export_progression)
+        self.signaux_export.termine.connect(self.export_termine)
+        self.signaux_export.erreur.connect(self.export_erreur)
 
         self.init_ui()
 
@@ -96,6 +152,11 @@ class MainWindow(QMainWindow):
         self.espacement_input.setMaximumWidth(60)
         espacement_layout.addWidget(QLabel("Entraxe (mm) :"))
         espacement_layout.addWidget(self.espacement_input)
+        # Dépassement admis hors de la zone utile (négatif : marge exigée)
+        self.tolerance_input = QLineEdit(str(self.tolerance))
+        self.tolerance_input.setMaximumWidth(60)
+        espacement_layout.addWidget(QLabel("Tolérance (mm) :"))
+        espacement_layout.addWidget(self.tolerance_input)
 
         # Groupe production
         production_group = QGroupBox("Production")
@@ -118,6 +179,16 @@ class MainWindow(QMainWindow):
         self.mode_mix_checkbox.setChecked(True)
         input_layout.addWidget(self.mode_mix_checkbox)
 
+        # Checkbox recherche étendue (retrait de plusieurs colonnes/rangées)
+        self.recherche_etendue_checkbox = QCheckBox("Recherche étendue")
+        self.recherche_etendue_checkbox.setChecked(False)
+        input_layout.addWidget(self.recherche_etendue_checkbox)
+
+        # Checkbox calcul en direct : recalcul automatique pendant la saisie
+        self.calcul_direct_checkbox = QCheckBox("Calcul en direct")
+        self.calcul_direct_checkbox.setChecked(False)
+        input_layout.addWidget(self.calcul_direct_checkbox)
+
         # Groupe bordure
         bordure_group = QGroupBox("Bordure du Panneau")
         input_layout.addWidget(bordure_group)
@@ -131,9 +202,11 @@ class MainWindow(QMainWindow):
         # Panneaux
         self.panneaux_largeurs_inputs = []
         self.panneaux_hauteurs_inputs = []
-        for i in range(4):
+        self.panneaux_groupes = []
+        for i in range(NOMBRE_FORMATS_AFFICHES):
             panneau_group = QGroupBox(f"Dimensions du Panneau {i+1}")
             input_layout.addWidget(panneau_group)
+            self.panneaux_groupes.append(panneau_group)
             panneau_layout = QVBoxLayout()
             panneau_group.setLayout(panneau_layout)
             panneau_dimensions_layout = QHBoxLayout()
@@ -150,14 +223,36 @@ class MainWindow(QMainWindow):
             panneau_dimensions_layout.addWidget(hauteur_input)
             panneau_dimensions_layout.addWidget(QLabel("mm"))
 
-        # Canvas
-        self.canvas = MplCanvas(width=15, height=85, dpi=100)
-        right_layout.addWidget(self.canvas)
+        # Groupe bibliothèque : les formats les mieux classés remplacent les panneaux saisis
+        bibliotheque_group = QGroupBox("Bibliothèque de Panneaux")
+        input_layout.addWidget(bibliotheque_group)
+        bibliotheque_layout = QVBoxLayout()
+        bibliotheque_group.setLayout(bibliotheque_layout)
+        charger_bibliotheque_button = QPushButton("Charger...")
+        charger_bibliotheque_button.clicked.connect(self.charger_bibliotheque)
+        bibliotheque_layout.addWidget(charger_bibliotheque_button)
+        self.bibliotheque_checkbox = QCheckBox("Utiliser la bibliothèque")
+        self.bibliotheque_checkbox.setEnabled(False)
+        self.bibliotheque_checkbox.toggled.connect(self.mode_bibliotheque_change)
+        bibliotheque_layout.addWidget(self.bibliotheque_checkbox)
+        self.bibliotheque_label = QLabel("Aucune bibliothèque")
+        bibliotheque_layout.addWidget(self.bibliotheque_label)
+
+        # Zone du canvas, créé au premier affichage
+        self.zone_canvas = QWidget()
+        zone_canvas_layout = QVBoxLayout()
+        zone_canvas_layout.setContentsMargins(0, 0, 0, 0)
+        self.zone_canvas.setLayout(zone_canvas_layout)
+        right_layout.addWidget(self.zone_canvas, 1)
 
         # Tableau résultats
         self.table_widget = QTableWidget()
         right_layout.addWidget(self.table_widget)
 
+        # Mélange de formats de coût minimal pour la commande
+        self.melange_label = QLabel("")
+        right_layout.addWidget(self.melange_label)
+
         font = QFont()
         font.setPointSize(10)
         self.setFont(font)
@@ -168,10 +263,42 @@ class MainWindow(QMainWindow):
         calculer_button.setDefault(True)
         input_layout.addWidget(calculer_button)
 
-        # Bouton export PDF
-        export_pdf_button = QPushButton("Exporter en PDF")
-        export_pdf_button.clicked.connect(self.exporter_pdf)
-        input_layout.addWidget(export_pdf_button)
+        # Progression et annulation du calcul en cours
+        self.progression_calcul = QProgressBar()
+        self.progression_calcul.setRange(0, NOMBRE_FORMATS_AFFICHES)
+        self.progression_calcul.setValue(0)
+        self.progression_calcul.setFormat("%v / %m panneaux")
+        self.progression_calcul.setAlignment(QtCore.Qt.AlignCenter)
+        input_layout.addWidget(self.progression_calcul)
+
+        # Étapes recalculées et réutilisées par le dernier calcul
+        self.etapes_label = QLabel("")
+        self.etapes_label.setWordWrap(True)
+        input_layout.addWidget(self.etapes_label)
+
+        self.historique_label = QLabel("")
+        self.historique_label.setWordWrap(True)
+        input_layout.addWidget(self.historique_label)
+
+        self.annuler_button = QPushButton("Annuler")
+        self.annuler_button.clicked.connect(self.annuler_calcul)
+        self.annuler_button.setEnabled(False)
+        input_layout.addWidget(self.annuler_button)
+
+        # Boutons export PDF et PNG, et progression de l'export en cours
+        self.export_pdf_button = QPushButton("Exporter en PDF")
+        self.export_pdf_button.clicked.connect(self.exporter_pdf)
+        input_layout.addWidget(self.export_pdf_button)
+
+        self.export_png_button = QPushButton("Exporter en PNG")
+        self.export_png_button.clicked.connect(self.exporter_png)
+        input_layout.addWidget(self.export_png_button)
+
+        self.progression_export = QProgressBar()
+        self.progression_export.setFormat("Export : %v / %m pages")
+        self.progression_export.setAlignment(QtCore.Qt.AlignCenter)
+        self.progression_export.setVisible(False)
+        input_layout.addWidget(self.progression_export)
 
         # Bouton reset
         reset_button = QPushButton("Nouvelle Configuration")
@@ -182,6 +309,7 @@ class MainWindow(QMainWindow):
         self.largeur_pcb_input.returnPressed.connect(calculer_button.click)
         self.hauteur_pcb_input.returnPressed.connect(calculer_button.click)
         self.espacement_input.returnPressed.connect(calculer_button.click)
+        self.tolerance_input.returnPressed.connect(calculer_button.click)
         self.nombre_pcb_input.returnPressed.connect(calculer_button.click)
         self.pourcentage_surlancement_input.returnPressed.connect(calculer_button.click)
         self.bordure_input.returnPressed.connect(calculer_button.click)
@@ -189,15 +317,46 @@ class MainWindow(QMainWindow):
             largeur_input.returnPressed.connect(calculer_button.click)
             hauteur_input.returnPressed.connect(calculer_button.click)
 
+        # Toute modification des entrées rend le calcul en cours obsolète ;
+        # en mode direct, elle relance aussi le calcul après un délai sans saisie.
+        self.minuterie_calcul = QTimer(self)
+        self.minuterie_calcul.setSingleShot(True)
+        self.minuterie_calcul.setInterval(DELAI_CALCUL_DIRECT_MS)
+        self.minuterie_calcul.timeout.connect(lambda: self.calculer_et_visualiser(silencieux=True))
+
+        for input in [self.largeur_pcb_input, self.hauteur_pcb_input, self.espacement_input, self.tolerance_input,
+                      self.nombre_pcb_input, self.pourcentage_surlancement_input, self.bordure_input,
+                      *self.panneaux_largeurs_inputs, *self.panneaux_hauteurs_inputs]:
+            input.textChanged.connect(self.entree_modifiee)
+        self.mode_mix_checkbox.toggled.connect(self.entree_modifiee)
+        self.recherche_etendue_checkbox.toggled.connect(self.entree_modifiee)
+        self.bibliotheque_checkbox.toggled.connect(self.entree_modifiee)
+        self.calcul_direct_checkbox.toggled.connect(self.entree_modifiee)
+
+    @property
+    def canvas(self):
+        """
+        Canvas Matplotlib, créé (et Matplotlib importé) au premier accès.
+        """
+        if self._canvas is None:
+            with mesurer_import('matplotlib (canvas Qt)'):
+                from canvas import MplCanvas
+            self._canvas = MplCanvas(width=15, height=85, dpi=100)
+            self.zone_canvas.layout().addWidget(self._canvas)
+        return self._canvas
+
+    @chronometrer('MainWindow.valider_entrees')
     def valider_entrees(self):
         valeurs = {}
         valeurs['largeur_pcb'] = float(self.largeur_pcb_input.text())
         valeurs['hauteur_pcb'] = float(self.hauteur_pcb_input.text())
         valeurs['espacement'] = float(self.espacement_input.text())
+        valeurs['tolerance'] = float(self.tolerance_input.text())
         valeurs['bordure'] = float(self.bordure_input.text())
         valeurs['nombre_pcb_a_fabriquer'] = int(self.nombre_pcb_input.text())
         valeurs['pourcentage_surlancement'] = float(self.pourcentage_surlancement_input.text())
         valeurs['allow_rotation'] = self.mode_mix_checkbox.isChecked()
+        valeurs['recherche_etendue'] = self.recherche_etendue_checkbox.isChecked()
 
         valeurs['panneaux_largeurs'] = [float(input.text()) for input in self.panneaux_largeurs_inputs]
         valeurs['panneaux_hauteurs'] = [float(input.text()) for input in self.panneaux_hauteurs_inputs]
@@ -212,160 +371,451 @@ class MainWindow(QMainWindow):
 
         return valeurs
 
-    def calculer_et_visualiser(self):
+    def entree_modifiee(self):
+        self.annuler_calcul()
+        if self.calcul_direct_checkbox.isChecked():
+            self.minuterie_calcul.start()
+
+    def calculer_et_visualiser(self, silencieux=False):
+        """
+        Lance en arrière-plan le calcul des panneaux dont les entrées ont changé
+        depuis leur dernier calcul. Chaque panneau est affiché dès que son
+        calcul est terminé ; les autres ne sont ni recalculés ni redessinés.
+        En mode silencieux (calcul en direct), les entrées invalides sont ignorées.
+        """
         try:
             val = self.valider_entrees()
-            self.largeur_pcb = val['largeur_pcb']
-            self.hauteur_pcb = val['hauteur_pcb']
-            self.espacement = val['espacement']
-            self.bordure = val['bordure']
-            self.nombre_pcb_a_fabriquer = val['nombre_pcb_a_fabriquer']
-            self.pourcentage_surlancement = val['pourcentage_surlancement']
-            self.allow_rotation = val['allow_rotation']
-            self.panneaux_largeurs = val['panneaux_largeurs']
-            self.panneaux_hauteurs = val['panneaux_hauteurs']
-
-            pcb_prototype = RectanglePCB(self.largeur_pcb, self.hauteur_pcb)
-
-            nombre_total_pcb = ceil(self.nombre_pcb_a_fabriquer * (1 + self.pourcentage_surlancement / 100))
-
-            panneaux = []
-            placements = []
-            self.resultats.clear()
-
-            for i in range(4):
-                panneau = Panneau(self.panneaux_largeurs[i], self.panneaux_hauteurs[i], self.bordure)
-                panneaux.append(panneau)
-
-                placement = PlacementPCB(panneau, pcb_prototype, self.espacement, allow_rotation=self.allow_rotation)
-                placement.calculer_meilleur_placement()
-                placements.append(placement)
-
-                pourcentage_remplissage = calcul_pourcentage_remplissage(placement.surface_occupee, panneau.surface_utilisable)
-                nombre_panneaux_necessaires = calcul_panneaux_necessaires(nombre_total_pcb, placement.nombre_pcb)
-                quantite_produite = placement.nombre_pcb * nombre_panneaux_necessaires
-
-                self.resultats.append({
-                    'panneau': i + 1,
-                    'dimensions_totales': f"{panneau.largeur_totale} x {panneau.hauteur_totale}",
-                    'dimensions_utilisables': f"{panneau.largeur} x {panneau.hauteur}",
-                    'nombre_pcb': placement.nombre_pcb,
-                    'pourcentage_remplissage': pourcentage_remplissage,
-                    'nombre_panneaux_necessaires': nombre_panneaux_necessaires,
-                    'quantite_produite': quantite_produite
-                })
-
-            self.visualiser_placements(panneaux, placements)
-            self.afficher_recapitulatif()
-
         except ValueError as e:
-            QMessageBox.critical(self, "Erreur", str(e))
+            if not silencieux:
+                QMessageBox.critical(self, "Erreur", str(e))
+            return
+
+        self.annuler_calcul()
+        self.largeur_pcb = val['largeur_pcb']
+        self.hauteur_pcb = val['hauteur_pcb']
+        self.espacement = val['espacement']
+        self.tolerance = val['tolerance']
+        self.bordure = val['bordure']
+        self.nombre_pcb_a_fabriquer = val['nombre_pcb_a_fabriquer']
+        self.pourcentage_surlancement = val['pourcentage_surlancement']
+        self.allow_rotation = val['allow_rotation']
+        self.recherche_etendue = val['recherche_etendue']
+        self.panneaux_largeurs = val['panneaux_largeurs']
+        self.panneaux_hauteurs = val['panneaux_hauteurs']
+
+        strategie = StrategieRetraits() if self.recherche_etendue else StrategieHeuristique()
+        self.graphe.remettre_a_zero_compteurs()
+        self.graphe.definir(largeur_pcb=self.largeur_pcb, hauteur_pcb=self.hauteur_pcb, espacement=self.espacement,
+                            bordure=self.bordure, allow_rotation=self.allow_rotation, strategie=strategie.nom,
+                            tolerance=self.tolerance,
+                            nombre_pcb_a_fabriquer=self.nombre_pcb_a_fabriquer,
+                            pourcentage_surlancement=self.pourcentage_surlancement,
+                            panneaux_largeurs=self.panneaux_largeurs, panneaux_hauteurs=self.panneaux_hauteurs)
+        pcb_prototype = self.graphe.calculer('pcb')
+        self._nombre_total_pcb = self.graphe.calculer('nombre_total_pcb')
+
+        self.generation_calcul += 1
+        self._annulation = threading.Event()
+        self._debut_calcul = time.perf_counter()
+        self._resultats_calcul = {}
+        self._signatures_calcul = {}
+        self._coordonnees_recues = {}
+
+        if self.bibliotheque_checkbox.isChecked():
+            self.historique_label.clear()
+            # Le tableau est mis à jour à l'arrivée du classement
+            tache = TacheClassement(self.generation_calcul, self.bibliotheque, pcb_prototype, self.espacement,
+                                    self._nombre_total_pcb, self.allow_rotation, strategie, self.cache_placement,
+                                    NOMBRE_FORMATS_AFFICHES, self._annulation, self.signaux_calcul, self.tolerance)
+            self._nombre_attendu = None
+            self._taches.append(tache)
+            self.pool_calcul.start(tache)
+            self.progression_calcul.setValue(0)
+            self.etapes_label.clear()
+            self.annuler_button.setEnabled(True)
+            return
+
+        self._formats_affiches = {}
+        self._nombre_attendu = NOMBRE_FORMATS_AFFICHES
+        self.afficher_historique()
+        for i in range(NOMBRE_FORMATS_AFFICHES):
+            a_calculer = self.graphe.placement_a_calculer(i)
+            if a_calculer is None:
+                # Placement inchangé ou relu dans l'historique : seuls les
+                # chiffres de production sont recalculés s'il le faut, et
+                # l'axe n'est redessiné que si le placement a changé
+                self._resultats_calcul[i] = self.graphe.calculer(f'production[{i}]')
+                self.placements_calcules[i] = self.graphe.valeur(f'placement[{i}]')
+                self.graphe.terminer([i])
+                continue
+
+            placement, self._signatures_calcul[i] = a_calculer
+            tache = TacheCalcul(self.generation_calcul, i, placement, self._annulation, self.signaux_calcul)
+            self._taches.append(tache)
+            self.pool_calcul.start(tache)
+
+        self._publier_resultats()
+        self.afficher_recapitulatif()
+        self.progression_calcul.setValue(len(self._resultats_calcul))
+        self.etapes_label.setText(self.graphe.rapport())
+        self.annuler_button.setEnabled(bool(self._taches))
+        if not self._taches:
+            self._terminer_calcul()
+
+    def formats_classes(self, generation, evalues, formats):
+        """
+        Reçoit le classement de la bibliothèque, avant les placements des
+        formats retenus. Les axes sans format retenu sont vidés.
+        """
+        if generation != self.generation_calcul or self._annulation.is_set():
+            return
 
-    def visualiser_placements(self, panneaux, placements):
-        for ax_row in self.canvas.axes:
-            for ax in ax_row:
+        self._formats_affiches = dict(enumerate(formats))
+        self._nombre_attendu = len(formats)
+        self.bibliotheque_label.setText(f"{len(self.bibliotheque)} formats, {evalues} placements calculés")
+
+        axes_vides = []
+        for idx in range(len(formats), NOMBRE_FORMATS_AFFICHES):
+            if self.signatures_axes.pop(idx, None) is not None:
+                ax = self.canvas.axes[idx // 2][idx % 2]
                 ax.clear()
+                ax.axis('off')
+                axes_vides.append(ax)
+        if axes_vides:
+            self.canvas.redessiner(axes_vides)
+
+        if not formats:
+            self._publier_resultats()
+            self.afficher_recapitulatif()
+            self._terminer_calcul()
+            self.bibliotheque_label.setText(f"{len(self.bibliotheque)} formats, aucun ne convient")
+
+    def panneau_calcule(self, generation, index, placement, coordonnees):
+        """
+        Affiche le résultat d'un panneau dès la fin de son calcul.
+        """
+        if generation != self.generation_calcul or self._annulation.is_set():
+            return
+
+        format_panneau = self._formats_affiches.get(index)
+        self.placements_calcules[index] = placement
+        if format_panneau is None:
+            self.graphe.fixer(f'placement[{index}]', placement, self._signatures_calcul[index])
+            self._resultats_calcul[index] = self.graphe.calculer(f'production[{index}]')
+            self._coordonnees_recues[index] = coordonnees
+            self.graphe.terminer([index])
+            self.etapes_label.setText(self.graphe.rapport())
+        else:
+            resultat = calcul_resultat(format_panneau.nom, placement.panneau, placement.nombre_pcb,
+                                       placement.surface_occupee, self._nombre_total_pcb)
+            cout = format_panneau.cout
+            resultat['cout_total'] = None if cout is None else cout * resultat['nombre_panneaux_necessaires']
+            self._resultats_calcul[index] = resultat
+            if self.historique is not None:
+                self.historique.ajouter(placement, resultat, self._nombre_total_pcb)
+            ax = self.visualiser_panneau(index, placement.panneau, placement, coordonnees, format_panneau.nom)
+            self.canvas.redessiner([ax] if ax is not None else [])
+        self._publier_resultats()
+        self.afficher_recapitulatif()
+
+        self.progression_calcul.setValue(len(self._resultats_calcul))
+        if len(self._resultats_calcul) == self._nombre_attendu:
+            self._terminer_calcul()
+
+    def _publier_resultats(self):
+        self.indices_resultats = sorted(self._resultats_calcul)
+        self.resultats = [self._resultats_calcul[i] for i in self.indices_resultats]
+
+    def _vider_resultats(self):
+        """
+        Oublie les placements et les résultats affichés, et vide le tableau.
+        """
+        self.placements_calcules.clear()
+        self._invalider_rendus()
+        self.resultats = []
+        self.indices_resultats = []
+        self.table_widget.clearContents()
+        self.table_widget.setRowCount(0)
+        self.melange_label.clear()
+
+    def _terminer_calcul(self):
+        self._taches.clear()
+        self.annuler_button.setEnabled(False)
+        self.afficher_melange()
+        if self.historique is not None:
+            self.historique.enregistrer()
+        if instrumentation.ACTIF:
+            enregistrer('calcul complet', time.perf_counter() - self._debut_calcul)
+            etapes = "" if self._formats_affiches else f"\nétapes : {self.graphe.rapport()}"
+            journaliser(f"calcul terminé{etapes}\n{rapport_mesures()}")
+
+    def _rendre_panneau(self, idx, placement):
+        """
+        Étape de rendu du graphe : reconstruit et redessine l'axe d'un
+        panneau saisi, avec les coordonnées préparées par sa tâche de calcul.
+        """
+        ax = self.visualiser_panneau(idx, placement.panneau, placement, self._coordonnees_recues.pop(idx, None))
+        self.canvas.redessiner([ax] if ax is not None else [])
+
+    def _invalider_rendus(self):
+        # Les axes ont été vidés ou ont affiché d'autres formats
+        for i in range(NOMBRE_FORMATS_AFFICHES):
+            self.graphe.invalider(f'rendu[{i}]')
+
+    def _ouvrir_historique(self):
+        """
+        Ouvre l'historique des travaux ; sans base accessible, l'application
+        fonctionne sans historique.
+        """
+        with mesurer_import('sqlite3 (historique)'):
+            import sqlite3
+            from job_history import CHEMIN_DEFAUT, HistoriqueTravaux
+        try:
+            return HistoriqueTravaux(CHEMIN_DEFAUT)
+        except (sqlite3.Error, OSError) as e:
+            journaliser(f"historique indisponible : {e}")
+            return None
+
+    def afficher_historique(self):
+        """
+        Affiche le travail déjà enregistré dont le PCB est le plus proche du
+        PCB saisi, sur l'un des formats saisis.
+        """
+        if self.historique is None:
+            return
+        travaux = []
+        for largeur, hauteur in zip(self.panneaux_largeurs, self.panneaux_hauteurs):
+            travaux += self.historique.plus_proches(self.largeur_pcb, self.hauteur_pcb, largeur, hauteur)
+        if not travaux:
+            self.historique_label.setText("Historique : aucun travail sur ces formats")
+            return
+
+        travail = min(travaux, key=lambda t: (t['ecart'], -t['id']))
+        debut = "Déjà panélisé" if travail['ecart'] == 0 else f"PCB le plus proche (écart {travail['ecart']:g} mm)"
+        self.historique_label.setText(
+            f"{debut} : {travail['largeur']:g} x {travail['hauteur']:g} sur {travail['largeur_panneau']:g} x "
+            f"{travail['hauteur_panneau']:g}, {travail['nombre_pcb']} PCB par panneau "
+            f"(le {time.strftime('%d/%m/%Y', time.localtime(travail['date']))})")
 
-        for idx, (panneau, placement) in enumerate(zip(panneaux, placements)):
-            ax = self.canvas.axes[idx // 2][idx % 2]
-            rectangles = placement.rectangles
+    def afficher_melange(self):
+        """
+        Affiche le mélange de panneaux des formats affichés qui produit la
+        commande (surlancement compris) au moindre coût. Sans coûts, chaque
+        panneau compte pour 1 : le nombre de panneaux est minimisé.
+        """
+        if not self.resultats:
+            self.melange_label.clear()
+            return
 
-            panneau_patch = patches.Rectangle((0, 0), panneau.largeur_totale, panneau.hauteur_totale,
-                                              linewidth=1, edgecolor='black', facecolor='lightgray', alpha=0.3)
-            ax.add_patch(panneau_patch)
+        with mesurer_import('numpy (mélange)'):
+            from panel_mix import optimiser_melange
 
-            surface_utilisable_patch = patches.Rectangle((panneau.bordure, panneau.bordure), panneau.largeur, panneau.hauteur,
-                                                         linewidth=1, edgecolor='black', facecolor='none')
-            ax.add_patch(surface_utilisable_patch)
+        indices = sorted(self._resultats_calcul)
+        formats = [self._formats_affiches.get(i) for i in indices]
+        noms = [f"Format {i + 1}" if f is None else f.nom for i, f in zip(indices, formats)]
+        avec_couts = all(f is not None and f.cout is not None for f in formats)
+        couts = [f.cout for f in formats] if avec_couts else [1.0] * len(formats)
 
-            for rect in rectangles:
-                couleur = 'blue' if rect.rotation == 0 else 'green'
-                rectangle_patch = patches.Rectangle((rect.x, rect.y), rect.largeur, rect.hauteur,
-                                                    linewidth=1, edgecolor='black', facecolor=couleur, alpha=0.6)
-                ax.add_patch(rectangle_patch)
+        try:
+            melange = optimiser_melange([self._resultats_calcul[i]['nombre_pcb'] for i in indices], couts,
+                                        self._nombre_total_pcb)
+        except ValueError:
+            self.melange_label.setText("Mélange optimal : aucun format ne convient")
+            return
 
-            ax.set_xlim(0, panneau.largeur_totale)
-            ax.set_ylim(0, panneau.hauteur_totale)
-            ax.set_aspect('equal', adjustable='box')
-            ax.set_title(f"Format {idx +1} : {panneau.largeur_totale} x {panneau.hauteur_totale} : x{placement.nombre_pcb} PCB")
-            ax.axis('off')
+        termes = " + ".join(f"{q} x {nom}" for q, nom in zip(melange['panneaux'], noms) if q)
+        texte = (f"Mélange optimal : {termes} | {melange['nombre_panneaux']} panneaux, "
+                 f"{melange['quantite_produite']} PCB produits (+{melange['surplus']})")
+        if avec_couts:
+            texte += f", coût {melange['cout_total']:.2f}"
+        self.melange_label.setText(texte)
 
-        self.canvas.draw()
+    def erreur_calcul(self, generation, index, message):
+        if generation != self.generation_calcul or self._annulation.is_set():
+            return
+        self.annuler_calcul()
+        QMessageBox.critical(self, "Erreur", f"Panneau {index + 1} : {message}")
 
+    def annuler_calcul(self):
+        """
+        Annule le calcul en cours : les tâches en attente sont retirées du pool,
+        les résultats des tâches déjà démarrées sont ignorés.
+        """
+        if not self._taches:
+            return
+        self._annulation.set()
+        # Les tâches déjà démarrées restent référencées jusqu'à leur fin
+        self._taches_annulees = [tache for tache in self._taches_annulees + self._taches
+                                 if not tache.terminee and not self.pool_calcul.tryTake(tache)]
+        self._taches.clear()
+        self.progression_calcul.setValue(0)
+        self.annuler_button.setEnabled(False)
+
+    def closeEvent(self, event):
+        self.annuler_calcul()
+        self._annulation_export.set()
+        self.pool_calcul.waitForDone()
+        if self.historique is not None:
+            self.historique.fermer()
+        super().closeEvent(event)
+
+    @chronometrer('MainWindow.visualiser_panneau', detail=False)
+    def visualiser_panneau(self, idx, panneau, placement, coordonnees=None, nom=None):
+        """
+        Reconstruit l'axe d'un panneau si son placement a changé et le retourne
+        (None si l'axe est inchangé). Le redessin est laissé à l'appelant.
+        """
+        with mesurer_import('matplotlib (rendu)'):
+            from rendering import dessiner_panneau
+
+        if coordonnees is None:
+            coordonnees = placement.coordonnees()
+        if nom is None:
+            titre = f"Format {idx +1} : {panneau.largeur_totale} x {panneau.hauteur_totale} : x{placement.nombre_pcb} PCB"
+        else:
+            titre = f"{idx + 1}. {nom} : x{placement.nombre_pcb} PCB"
+        signature = (panneau.largeur_totale, panneau.hauteur_totale, panneau.bordure, titre, coordonnees.tobytes())
+        if self.signatures_axes.get(idx) == signature:
+            return None
+        self.signatures_axes[idx] = signature
+
+        ax = self.canvas.axes[idx // 2][idx % 2]
+        ax.clear()
+        dessiner_panneau(ax, panneau, coordonnees, titre)
+        return ax
+
+    @chronometrer('MainWindow.afficher_recapitulatif')
     def afficher_recapitulatif(self):
-        columns = [
-            'Panneau',
-            'Dimensions Totales',
-            'Dimensions Utilisables',
-            'PCB par Panneau',
-            'Remplissage (%)',
-            'Panneaux Nécessaires',
-            'Quantité Produite'
-        ]
+        """
+        Met à jour le tableau récapitulatif. Les cellules et barres de
+        remplissage existantes sont réutilisées ; seules les lignes ajoutées
+        sont créées.
+        """
+        if self.table_widget.columnCount() != len(COLONNES_RECAPITULATIF):
+            self.table_widget.setColumnCount(len(COLONNES_RECAPITULATIF))
+            self.table_widget.setHorizontalHeaderLabels(COLONNES_RECAPITULATIF)
+            self.table_widget.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+
+            row_height = 25
+            self.table_widget.verticalHeader().setDefaultSectionSize(row_height)
+
+            total_height = 200
+            self.table_widget.setFixedHeight(total_height)
+
+        lignes_ajoutees = len(self.resultats) > self.table_widget.rowCount()
         self.table_widget.setRowCount(len(self.resultats))
-        self.table_widget.setColumnCount(len(columns))
-        self.table_widget.setHorizontalHeaderLabels(columns)
-        self.table_widget.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
 
         for row, result in enumerate(self.resultats):
-            self.table_widget.setItem(row, 0, QTableWidgetItem(str(result['panneau'])))
-            self.table_widget.setItem(row, 1, QTableWidgetItem(result['dimensions_totales']))
-            self.table_widget.setItem(row, 2, QTableWidgetItem(result['dimensions_utilisables']))
-            self.table_widget.setItem(row, 3, QTableWidgetItem(str(result['nombre_pcb'])))
+            self._mettre_a_jour_cellule(row, 0, str(result['panneau']))
+            self._mettre_a_jour_cellule(row, 1, result['dimensions_totales'])
+            self._mettre_a_jour_cellule(row, 2, result['dimensions_utilisables'])
+            self._mettre_a_jour_cellule(row, 3, str(result['nombre_pcb']))
 
             remplissage = result['pourcentage_remplissage']
-            progress_bar = QProgressBar()
+            progress_bar = self.table_widget.cellWidget(row, 4)
+            if progress_bar is None:
+                progress_bar = QProgressBar()
+                progress_bar.setAlignment(QtCore.Qt.AlignCenter)
+                self.table_widget.setCellWidget(row, 4, progress_bar)
             progress_bar.setValue(int(remplissage))
-            progress_bar.setAlignment(QtCore.Qt.AlignCenter)
             if remplissage >= 75:
-                progress_bar.setStyleSheet("QProgressBar::chunk { background-color: green; }")
+                style = "QProgressBar::chunk { background-color: green; }"
             elif 60 <= remplissage < 75:
-                progress_bar.setStyleSheet("QProgressBar::chunk { background-color: yellow; }")
+                style = "QProgressBar::chunk { background-color: yellow; }"
             else:
-                progress_bar.setStyleSheet("QProgressBar::chunk { background-color: red; }")
-            self.table_widget.setCellWidget(row, 4, progress_bar)
-
-            self.table_widget.setItem(row, 5, QTableWidgetItem(str(result['nombre_panneaux_necessaires'])))
-            self.table_widget.setItem(row, 6, QTableWidgetItem(str(result['quantite_produite'])))
+                style = "QProgressBar::chunk { background-color: red; }"
+            if progress_bar.styleSheet() != style:
+                progress_bar.setStyleSheet(style)
+
+            self._mettre_a_jour_cellule(row, 5, str(result['nombre_panneaux_necessaires']))
+            self._mettre_a_jour_cellule(row, 6, str(result['quantite_produite']))
+            cout_total = result.get('cout_total')
+            self._mettre_a_jour_cellule(row, 7, "-" if cout_total is None else f"{cout_total:.2f}")
+
+        if lignes_ajoutees:
+            self.table_widget.resizeRowsToContents()
+
+    def _mettre_a_jour_cellule(self, row, column, texte):
+        item = self.table_widget.item(row, column)
+        if item is None:
+            self.table_widget.setItem(row, column, QTableWidgetItem(texte))
+        elif item.text() != texte:
+            item.setText(texte)
+
+    def charger_bibliotheque(self):
+        """
+        Charge une bibliothèque de formats de panneaux (JSON ou CSV) et l'active.
+        """
+        filename, _ = QFileDialog.getOpenFileName(self, "Charger une bibliothèque de panneaux", "",
+                                                  "Bibliothèques (*.json *.csv)")
+        if not filename:
+            return
+        try:
+            with open(filename, encoding='utf-8') as fichier:
+                self.bibliotheque = lire_bibliotheque(fichier)
+        except (ValueError, KeyError, TypeError, OSError) as e:
+            QMessageBox.critical(self, "Erreur", f"Bibliothèque invalide : {e}")
+            return
 
-        row_height = 25
-        self.table_widget.verticalHeader().setDefaultSectionSize(row_height)
-        self.table_widget.resizeRowsToContents()
+        self.bibliotheque_label.setText(f"{len(self.bibliotheque)} formats")
+        self.bibliotheque_checkbox.setEnabled(True)
+        if self.bibliotheque_checkbox.isChecked():
+            self.entree_modifiee()
+        else:
+            self.bibliotheque_checkbox.setChecked(True)
 
-        total_height = 200
-        self.table_widget.setFixedHeight(total_height)
+    def mode_bibliotheque_change(self, active):
+        for panneau_group in self.panneaux_groupes:
+            panneau_group.setEnabled(not active)
+        # Les axes, placements et résultats affichés ne correspondent plus aux mêmes formats
+        self._vider_resultats()
 
     def nouvelle_configuration(self):
         self.largeur_pcb_input.clear()
         self.hauteur_pcb_input.clear()
         self.espacement_input.setText(str(5))
+        self.tolerance_input.setText(str(TOLERANCE_AJUSTEMENT))
         self.bordure_input.setText(str(15))
         self.nombre_pcb_input.setText(str(1))
         self.pourcentage_surlancement_input.setText(str(5))
         self.mode_mix_checkbox.setChecked(True)
-
-        valeurs_largeurs = [600, 580, 570, 457]
-        valeurs_hauteurs = [500, 510, 480, 300]
-        for i in range(4):
-            self.panneaux_largeurs_inputs[i].setText(str(valeurs_largeurs[i]))
-            self.panneaux_hauteurs_inputs[i].setText(str(valeurs_hauteurs[i]))
-
-        for ax_row in self.canvas.axes:
-            for ax in ax_row:
-                ax.clear()
-        self.canvas.draw()
-
-        self.table_widget.clearContents()
-        self.table_widget.setRowCount(0)
-
-    
+        self.recherche_etendue_checkbox.setChecked(False)
+        self.bibliotheque_checkbox.setChecked(False)
+
+        for i in range(NOMBRE_FORMATS_AFFICHES):
+            self.panneaux_largeurs_inputs[i].setText(str(PANNEAUX_LARGEURS_DEFAUT[i]))
+            self.panneaux_hauteurs_inputs[i].setText(str(PANNEAUX_HAUTEURS_DEFAUT[i]))
+
+        if self._canvas is not None:
+            for ax_row in self._canvas.axes:
+                for ax in ax_row:
+                    ax.clear()
+            self._canvas.redessiner_tout()
+        self.signatures_axes.clear()
+        self._vider_resultats()
+        self.etapes_label.clear()
+        self.historique_label.clear()
+
+    def _pret_pour_export(self):
+        if not self.resultats:
+            QMessageBox.warning(self, "Avertissement", "Aucun résultat à exporter. Veuillez d'abord calculer.")
+            return False
+        if self._taches:
+            QMessageBox.warning(self, "Avertissement", "Calcul en cours. Veuillez attendre la fin du calcul.")
+            return False
+        if self._export is not None:
+            QMessageBox.warning(self, "Avertissement", "Export en cours. Veuillez attendre la fin de l'export.")
+            return False
+        if any(idx not in self.placements_calcules for idx in self.indices_resultats):
+            QMessageBox.warning(self, "Avertissement", "Résultats incomplets. Veuillez relancer le calcul.")
+            return False
+        return True
 
     def exporter_pdf(self):
         """
-        Exporte la figure et le récapitulatif en PDF.
+        Exporte la figure et le récapitulatif en PDF, sans bloquer l'interface.
         """
-        if not self.resultats:
-            QMessageBox.warning(self, "Avertissement", "Aucun résultat à exporter. Veuillez d'abord calculer.")
+        if not self._pret_pour_export():
             return
 
         options = QFileDialog.Options()
@@ -373,36 +823,75 @@ class MainWindow(QMainWindow):
         if not filename:
             return
 
-        with PdfPages(filename) as pdf:
-            # Page 1 : la figure des panneaux
-            pdf.savefig(self.canvas.figure)
-
-            # Page 2 : Récapitulatif détaillé en plusieurs lignes
-            fig2 = plt.figure(figsize=(8.27, 11.7))  # Format A4 approximatif
-            plt.axis('off')
-            y = 1
-            plt.text(0.1, y, "Récapitulatif de la panélisation", fontsize=14, fontweight='bold')
-            y -= 0.05
-
-            # Pour chaque résultat, on affiche plusieurs lignes
-            for res in self.resultats:
-                lines = [
-                    f"Panneau {res['panneau']}:",
-                    f"    Dimensions Totales: {res['dimensions_totales']}",
-                    f"    Dimensions Utilisables: {res['dimensions_utilisables']}",
-                    f"    PCB par Panneau: {res['nombre_pcb']}",
-                    f"    Remplissage: {res['pourcentage_remplissage']:.2f}%",
-                    f"    Panneaux Nécessaires: {res['nombre_panneaux_necessaires']}",
-                    f"    Quantité Produite: {res['quantite_produite']}"
-                ]
-
-                for line in lines:
-                    plt.text(0.1, y, line, fontsize=10)
-                    y -= 0.02
-                y -= 0.03  # espace supplémentaire entre les différents panneaux
-
-            pdf.savefig(fig2)
-            plt.close(fig2)
-
-        QMessageBox.information(self, "Information", f"Fichier PDF exporté : {filename}")
+        with mesurer_import('reportlab (export PDF)'):
+            from export import exporter_pdf
+        self._lancer_export(exporter_pdf, filename, notes=self._notes_export())
+
+    def exporter_png(self):
+        """
+        Exporte une image PNG par panneau affiché dans un dossier, sans
+        bloquer l'interface.
+        """
+        if not self._pret_pour_export():
+            return
+
+        dossier = QFileDialog.getExistingDirectory(self, "Exporter en PNG")
+        if not dossier:
+            return
+
+        with mesurer_import('reportlab (export PNG)'):
+            from export import exporter_png
+        self._lancer_export(exporter_png, dossier)
 
+    def _lancer_export(self, exporter, destination, **options):
+        """
+        Exporte les panneaux affichés dans une tâche du pool de threads ; la
+        progression est suivie par signaux.
+        """
+        pages = self._pages_export()
+        self._annulation_export.clear()
+        self._export = TacheExport(exporter, destination, pages, self._annulation_export, self.signaux_export,
+                                   **options)
+        self.progression_export.setRange(0, len(pages))
+        self.progression_export.setValue(0)
+        self.progression_export.setVisible(True)
+        self.export_pdf_button.setEnabled(False)
+        self.export_png_button.setEnabled(False)
+        self.pool_calcul.start(self._export)
+
+    def export_progression(self, faites, total):
+        self.progression_export.setRange(0, total)
+        self.progression_export.setValue(faites)
+
+    def _fin_export(self):
+        self._export = None
+        self.progression_export.setVisible(False)
+        self.export_pdf_button.setEnabled(True)
+        self.export_png_button.setEnabled(True)
+
+    def export_termine(self, destination):
+        self._fin_export()
+        QMessageBox.information(self, "Information", f"Export terminé : {destination}")
+
+    def export_erreur(self, message):
+        self._fin_export()
+        QMessageBox.critical(self, "Erreur", f"Export impossible : {message}")
+
+    def _pages_export(self):
+        """
+        Une page par panneau affiché, avec son récapitulatif. Les panneaux
+        sans placement calculé sont omis.
+        """
+        from pdf_report import PageRapport
+
+        pages = []
+        for idx, res in zip(self.indices_resultats, self.resultats):
+            placement = self.placements_calcules.get(idx)
+            if placement is None:
+                continue
+            pages.append(PageRapport(f"Panneau {res['panneau']} : {res['dimensions_totales']}", placement.panneau,
+                                     placement.coordonnees(), res))
+        return pages
+
+    def _notes_export(self):
+        return [self.melange_label.text()] if self.melange_label.text() else []
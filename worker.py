@@ -0,0 +1,162 @@
+import threading
+from typing import Callable, List
+
+from PyQt5.QtCore import QObject, QRunnable, pyqtSignal
+
+from logic import PlacementPCB, RectanglePCB, StrategiePlacement, CachePlacement, TOLERANCE_AJUSTEMENT
+from panel_library import FormatPanneau, classer_formats
+
+
+class SignauxCalcul(QObject):
+    """
+    Signaux émis par les tâches de calcul, reçus dans le thread de l'interface.
+    """
+    # generation, index du panneau, placement calculé, coordonnées des PCB
+    termine = pyqtSignal(int, int, object, object)
+    # generation, index du panneau, message d'erreur
+    erreur = pyqtSignal(int, int, str)
+    # generation, nombre de formats évalués, formats retenus dans l'ordre du classement
+    classe = pyqtSignal(int, int, object)
+
+
+class TacheCalcul(QRunnable):
+    """
+    Calcule le placement d'un panneau dans un thread du pool.
+
+    La tâche appartient à une génération de calcul : si la génération est
+    annulée (nouveau calcul, entrées modifiées ou bouton Annuler), la tâche
+    ne démarre pas, ou son résultat n'est pas émis. Une tâche démarrée doit
+    rester référencée jusqu'à ce que ``terminee`` soit vrai.
+    """
+    def __init__(self, generation: int, index: int, placement: PlacementPCB, annulation: threading.Event,
+                 signaux: SignauxCalcul):
+        super().__init__()
+        self.setAutoDelete(False)
+        self.generation = generation
+        self.index = index
+        self.placement = placement
+        self.annulation = annulation
+        self.signaux = signaux
+        self.terminee = False
+
+    def run(self):
+        try:
+            self._calculer()
+        finally:
+            self.terminee = True
+
+    def _calculer(self):
+        if self.annulation.is_set():
+            return
+        try:
+            self.placement.calculer_meilleur_placement()
+            # Les coordonnées sont préparées ici pour alléger le rendu
+            coordonnees = self.placement.coordonnees()
+        except Exception as e:
+            if not self.annulation.is_set():
+                self.signaux.erreur.emit(self.generation, self.index, str(e))
+            return
+        if not self.annulation.is_set():
+            self.signaux.termine.emit(self.generation, self.index, self.placement, coordonnees)
+
+
+class TacheClassement(QRunnable):
+    """
+    Classe les formats d'une bibliothèque dans un thread du pool.
+
+    Émet d'abord ``classe`` avec les formats retenus, puis ``termine`` pour
+    chacun d'eux, l'index étant son rang dans le classement.
+    """
+    def __init__(self, generation: int, formats: List[FormatPanneau], pcb_prototype: RectanglePCB, espacement: float,
+                 nombre_total_pcb: int, allow_rotation: bool, strategie: StrategiePlacement, cache: CachePlacement,
+                 nombre: int, annulation: threading.Event, signaux: SignauxCalcul,
+                 tolerance: float = TOLERANCE_AJUSTEMENT):
+        super().__init__()
+        self.setAutoDelete(False)
+        self.generation = generation
+        self.formats = formats
+        self.pcb_prototype = pcb_prototype
+        self.espacement = espacement
+        self.nombre_total_pcb = nombre_total_pcb
+        self.allow_rotation = allow_rotation
+        self.strategie = strategie
+        self.cache = cache
+        self.nombre = nombre
+        self.tolerance = tolerance
+        self.annulation = annulation
+        self.signaux = signaux
+        self.terminee = False
+
+    def run(self):
+        try:
+            self._classer()
+        finally:
+            self.terminee = True
+
+    def _classer(self):
+        if self.annulation.is_set():
+            return
+        try:
+            classement, evalues = classer_formats(self.formats, self.pcb_prototype, self.espacement,
+                                                  self.nombre_total_pcb, self.allow_rotation, self.strategie,
+                                                  self.cache, self.nombre, self.tolerance)
+            coordonnees = [placement.coordonnees() for _, placement in classement]
+        except Exception as e:
+            if not self.annulation.is_set():
+                self.signaux.erreur.emit(self.generation, 0, str(e))
+            return
+        if self.annulation.is_set():
+            return
+        self.signaux.classe.emit(self.generation, evalues, [format_panneau for format_panneau, _ in classement])
+        for index, ((_, placement), coordonnees_placement) in enumerate(zip(classement, coordonnees)):
+            self.signaux.termine.emit(self.generation, index, placement, coordonnees_placement)
+
+
+class SignauxExport(QObject):
+    """
+    Signaux émis par une tâche d'export, reçus dans le thread de l'interface.
+    """
+    # pages écrites, nombre total de pages
+    progression = pyqtSignal(int, int)
+    # destination (fichier PDF ou dossier d'images)
+    termine = pyqtSignal(str)
+    # message d'erreur
+    erreur = pyqtSignal(str)
+
+
+class TacheExport(QRunnable):
+    """
+    Exporte des pages dans un thread du pool, avec exporter(destination,
+    pages, progression=..., annulation=..., **options) : export.exporter_pdf
+    ou export.exporter_png. Une annulation interrompt l'export sans signal.
+    """
+    def __init__(self, exporter: Callable, destination: str, pages: list, annulation: threading.Event,
+                 signaux: SignauxExport, **options):
+        super().__init__()
+        self.setAutoDelete(False)
+        self.exporter = exporter
+        self.destination = destination
+        self.pages = pages
+        self.annulation = annulation
+        self.signaux = signaux
+        self.options = options
+        self.terminee = False
+
+    def run(self):
+        try:
+            self._exporter()
+        finally:
+            self.terminee = True
+
+    def _exporter(self):
+        try:
+            self.exporter(self.destination, self.pages, progression=self._progression, annulation=self.annulation,
+                          **self.options)
+        except Exception as e:
+            if not self.annulation.is_set():
+                self.signaux.erreur.emit(str(e))
+            return
+        self.signaux.termine.emit(self.destination)
+
+    def _progression(self, faites: int, total: int):
+        self.signaux.progression.emit(faites, total or len(self.pages))